@@ -0,0 +1,380 @@
+"""
+AI adjudication shared by the OpenAI and Gemini similarity checkers.
+
+Candidates are scored either one (idea, item) pair per request or, in
+batched mode, an idea and up to ``config.adjudication_batch_size``
+candidates in a single prompt with one verdict per candidate. Both modes
+have blocking and asyncio variants; the latter let the processor adjudicate
+many ideas concurrently.
+
+A request that fails for good raises ``ProviderError`` out of the checker;
+only an unparseable answer is scored with ``ERROR_VERDICT`` (and never cached).
+"""
+
+import json
+from typing import List, Optional, Sequence, Tuple
+
+from .models import Idea, UserStory, SimilarityResult
+from .config import config
+
+
+# Bump whenever the batched prompt changes so cached verdicts are discarded.
+# Batched verdicts are cached under this version and single-pair ones under
+# the checker's own prompt version, whichever prompt actually produced them.
+BATCH_PROMPT_VERSION = "batch-1"
+
+ERROR_VERDICT: Tuple[float, str] = (0.0, "Error al analizar similitud")
+
+
+def strip_code_fence(text: str) -> str:
+    """Remove a surrounding markdown code block from a model response."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("```")[1]
+        if text.startswith("json"):
+            text = text[4:]
+        text = text.strip()
+    return text
+
+
+def parse_verdict(text: str) -> Tuple[float, str]:
+    """
+    Parse the model's answer to a single-pair prompt.
+    
+    Args:
+        text: Raw model response
+        
+    Returns:
+        Tuple of (similarity_score, reasoning)
+        
+    Raises:
+        ValueError: If the response is not valid JSON
+    """
+    result = json.loads(strip_code_fence(text))
+    return (
+        float(result.get("similarity_score", 0.0)),
+        result.get("reason", "")
+    )
+
+
+def build_batch_prompt(idea_text: str, item_texts: Sequence[Tuple[str, str]]) -> str:
+    """
+    Build a prompt comparing one idea against several existing items.
+    
+    Args:
+        idea_text: The new idea, formatted with ``_format_existing_item``
+        item_texts: (item ID, formatted item) pairs, in candidate order
+        
+    Returns:
+        Prompt text asking for a JSON verdict per numbered candidate
+    """
+    candidates = "\n\n".join(
+        f"CANDIDATO {number} ({item_id}):\n{text}"
+        for number, (item_id, text) in enumerate(item_texts, start=1)
+    )
+    
+    return f"""Analiza si la idea nueva representa la misma idea o funcionalidad que cada uno de los elementos existentes.
+
+IDEA NUEVA:
+{idea_text}
+
+ELEMENTOS EXISTENTES:
+
+{candidates}
+
+Para CADA candidato, de forma independiente:
+1. Determina si es duplicado o muy similar a la idea nueva (>80% similitud)
+2. Da un score de similitud entre 0.0 y 1.0
+3. Explica brevemente por qué son similares o diferentes
+
+Responde SOLO con un JSON válido (sin markdown ni texto adicional), con un resultado por candidato:
+{{
+    "results": [
+        {{
+            "candidate": 1,
+            "similarity_score": 0.85,
+            "is_duplicate": true,
+            "reason": "Ambas tratan sobre..."
+        }}
+    ]
+}}
+"""
+
+
+def parse_batch_verdicts(text: str, count: int) -> List[Optional[Tuple[float, str]]]:
+    """
+    Parse the model's answer to a batched prompt.
+    
+    Accepts either ``{"results": [...]}`` or a bare JSON array, optionally
+    wrapped in a markdown code block. Entries are matched to candidates by
+    their ``candidate`` number, falling back to position.
+    
+    Args:
+        text: Raw model response
+        count: Number of candidates in the prompt
+        
+    Returns:
+        One (similarity_score, reasoning) per candidate, or None where the
+        model gave no usable verdict
+        
+    Raises:
+        ValueError: If the response is not valid JSON
+    """
+    data = json.loads(strip_code_fence(text))
+    entries = data.get("results", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError("Batched verdict response has no results list")
+    
+    verdicts: List[Optional[Tuple[float, str]]] = [None] * count
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            number = int(entry.get("candidate", position + 1))
+            score = float(entry.get("similarity_score", 0.0))
+        except (TypeError, ValueError):
+            continue
+        if 1 <= number <= count and verdicts[number - 1] is None:
+            verdicts[number - 1] = (score, entry.get("reason", ""))
+    
+    return verdicts
+
+
+class AdjudicationMixin:
+    """
+    Verdict caching, batching and async fan-out for the AI similarity checkers.
+    
+    Subclasses provide ``verdict_cache`` (or None), ``provider_name``, and
+    implement ``_similarity_prompt``, ``_complete_prompt``,
+    ``_complete_prompt_async``, ``_build_results`` and
+    ``_format_existing_item``.
+    """
+    
+    provider_name = "AI"
+    
+    def _similarity_prompt(self, idea: Idea, existing_item: UserStory | Idea) -> str:
+        """Build the single-pair comparison prompt."""
+        raise NotImplementedError
+    
+    def _complete_prompt(self, prompt: str) -> str:
+        """Send one prompt and return the raw response text."""
+        raise NotImplementedError
+    
+    async def _complete_prompt_async(self, prompt: str) -> str:
+        """Send one prompt with the provider's async client."""
+        raise NotImplementedError
+    
+    def _build_results(
+        self,
+        idea: Idea,
+        items: List[UserStory | Idea],
+        verdicts: List[Tuple[float, str]]
+    ) -> List[SimilarityResult]:
+        """Turn per-item verdicts into sorted SimilarityResult objects."""
+        raise NotImplementedError
+    
+    def check_similarity_with_ai(
+        self,
+        idea: Idea,
+        existing_item: UserStory | Idea
+    ) -> Tuple[float, str]:
+        """
+        Ask the model how similar an idea is to one existing item.
+        
+        Args:
+            idea: The new idea to check
+            existing_item: Existing user story or idea to compare against
+            
+        Returns:
+            Tuple of (similarity_score, reasoning)
+            
+        Raises:
+            ProviderError: If the provider request fails after all retries
+        """
+        cached, texts = self._cached_pair(idea, existing_item)
+        if cached is not None:
+            return cached
+        
+        response = self._complete_prompt(self._similarity_prompt(idea, existing_item))
+        try:
+            verdict = parse_verdict(response)
+        except Exception as e:
+            print(f"Error in {self.provider_name} similarity check: {e}")
+            return ERROR_VERDICT
+        
+        self._store_verdict(*texts, verdict)
+        return verdict
+    
+    async def check_similarity_with_ai_async(
+        self,
+        idea: Idea,
+        existing_item: UserStory | Idea
+    ) -> Tuple[float, str]:
+        """Async variant of ``check_similarity_with_ai``."""
+        cached, texts = self._cached_pair(idea, existing_item)
+        if cached is not None:
+            return cached
+        
+        response = await self._complete_prompt_async(self._similarity_prompt(idea, existing_item))
+        try:
+            verdict = parse_verdict(response)
+        except Exception as e:
+            print(f"Error in {self.provider_name} similarity check: {e}")
+            return ERROR_VERDICT
+        
+        self._store_verdict(*texts, verdict)
+        return verdict
+    
+    def check_similarity_batch_with_ai(
+        self,
+        idea: Idea,
+        items: List[UserStory | Idea]
+    ) -> List[Tuple[float, str]]:
+        """
+        Score several existing items against an idea with batched requests.
+        
+        Cached verdicts are reused; the remaining items are sent in chunks
+        of ``config.adjudication_batch_size``, one request per chunk.
+        
+        Args:
+            idea: The new idea to check
+            items: Existing user stories or ideas to compare against
+            
+        Returns:
+            One (similarity_score, reasoning) tuple per item, in input order
+            
+        Raises:
+            ProviderError: If a provider request fails after all retries
+        """
+        verdicts, idea_text, item_texts, chunks = self._plan_batches(idea, items)
+        
+        for chunk, prompt in chunks:
+            response = self._complete_prompt(prompt)
+            self._record_batch(verdicts, idea_text, item_texts, chunk, response)
+        
+        return verdicts
+    
+    async def check_similarity_batch_with_ai_async(
+        self,
+        idea: Idea,
+        items: List[UserStory | Idea]
+    ) -> List[Tuple[float, str]]:
+        """Async variant of ``check_similarity_batch_with_ai``."""
+        verdicts, idea_text, item_texts, chunks = self._plan_batches(idea, items)
+        
+        for chunk, prompt in chunks:
+            response = await self._complete_prompt_async(prompt)
+            self._record_batch(verdicts, idea_text, item_texts, chunk, response)
+        
+        return verdicts
+    
+    def adjudicate(
+        self,
+        idea: Idea,
+        candidates: List[Tuple[UserStory | Idea, Optional[float]]]
+    ) -> List[SimilarityResult]:
+        """
+        Use the model to score the retrieved candidates for an idea.
+        
+        With ``config.batch_adjudication`` all candidates are scored in one
+        request (per ``config.adjudication_batch_size`` chunk).
+        
+        Args:
+            idea: The idea to check
+            candidates: (item, retrieval score) pairs from ``find_candidates``
+            
+        Returns:
+            List of SimilarityResult objects, highest score first
+        """
+        items = [item for item, _ in candidates]
+        if config.batch_adjudication and len(items) > 1:
+            verdicts = self.check_similarity_batch_with_ai(idea, items)
+        else:
+            verdicts = [self.check_similarity_with_ai(idea, item) for item in items]
+        return self._build_results(idea, items, verdicts)
+    
+    async def adjudicate_async(
+        self,
+        idea: Idea,
+        candidates: List[Tuple[UserStory | Idea, Optional[float]]]
+    ) -> List[SimilarityResult]:
+        """Async variant of ``adjudicate``, using the provider's async client."""
+        items = [item for item, _ in candidates]
+        if config.batch_adjudication and len(items) > 1:
+            verdicts = await self.check_similarity_batch_with_ai_async(idea, items)
+        else:
+            verdicts = [await self.check_similarity_with_ai_async(idea, item) for item in items]
+        return self._build_results(idea, items, verdicts)
+    
+    def _cached_pair(
+        self,
+        idea: Idea,
+        existing_item: UserStory | Idea
+    ) -> Tuple[Optional[Tuple[float, str]], Tuple[str, str]]:
+        """Return a cached verdict (or None) and the texts it is keyed by."""
+        # Verdicts are reused while both texts, the model and the prompt are unchanged
+        texts = (self._format_existing_item(idea), self._format_existing_item(existing_item))
+        cached = self.verdict_cache.get(*texts) if self.verdict_cache is not None else None
+        return cached, texts
+    
+    def _store_verdict(
+        self,
+        idea_text: str,
+        item_text: str,
+        verdict: Tuple[float, str],
+        prompt_version: Optional[str] = None
+    ) -> None:
+        # Only successful verdicts are cached, so failed calls are retried next run
+        if self.verdict_cache is not None:
+            self.verdict_cache.put(idea_text, item_text, *verdict, prompt_version=prompt_version)
+    
+    def _plan_batches(self, idea: Idea, items: List[UserStory | Idea]):
+        """Resolve cached verdicts and build one prompt per chunk of the rest."""
+        idea_text = self._format_existing_item(idea)
+        item_texts = [self._format_existing_item(item) for item in items]
+        verdicts: List[Optional[Tuple[float, str]]] = [None] * len(items)
+        
+        pending = []
+        for position, item_text in enumerate(item_texts):
+            cached = (
+                self.verdict_cache.get(idea_text, item_text, BATCH_PROMPT_VERSION)
+                if self.verdict_cache is not None else None
+            )
+            if cached is not None:
+                verdicts[position] = cached
+            else:
+                pending.append(position)
+        
+        chunk_size = max(1, config.adjudication_batch_size)
+        chunks = []
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            prompt = build_batch_prompt(
+                idea_text,
+                [(items[position].id, item_texts[position]) for position in chunk]
+            )
+            chunks.append((chunk, prompt))
+        
+        return verdicts, idea_text, item_texts, chunks
+    
+    def _record_batch(
+        self,
+        verdicts: List[Optional[Tuple[float, str]]],
+        idea_text: str,
+        item_texts: List[str],
+        chunk: List[int],
+        response: str
+    ) -> None:
+        """Parse one chunk's response into ``verdicts`` and cache the good ones."""
+        parsed: List[Optional[Tuple[float, str]]] = [None] * len(chunk)
+        try:
+            parsed = parse_batch_verdicts(response, len(chunk))
+        except Exception as e:
+            print(f"Error in batched {self.provider_name} similarity check: {e}")
+        
+        for position, verdict in zip(chunk, parsed):
+            if verdict is None:
+                verdicts[position] = ERROR_VERDICT
+            else:
+                verdicts[position] = verdict
+                self._store_verdict(idea_text, item_texts[position], verdict, BATCH_PROMPT_VERSION)
@@ -0,0 +1,406 @@
+"""
+Approximate nearest-neighbour indexes over idea and user story embeddings.
+
+For small backlogs the exact similarity join is fast enough. Once the corpus
+grows into the tens of thousands, an ANN index answers the top-k query by
+scanning only a fraction of the corpus. Indexes are persisted in the local
+state directory next to BACKLOG.md and reused while the corpus is unchanged.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from .similarity_join import top_k_join
+
+
+# Largest share of corpus rows that may be new or edited for a persisted
+# index to be refreshed in place rather than rebuilt from scratch
+REFRESH_MAX_CHANGED = 0.1
+
+
+class VectorIndex:
+    """
+    Base class for vector indexes.
+    
+    Rows are addressed by position in the ``ids`` list given to ``build``.
+    Each row also carries a fingerprint (content hash of the embedded text
+    and model) so a persisted index can tell whether it still matches the
+    current corpus.
+    """
+    
+    kind = "base"
+    
+    def __init__(self):
+        self.ids: List[str] = []
+        self.fingerprints: List[str] = []
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+    
+    def build(self, ids: List[str], fingerprints: List[str], matrix: np.ndarray) -> None:
+        """
+        Build the index from a normalized embedding matrix.
+        
+        Args:
+            ids: Item ID for each row
+            fingerprints: Content fingerprint for each row
+            matrix: L2-normalized float32 matrix (one row per item)
+        """
+        self.ids = list(ids)
+        self.fingerprints = list(fingerprints)
+        self.matrix = matrix
+    
+    def refresh(self, ids: List[str], fingerprints: List[str], matrix: np.ndarray) -> None:
+        """
+        Bring a loaded index up to date with a changed corpus.
+        
+        The default is a full rebuild; subclasses may reuse trained state.
+        """
+        self.build(ids, fingerprints, matrix)
+    
+    def matches(self, ids: List[str], fingerprints: List[str]) -> bool:
+        """Return True if the index was built from exactly this corpus."""
+        return self.ids == list(ids) and self.fingerprints == list(fingerprints)
+    
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        min_score: float = -1.0,
+        exclude: Optional[Sequence[int]] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Find the top-k rows for each normalized query vector.
+        
+        Args:
+            queries: L2-normalized query matrix
+            k: Neighbours to return per query (0 returns all above ``min_score``)
+            min_score: Discard neighbours scoring below this value
+            exclude: Optional row to skip for each query (-1 for none)
+            
+        Returns:
+            For each query, a list of (row, score) sorted by score descending
+        """
+        raise NotImplementedError
+    
+    def save(self, directory: Path) -> None:
+        """Persist the index into ``directory``."""
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / "meta.json").write_text(
+            json.dumps({"kind": self.kind, "ids": self.ids, "fingerprints": self.fingerprints}),
+            encoding="utf-8"
+        )
+        np.save(directory / "matrix.npy", self.matrix)
+    
+    def _load(self, directory: Path, meta: Dict) -> None:
+        """Restore the state written by ``save``."""
+        self.ids = meta["ids"]
+        self.fingerprints = meta["fingerprints"]
+        self.matrix = np.load(directory / "matrix.npy")
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force index backed by the blocked similarity join."""
+    
+    kind = "exact"
+    
+    def __init__(self, block_size: int = 1024):
+        super().__init__()
+        self.block_size = block_size
+    
+    def search(self, queries, k, min_score=-1.0, exclude=None):
+        return top_k_join(
+            queries,
+            self.matrix,
+            k=k,
+            min_score=min_score,
+            block_size=self.block_size,
+            exclude=exclude
+        )
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index using spherical k-means clustering.
+    
+    The corpus is partitioned into ``nlist`` clusters; a query only scores
+    the rows in its ``nprobe`` closest clusters.
+    """
+    
+    kind = "ivf"
+    
+    def __init__(self, nprobe: int = 12, nlist: int = 0, iterations: int = 10, seed: int = 0):
+        super().__init__()
+        self.nprobe = nprobe
+        self.nlist = nlist
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids = np.zeros((0, 0), dtype=np.float32)
+        self.order = np.zeros(0, dtype=np.int64)  # Row IDs sorted by cluster
+        self.offsets = np.zeros(1, dtype=np.int64)  # Cluster boundaries in ``order``
+        self.sorted_matrix = np.zeros((0, 0), dtype=np.float32)  # Rows in ``order``
+        self.trained_size = 0
+    
+    def build(self, ids, fingerprints, matrix):
+        super().build(ids, fingerprints, matrix)
+        n_rows = matrix.shape[0]
+        nlist = self.nlist or max(1, int(np.sqrt(n_rows)))
+        nlist = min(nlist, max(1, n_rows))
+        
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(n_rows, nlist * 64)
+        sample = matrix[rng.choice(n_rows, size=sample_size, replace=False)] if n_rows else matrix
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy() if n_rows else sample
+        
+        for _ in range(self.iterations):
+            assignment = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            norms[empty] = 1.0
+            # Keep the previous centroid for clusters that lost all members
+            centroids = np.where(empty[:, None], centroids, sums / norms).astype(np.float32)
+        
+        self.centroids = centroids
+        self.trained_size = n_rows
+        self._build_lists(self._assign(matrix, centroids))
+    
+    def refresh(self, ids, fingerprints, matrix):
+        # Reuse the trained centroids unless the corpus has grown or shrunk a
+        # lot since training; reassigning rows is a single blocked matmul.
+        same_shape = self.centroids.shape[1:] == matrix.shape[1:]
+        in_range = self.trained_size // 2 <= matrix.shape[0] <= self.trained_size * 2
+        if not (same_shape and in_range and self.centroids.shape[0]):
+            self.build(ids, fingerprints, matrix)
+            return
+        
+        VectorIndex.build(self, ids, fingerprints, matrix)
+        self._build_lists(self._assign(matrix, self.centroids))
+    
+    def search(self, queries, k, min_score=-1.0, exclude=None):
+        n_queries, n_rows = queries.shape[0], self.matrix.shape[0]
+        if n_queries == 0:
+            return []
+        if n_rows == 0:
+            return [[] for _ in range(n_queries)]
+        
+        k = n_rows if k <= 0 else min(k, n_rows)
+        nprobe = min(self.nprobe, self.centroids.shape[0])
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        exclude_rows = np.asarray(exclude if exclude is not None else [-1] * n_queries, dtype=np.int64)
+        
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+        best_index = np.full((n_queries, k), -1, dtype=np.int64)
+        
+        # Visit each probed cluster once, scoring all queries that probe it
+        # against the cluster's contiguous slice of the sorted matrix
+        for cluster in np.unique(probes):
+            start, end = self.offsets[cluster], self.offsets[cluster + 1]
+            if start == end:
+                continue
+            members = np.nonzero((probes == cluster).any(axis=1))[0]
+            rows = self.order[start:end]
+            scores = queries[members] @ self.sorted_matrix[start:end].T
+            scores[rows[None, :] == exclude_rows[members, None]] = -np.inf
+            
+            block_k = min(k, scores.shape[1])
+            part = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+            merged_scores = np.concatenate(
+                [best_scores[members], np.take_along_axis(scores, part, axis=1)], axis=1
+            )
+            merged_index = np.concatenate([best_index[members], rows[part]], axis=1)
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores[members] = np.take_along_axis(merged_scores, keep, axis=1)
+            best_index[members] = np.take_along_axis(merged_index, keep, axis=1)
+        
+        results = []
+        for scores_row, index_row in zip(best_scores, best_index):
+            order = np.lexsort((index_row, -scores_row))
+            results.append([
+                (int(index_row[i]), float(scores_row[i]))
+                for i in order
+                if index_row[i] >= 0 and scores_row[i] >= min_score
+            ])
+        
+        return results
+    
+    def save(self, directory):
+        super().save(directory)
+        np.savez(
+            directory / "ivf.npz",
+            centroids=self.centroids,
+            order=self.order,
+            offsets=self.offsets,
+            trained_size=np.array(self.trained_size)
+        )
+    
+    def _load(self, directory, meta):
+        super()._load(directory, meta)
+        data = np.load(directory / "ivf.npz")
+        self.centroids = data["centroids"]
+        self.order = data["order"]
+        self.offsets = data["offsets"]
+        self.trained_size = int(data["trained_size"])
+        self.sorted_matrix = self.matrix[self.order]
+    
+    def _build_lists(self, assignment: np.ndarray) -> None:
+        """Group row IDs by cluster into contiguous inverted lists."""
+        self.order = np.argsort(assignment, kind="stable")
+        self.sorted_matrix = self.matrix[self.order]
+        counts = np.bincount(assignment, minlength=self.centroids.shape[0])
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    
+    @staticmethod
+    def _assign(matrix: np.ndarray, centroids: np.ndarray, block_size: int = 4096) -> np.ndarray:
+        """Assign each row to its most similar centroid, in bounded blocks."""
+        assignment = np.empty(matrix.shape[0], dtype=np.int64)
+        for start in range(0, matrix.shape[0], block_size):
+            block = matrix[start:start + block_size]
+            assignment[start:start + block_size] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+
+class HNSWIndex(VectorIndex):
+    """
+    Hierarchical navigable small world graph index.
+    
+    Requires the optional ``hnswlib`` package.
+    """
+    
+    kind = "hnsw"
+    
+    def __init__(self, ef_search: int = 64, ef_construction: int = 200, m: int = 16):
+        super().__init__()
+        try:
+            import hnswlib
+        except ImportError as e:
+            raise ImportError(
+                "The 'hnsw' ANN index requires hnswlib. Install it with: pip install hnswlib"
+            ) from e
+        self._hnswlib = hnswlib
+        self.ef_search = ef_search
+        self.ef_construction = ef_construction
+        self.m = m
+        self.graph = None
+    
+    def build(self, ids, fingerprints, matrix):
+        super().build(ids, fingerprints, matrix)
+        self.graph = self._hnswlib.Index(space="ip", dim=matrix.shape[1])
+        self.graph.init_index(
+            max_elements=max(1, matrix.shape[0]),
+            ef_construction=self.ef_construction,
+            M=self.m
+        )
+        if matrix.shape[0]:
+            self.graph.add_items(matrix, np.arange(matrix.shape[0]))
+    
+    def search(self, queries, k, min_score=-1.0, exclude=None):
+        n_rows = self.matrix.shape[0]
+        if queries.shape[0] == 0:
+            return []
+        if n_rows == 0:
+            return [[] for _ in range(queries.shape[0])]
+        
+        # One extra neighbour so dropping the excluded row still leaves k
+        fetch = n_rows if k <= 0 else min(n_rows, k + 1)
+        self.graph.set_ef(max(self.ef_search, fetch))
+        labels, distances = self.graph.knn_query(queries, k=fetch)
+        
+        results = []
+        for q in range(queries.shape[0]):
+            matches = []
+            for label, distance in zip(labels[q], distances[q]):
+                score = 1.0 - float(distance)  # "ip" distance is 1 - dot product
+                if exclude is not None and label == exclude[q]:
+                    continue
+                if score >= min_score:
+                    matches.append((int(label), score))
+            results.append(matches if k <= 0 else matches[:k])
+        
+        return results
+    
+    def save(self, directory):
+        super().save(directory)
+        self.graph.save_index(str(directory / "hnsw.bin"))
+    
+    def _load(self, directory, meta):
+        super()._load(directory, meta)
+        self.graph = self._hnswlib.Index(space="ip", dim=self.matrix.shape[1])
+        self.graph.load_index(str(directory / "hnsw.bin"), max_elements=max(1, self.matrix.shape[0]))
+
+
+INDEX_TYPES: Dict[str, Type[VectorIndex]] = {
+    ExactIndex.kind: ExactIndex,
+    IVFIndex.kind: IVFIndex,
+    HNSWIndex.kind: HNSWIndex,
+}
+
+
+def create_index(kind: str, **options) -> VectorIndex:
+    """
+    Create an empty index of the given kind.
+    
+    Args:
+        kind: "exact", "ivf" or "hnsw"
+        options: Keyword arguments for the index constructor
+        
+    Returns:
+        Unbuilt VectorIndex instance
+    """
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown ANN index '{kind}'. Choose one of: {', '.join(INDEX_TYPES)}")
+    return INDEX_TYPES[kind](**options)
+
+
+def load_or_build_index(
+    kind: str,
+    directory: Path,
+    ids: List[str],
+    fingerprints: List[str],
+    matrix: np.ndarray,
+    **options
+) -> VectorIndex:
+    """
+    Load a persisted index if it matches the corpus, otherwise update it.
+    
+    When only a few rows changed (up to ``REFRESH_MAX_CHANGED`` of the
+    corpus) the loaded index is refreshed, which lets IVF keep its trained
+    centroids; otherwise it is built from scratch.
+    
+    Args:
+        kind: Index type ("exact", "ivf" or "hnsw")
+        directory: Directory where the index is persisted
+        ids: Item ID for each corpus row
+        fingerprints: Content fingerprint for each corpus row
+        matrix: L2-normalized corpus matrix
+        options: Keyword arguments for the index constructor
+        
+    Returns:
+        Ready-to-query VectorIndex
+    """
+    index = create_index(kind, **options)
+    meta_file = directory / "meta.json"
+    
+    if meta_file.exists():
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            if meta.get("kind") == kind:
+                index._load(directory, meta)
+                if index.matches(ids, fingerprints):
+                    return index
+                
+                known = set(index.fingerprints)
+                changed = sum(1 for fingerprint in fingerprints if fingerprint not in known)
+                if changed <= REFRESH_MAX_CHANGED * len(fingerprints):
+                    index.refresh(ids, fingerprints, matrix)
+                    index.save(directory)
+                    return index
+        except (OSError, ValueError, KeyError):
+            pass  # Corrupt or partial index: rebuild below
+        index = create_index(kind, **options)
+    
+    index.build(ids, fingerprints, matrix)
+    index.save(directory)
+    return index
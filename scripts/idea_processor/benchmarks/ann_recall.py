@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Recall-versus-exact benchmark for the ANN indexes.
+
+Builds a synthetic, clustered embedding corpus, plants near-duplicate queries
+and compares each ANN index against the exact similarity join: top-k recall,
+recall of the pairs that would reach AI adjudication (score within the
+duplicate band) and build/query time.
+
+Usage:
+    python -m scripts.idea_processor.benchmarks.ann_recall [options]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Add repository root to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from scripts.idea_processor.ann_index import create_index
+from scripts.idea_processor.similarity_join import normalize_matrix, top_k_join
+
+
+def make_corpus(n_items: int, dims: int, topics: int, seed: int) -> np.ndarray:
+    """Generate normalized vectors grouped around ``topics`` random centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(topics, dims))
+    labels = rng.integers(0, topics, size=n_items)
+    return normalize_matrix(centres[labels] + rng.normal(scale=0.9, size=(n_items, dims)))
+
+
+def make_queries(corpus: np.ndarray, n_queries: int, noise: float, seed: int) -> np.ndarray:
+    """Perturb random corpus rows to simulate reworded duplicate ideas."""
+    rng = np.random.default_rng(seed + 1)
+    rows = rng.choice(corpus.shape[0], size=n_queries, replace=False)
+    return normalize_matrix(corpus[rows] + rng.normal(scale=noise, size=(n_queries, corpus.shape[1])))
+
+
+def run_benchmark(
+    n_items: int,
+    n_queries: int,
+    dims: int,
+    k: int,
+    band: float,
+    kinds: List[str],
+    seed: int = 0
+) -> Dict:
+    """
+    Compare ANN indexes against the exact join.
+    
+    Returns:
+        Dictionary of benchmark parameters and per-index results
+    """
+    corpus = make_corpus(n_items, dims, topics=max(1, n_items // 50), seed=seed)
+    queries = make_queries(corpus, n_queries, noise=0.02, seed=seed)
+    ids = [f"US-{i:06d}" for i in range(n_items)]
+    
+    start = time.perf_counter()
+    exact = top_k_join(queries, corpus, k=k)
+    exact_seconds = time.perf_counter() - start
+    
+    report = {
+        "n_items": n_items,
+        "n_queries": n_queries,
+        "dims": dims,
+        "k": k,
+        "band": band,
+        "exact_query_seconds": round(exact_seconds, 4),
+        "indexes": {},
+    }
+    
+    for kind in kinds:
+        try:
+            index = create_index(kind)
+        except ImportError as e:
+            report["indexes"][kind] = {"skipped": str(e)}
+            continue
+        
+        start = time.perf_counter()
+        index.build(ids, ids, corpus)
+        build_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        approx = index.search(queries, k)
+        query_seconds = time.perf_counter() - start
+        
+        hits = total = band_hits = band_total = 0
+        for expected, found in zip(exact, approx):
+            found_rows = {row for row, _ in found}
+            hits += sum(1 for row, _ in expected if row in found_rows)
+            total += len(expected)
+            in_band = [row for row, score in expected if score >= band]
+            band_hits += sum(1 for row in in_band if row in found_rows)
+            band_total += len(in_band)
+        
+        report["indexes"][kind] = {
+            "build_seconds": round(build_seconds, 4),
+            "query_seconds": round(query_seconds, 4),
+            "recall_at_k": round(hits / total, 4) if total else 1.0,
+            "band_recall": round(band_hits / band_total, 4) if band_total else 1.0,
+            "band_pairs": band_total,
+        }
+    
+    return report
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser(description="ANN recall-versus-exact benchmark")
+    parser.add_argument('--items', type=int, default=20000, help='Corpus size (default: 20000)')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries (default: 200)')
+    parser.add_argument('--dims', type=int, default=256, help='Vector dimensions (default: 256)')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query (default: 10)')
+    parser.add_argument('--band', type=float, default=0.70, help='Adjudication band lower bound (default: 0.70)')
+    parser.add_argument('--index', action='append', help='Index kind to test (repeatable, default: ivf and hnsw)')
+    parser.add_argument('--output', type=Path, help='Write the JSON report to this file')
+    args = parser.parse_args()
+    
+    report = run_benchmark(
+        n_items=args.items,
+        n_queries=args.queries,
+        dims=args.dims,
+        k=args.k,
+        band=args.band,
+        kinds=args.index or ["ivf", "hnsw"],
+    )
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
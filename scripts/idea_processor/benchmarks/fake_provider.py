@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI/Gemini-compatible stand-in server for offline load testing.
+
+Serves the request and response shapes the idea processor uses:
+
+    POST /v1/embeddings                           (OpenAI)
+    POST /v1/chat/completions                     (OpenAI)
+    POST /v1beta/models/{model}:generateContent   (Gemini REST)
+    POST /v1beta/models/{model}:embedContent      (Gemini REST)
+    POST /v1beta/models/{model}:batchEmbedContents (Gemini REST)
+    GET  /stats                                   (request and fault counters)
+
+Embeddings are sign-hashed bags of normalized words, so related texts get
+close vectors and every run returns the same numbers. Chat answers are
+computed from the prompt: adjudication prompts get one verdict per candidate,
+scored with the cosine of those vectors, and generation prompts get a user
+story built from the idea fields. Latency and injected 429/500 errors are
+configurable and seeded.
+
+Usage:
+    python -m scripts.idea_processor.benchmarks.fake_provider [options]
+
+    # In another shell: point the processor at it (no API key needed)
+    PROVIDER_BASE_URL=http://127.0.0.1:8765 python -m scripts.idea_processor.cli --dry-run
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add repository root to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from scripts.idea_processor.embeddings import estimate_tokens
+from scripts.idea_processor.text_normalization import normalize_tokens
+
+
+_IDEA_PATTERN = re.compile(r"IDEA NUEVA:\n(.*?)\n\n(?:ELEMENTO|ELEMENTOS) EXISTENTES?", re.DOTALL)
+_PAIR_ITEM_PATTERN = re.compile(r"ELEMENTO EXISTENTE \(([^)]*)\):\n(.*?)\n\nPor favor:", re.DOTALL)
+_CANDIDATE_PATTERN = re.compile(
+    r"CANDIDATO (\d+) \(([^)]*)\):\n(.*?)(?=\n\nCANDIDATO \d+ \(|\n\nPara CADA candidato)",
+    re.DOTALL
+)
+_FIELD_PATTERN = re.compile(r"^(Título|Contexto|Problema|Valor|Prioridad Original): (.*)$", re.MULTILINE)
+
+
+class FakeProvider:
+    """Deterministic answers and fault injection shared by all request threads."""
+    
+    def __init__(
+        self,
+        dims: int = 256,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        threshold: float = 0.80,
+        seed: int = 0
+    ):
+        """
+        Args:
+            dims: Embedding dimensions
+            latency_ms: Mean added latency per request
+            jitter_ms: Latency spread (uniform, +/-)
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            threshold: Score at which chat verdicts report ``is_duplicate``
+            seed: Seed for latency and fault sampling
+        """
+        self.dims = dims
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.threshold = threshold
+        self.stats: Counter = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def admit(self, endpoint: str) -> Optional[int]:
+        """
+        Count a request, sleep for its latency and decide whether it fails.
+        
+        Args:
+            endpoint: Endpoint name used in the stats
+            
+        Returns:
+            HTTP status to fail with (429 or 500), or None to answer normally
+        """
+        with self._lock:
+            self.stats[endpoint] += 1
+            delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms))
+            draw = self._rng.random()
+        time.sleep(delay / 1000)
+        
+        status = None
+        if draw < self.rate_limit_rate:
+            status = 429
+        elif draw < self.rate_limit_rate + self.error_rate:
+            status = 500
+        if status is not None:
+            with self._lock:
+                self.stats[f"{endpoint}:{status}"] += 1
+        return status
+    
+    def embed(self, text: str) -> List[float]:
+        """Sign-hashed, L2-normalized bag of normalized words."""
+        vector = np.zeros(self.dims)
+        for token in normalize_tokens(text):
+            digest = zlib.crc32(token.encode("utf-8"))
+            vector[digest % self.dims] += 1.0 if digest & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            vector[0] = 1.0
+            norm = 1.0
+        return (vector / norm).tolist()
+    
+    def similarity(self, a: str, b: str) -> float:
+        """Cosine of the fake embeddings, clipped to [0, 1]."""
+        score = float(np.dot(self.embed(a), self.embed(b)))
+        return round(min(1.0, max(0.0, score)), 4)
+    
+    def chat(self, prompt: str) -> str:
+        """
+        Answer an adjudication or user story generation prompt.
+        
+        Args:
+            prompt: Prompt text (system instructions included)
+            
+        Returns:
+            JSON answer in the format the prompt asks for
+        """
+        idea_match = _IDEA_PATTERN.search(prompt)
+        if idea_match is None:
+            return json.dumps(self._user_story(prompt), ensure_ascii=False)
+        
+        idea_text = idea_match.group(1)
+        candidates = _CANDIDATE_PATTERN.findall(prompt)
+        if candidates:
+            return json.dumps({
+                "results": [
+                    {"candidate": int(number), **self._verdict(idea_text, item_id, text)}
+                    for number, item_id, text in candidates
+                ]
+            }, ensure_ascii=False)
+        
+        item_match = _PAIR_ITEM_PATTERN.search(prompt)
+        item_id, item_text = item_match.groups() if item_match else ("", "")
+        return json.dumps(self._verdict(idea_text, item_id, item_text), ensure_ascii=False)
+    
+    def _verdict(self, idea_text: str, item_id: str, item_text: str) -> Dict:
+        score = self.similarity(idea_text, item_text)
+        return {
+            "similarity_score": score,
+            "is_duplicate": score >= self.threshold,
+            "reason": f"Similitud léxica simulada con {item_id}: {score:.2f}"
+        }
+    
+    @staticmethod
+    def _user_story(prompt: str) -> Dict:
+        fields = dict(_FIELD_PATTERN.findall(prompt))
+        title = fields.get("Título", "Historia generada")
+        return {
+            "title": title,
+            "as_a": "usuario del sistema",
+            "i_want": title.lower(),
+            "so_that": fields.get("Valor", ""),
+            "acceptance_criteria": [
+                f"Resuelve el problema: {fields.get('Problema', '')}",
+                f"Proporciona el valor: {fields.get('Valor', '')}",
+                "El cambio queda cubierto por pruebas automatizadas",
+            ],
+            "estimation": 3,
+            "epic": "Benchmark",
+            "priority": fields.get("Prioridad Original", "Media 🟡"),
+            "affected_services": [],
+            "technical_notes": ["Generada por el proveedor simulado"]
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Route OpenAI and Gemini REST requests to the server's FakeProvider."""
+    
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real APIs
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send(200, dict(self.server.provider.stats))
+        else:
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+    
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        
+        route = self._route()
+        if route is None:
+            self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+        
+        name, handler = route
+        status = self.server.provider.admit(name)
+        if status is not None:
+            self._send_error(status, gemini=name.startswith("gemini"))
+            return
+        self._send(200, handler(body))
+    
+    def _route(self) -> Optional[Tuple[str, callable]]:
+        path = self.path.split("?", 1)[0]
+        if path.endswith("/v1/embeddings"):
+            return "openai.embeddings", self._openai_embeddings
+        if path.endswith("/v1/chat/completions"):
+            return "openai.chat", self._openai_chat
+        if path.endswith(":generateContent"):
+            return "gemini.generate", self._gemini_generate
+        if path.endswith(":batchEmbedContents"):
+            return "gemini.embed", self._gemini_batch_embed
+        if path.endswith(":embedContent"):
+            return "gemini.embed", self._gemini_embed
+        return None
+    
+    def _openai_embeddings(self, body: Dict) -> Dict:
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        tokens = sum(estimate_tokens(text) for text in texts)
+        return {
+            "object": "list",
+            "model": body.get("model", ""),
+            "data": [
+                {"object": "embedding", "index": index, "embedding": self.server.provider.embed(text)}
+                for index, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }
+    
+    def _openai_chat(self, body: Dict) -> Dict:
+        prompt = "\n\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        content = self.server.provider.chat(prompt)
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        return {
+            "id": f"chatcmpl-fake-{zlib.crc32(prompt.encode('utf-8')):08x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", ""),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+    
+    def _gemini_generate(self, body: Dict) -> Dict:
+        prompt = "\n\n".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        text = self.server.provider.chat(prompt)
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(text)
+        return {
+            "candidates": [{
+                "content": {"parts": [{"text": text}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": completion_tokens,
+                "totalTokenCount": prompt_tokens + completion_tokens
+            }
+        }
+    
+    def _gemini_embed(self, body: Dict) -> Dict:
+        text = "".join(part.get("text", "") for part in body.get("content", {}).get("parts", []))
+        return {"embedding": {"values": self.server.provider.embed(text)}}
+    
+    def _gemini_batch_embed(self, body: Dict) -> Dict:
+        return {
+            "embeddings": [
+                self._gemini_embed(request)["embedding"]
+                for request in body.get("requests", [])
+            ]
+        }
+    
+    def _send_error(self, status: int, gemini: bool) -> None:
+        if gemini:
+            error = {
+                "code": status,
+                "message": "Simulated failure",
+                "status": "RESOURCE_EXHAUSTED" if status == 429 else "INTERNAL"
+            }
+        else:
+            error = {
+                "message": "Simulated failure",
+                "type": "rate_limit_exceeded" if status == 429 else "server_error",
+                "code": None
+            }
+        self._send(status, {"error": error})
+    
+    def _send(self, status: int, payload: Dict) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class FakeProviderServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server around a FakeProvider.
+    
+    Use it as a context manager to serve from a background thread, e.g. from
+    a benchmark, and set ``config.provider_base_url`` to ``server.url``.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, provider: FakeProvider, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.provider = provider
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Root URL to use as the provider base URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def __enter__(self) -> "FakeProviderServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+
+def main():
+    """Serve the fake provider until interrupted."""
+    parser = argparse.ArgumentParser(description="Local OpenAI/Gemini-compatible stand-in server")
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--dims', type=int, default=256, help='Embedding dimensions (default: 256)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Mean added latency per request (default: 0)')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Latency spread, +/- (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests failing with 500 (default: 0)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests failing with 429 (default: 0)')
+    parser.add_argument('--threshold', type=float, default=0.80, help='Duplicate threshold of the chat verdicts (default: 0.80)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency and fault sampling (default: 0)')
+    args = parser.parse_args()
+    
+    provider = FakeProvider(
+        dims=args.dims,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        threshold=args.threshold,
+        seed=args.seed
+    )
+    server = FakeProviderServer(provider, args.host, args.port)
+    print(f"Fake provider listening on {server.url}")
+    print(f"  export PROVIDER_BASE_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(dict(provider.stats), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Parsing throughput benchmark for IDEAS.md and BACKLOG.md.
+
+Generates synthetic files of doubling size (see ``synthetic.py``) and times
+``MarkdownParser.parse_ideas`` and ``parse_user_stories`` on each. With a
+linear parser the time per megabyte stays flat as the files grow; the
+report's ``scaling`` field is the per-megabyte time of the largest size
+divided by that of the smallest (about 1.0 when linear, growing with the
+size ratio when quadratic).
+
+Usage:
+    python -m scripts.idea_processor.benchmarks.parse [options]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+# Add repository root to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from scripts.idea_processor.benchmarks.synthetic import generate_files
+from scripts.idea_processor.parser import MarkdownParser
+
+
+def time_parse(n_items: int, seed: int, repeat: int) -> Dict:
+    """
+    Time parsing of generated files with ``n_items`` ideas and as many stories.
+    
+    Args:
+        n_items: Ideas in IDEAS.md and user stories in BACKLOG.md
+        seed: Random seed of the generator
+        repeat: Runs per file; the fastest one is reported
+        
+    Returns:
+        Report entry for this size
+    """
+    ideas_text, backlog_text, _ = generate_files(n_items, n_items, 0.05, 0.2, seed)
+    megabytes = (len(ideas_text.encode("utf-8")) + len(backlog_text.encode("utf-8"))) / 1e6
+    
+    ideas_seconds = stories_seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ideas = MarkdownParser.parse_ideas(ideas_text)
+        middle = time.perf_counter()
+        stories = MarkdownParser.parse_user_stories(backlog_text)
+        end = time.perf_counter()
+        ideas_seconds = min(ideas_seconds, middle - start)
+        stories_seconds = min(stories_seconds, end - middle)
+    
+    seconds = ideas_seconds + stories_seconds
+    return {
+        "items": n_items,
+        "megabytes": round(megabytes, 3),
+        "ideas": len(ideas),
+        "user_stories": len(stories),
+        "ideas_seconds": round(ideas_seconds, 4),
+        "stories_seconds": round(stories_seconds, 4),
+        "seconds_per_mb": round(seconds / megabytes, 4),
+    }
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser(description="IDEAS.md/BACKLOG.md parsing benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 2000, 4000, 8000],
+                        help='Ideas and stories per run (default: 1000 2000 4000 8000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size, fastest reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', type=Path, help='Write the JSON report to this file')
+    args = parser.parse_args()
+    
+    runs = [time_parse(size, args.seed, max(1, args.repeat)) for size in sorted(args.sizes)]
+    report = {
+        "benchmark": "parse",
+        "python": platform.python_version(),
+        "runs": runs,
+        "scaling": round(runs[-1]["seconds_per_mb"] / runs[0]["seconds_per_mb"], 2),
+    }
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Scale benchmark for the idea processor.
+
+For each size, generates synthetic IDEAS.md and BACKLOG.md files (see
+``synthetic.py``), runs ``IdeaProcessor.process_ideas`` on them and reports
+the stage timings of its metrics report: loading, parsing, near-duplicate
+detection, retrieval, adjudication, clustering, user story generation and
+file writing. Generation and AI adjudication never reach a real provider: the local engine is used by
+default, and ``--provider openai|gemini`` runs against the stand-in server
+from ``fake_provider.py``. The per-model rate limits are lifted for those
+runs, so the timings measure the pipeline rather than the token buckets;
+``--keep-rate-limits`` restores them.
+
+The JSON report can be saved with ``--output`` and compared with a previous
+one with ``--baseline``; the process exits with status 1 when a stage got
+slower than the tolerance allows.
+
+Usage:
+    python -m scripts.idea_processor.benchmarks.scale [options]
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, List
+
+# Add repository root to path to allow imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from scripts.idea_processor import processor as processor_module
+from scripts.idea_processor.benchmarks.fake_provider import FakeProvider, FakeProviderServer
+from scripts.idea_processor.benchmarks.synthetic import generate_files
+from scripts.idea_processor.config import config
+from scripts.idea_processor.parser import save_file_content
+
+
+# Stages of the processor's metrics report (see instrumentation.py)
+STAGES = ["load", "parse", "near_duplicates", "retrieval", "adjudication", "clustering", "generation", "write"]
+
+
+def run_size(n_ideas: int, n_stories: int, args: argparse.Namespace) -> Dict:
+    """
+    Generate files of one size and run the processor on them.
+    
+    Stage timings and counts come from the run's metrics report, so they
+    measure ``IdeaProcessor.process_ideas`` itself. Every size starts from an
+    empty state directory.
+    
+    Args:
+        n_ideas: Number of ideas in IDEAS.md
+        n_stories: Number of user stories in BACKLOG.md
+        args: Parsed command-line options
+        
+    Returns:
+        Report entry for this size
+    """
+    started = time.perf_counter()
+    ideas_text, backlog_text, planted = generate_files(
+        n_ideas, n_stories, args.pending_ratio, args.duplicate_ratio, args.seed
+    )
+    save_file_content(config.ideas_file, ideas_text)
+    save_file_content(config.backlog_file, backlog_text)
+    generate_seconds = time.perf_counter() - started
+    shutil.rmtree(config.state_dir, ignore_errors=True)
+    
+    duplicate_ideas, generated = processor_module.IdeaProcessor().process_ideas()
+    metrics = json.loads(config.metrics_file.read_text(encoding="utf-8"))
+    counters, stages = metrics["counters"], metrics["stages"]
+    
+    flagged = {idea.id for idea in duplicate_ideas}
+    found = sum(1 for idea_id in planted if idea_id in flagged)
+    return {
+        "ideas": counters.get("ideas", 0),
+        "ideas_parsed": counters.get("ideas_parsed", 0),
+        "user_stories": counters.get("user_stories", 0),
+        "pending_ideas": counters.get("ideas_to_process", 0),
+        "ideas_bytes": len(ideas_text.encode("utf-8")),
+        "backlog_bytes": len(backlog_text.encode("utf-8")),
+        "duplicates_found": len(duplicate_ideas),
+        "planted_duplicates": len(planted),
+        "planted_recall": round(found / len(planted), 4) if planted else 1.0,
+        "clusters": counters.get("clusters", 0),
+        "stories_generated": len(generated),
+        "generate_files_seconds": round(generate_seconds, 4),
+        "stages": stages,
+        "total_seconds": metrics["total_seconds"],
+        "providers": metrics["providers"],
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float, min_seconds: float) -> List[str]:
+    """
+    List the stages that got slower than a baseline report allows.
+    
+    Args:
+        report: Report of this run
+        baseline: Earlier report with the same sizes
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+        min_seconds: Stages faster than this in both runs are ignored (noise)
+        
+    Returns:
+        One message per regression
+    """
+    previous = {(run["ideas"], run["user_stories"]): run for run in baseline.get("runs", [])}
+    regressions = []
+    for run in report["runs"]:
+        old = previous.get((run["ideas"], run["user_stories"]))
+        if old is None:
+            continue
+        for stage in STAGES:
+            new_seconds, old_seconds = run["stages"].get(stage, 0.0), old["stages"].get(stage, 0.0)
+            if max(new_seconds, old_seconds) < min_seconds:
+                continue
+            if new_seconds > old_seconds * (1 + tolerance):
+                regressions.append(
+                    f"{run['ideas']} ideas / {run['user_stories']} stories: {stage} "
+                    f"{old_seconds:.3f}s -> {new_seconds:.3f}s"
+                )
+    return regressions
+
+
+def main():
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser(description="Idea processor scale benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help='Ideas per run; BACKLOG.md gets the same number of stories (default: 1000 10000)')
+    parser.add_argument('--stories-ratio', type=float, default=1.0, help='User stories per idea (default: 1.0)')
+    parser.add_argument('--pending-ratio', type=float, default=0.05, help='Share of ideas "Por refinar" (default: 0.05)')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.2, help='Share of pending ideas planted as duplicates (default: 0.2)')
+    parser.add_argument('--provider', choices=['local', 'openai', 'gemini'], default='local',
+                        help='local engine, or an AI provider against the stand-in server (default: local)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Stand-in server latency per request (default: 0)')
+    parser.add_argument('--keep-rate-limits', action='store_true',
+                        help='Throttle stand-in server requests with the configured per-model rate limits')
+    parser.add_argument('--concurrency', type=int, default=config.max_concurrency, help='Ideas adjudicated / stories generated in parallel')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--output', type=Path, help='Write the JSON report to this file')
+    parser.add_argument('--baseline', type=Path, help='Earlier report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown against the baseline (default: 0.25)')
+    parser.add_argument('--min-seconds', type=float, default=0.05, help='Ignore stages faster than this (default: 0.05)')
+    args = parser.parse_args()
+    
+    work_dir = Path(tempfile.mkdtemp(prefix="idea_processor_bench_"))
+    
+    # Isolated, cold state: files and every state path (caches, journals,
+    # manifest, metrics) under the work directory, nothing reused between runs
+    for name, value in config.model_dump().items():
+        if isinstance(value, Path) and value.is_relative_to(config.state_dir) and name != "state_dir":
+            setattr(config, name, work_dir / ".idea_processor" / value.relative_to(config.state_dir))
+    config.state_dir = work_dir / ".idea_processor"
+    config.ideas_file = work_dir / "IDEAS.md"
+    config.backlog_file = work_dir / "BACKLOG.md"
+    config.ai_provider = args.provider
+    config.max_concurrency = max(1, args.concurrency)
+    config.dry_run = False
+    config.incremental = False
+    config.resume = False
+    config.use_embedding_cache = False
+    config.use_verdict_cache = False
+    config.metrics_report = True
+    processor_module.console.quiet = True
+    
+    server = None
+    if args.provider != "local":
+        server = FakeProviderServer(FakeProvider(latency_ms=args.latency_ms, seed=args.seed))
+        if not args.keep_rate_limits:
+            config.rate_limits = {}
+            config.default_rate_limit = (0, 0)  # Unlimited
+    
+    report = {
+        "benchmark": "scale",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "provider": args.provider,
+        "concurrency": config.max_concurrency,
+        "rate_limits": args.provider != "local" and args.keep_rate_limits,
+        "pending_ratio": args.pending_ratio,
+        "duplicate_ratio": args.duplicate_ratio,
+        "seed": args.seed,
+        "runs": [],
+    }
+    
+    with server or nullcontext():
+        if server is not None:
+            config.provider_base_url = server.url
+        for size in args.sizes:
+            report["runs"].append(
+                run_size(size, max(1, int(size * args.stories_ratio)), args)
+            )
+        if server is not None:
+            report["provider_requests"] = dict(server.provider.stats)
+    
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+    
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance, args.min_seconds)
+        for message in regressions:
+            print(f"REGRESSION: {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Synthetic IDEAS.md and BACKLOG.md generator for scale benchmarks.
+
+Files follow the current format: priority sections, ``### [ID-XXX]`` ideas
+with their field list, and ``#### US-XXX`` stories (rendered with
+``UserStory.to_markdown``) with acceptance criteria and technical notes.
+Texts are combined from a DJ/Spotify domain vocabulary, so unrelated items
+share a few words as in the real files, and a configurable share of the
+pending ideas are planted, lightly reworded duplicates of existing stories
+or of earlier ideas.
+"""
+
+import random
+from typing import Dict, List, Tuple
+
+from scripts.idea_processor.models import AcceptanceCriteria, UserStory
+
+
+ACTORS = [
+    "DJ profesional", "DJ amateur", "organizador de eventos", "venue manager",
+    "productor musical", "oyente de la sesión", "administrador del sistema",
+    "técnico de sonido", "curador de playlists", "promotor de fiestas",
+]
+ACTIONS = [
+    "sincronizar", "exportar", "importar", "filtrar", "ordenar", "compartir",
+    "programar", "analizar", "visualizar", "etiquetar", "agrupar", "buscar",
+    "recomendar", "grabar", "mezclar", "sugerir", "archivar", "monitorear",
+    "configurar", "transmitir",
+]
+OBJECTS = [
+    "playlists colaborativas", "cue points", "historial de sesiones", "tracks favoritos",
+    "transiciones entre canciones", "loops rítmicos", "presets de ecualizador",
+    "colas de reproducción", "metadatos de BPM", "claves armónicas", "efectos de audio",
+    "dispositivos conectados", "estadísticas de escucha", "peticiones del público",
+    "sets grabados", "crossfades", "samples personalizados", "mapeos MIDI",
+    "listas de reproducción offline", "visualizaciones de espectro", "luces del venue",
+    "tokens de autenticación", "perfiles de usuario", "notificaciones en vivo",
+    "reportes de regalías",
+]
+QUALIFIERS = [
+    "en tiempo real", "desde el controlador MIDI", "sin conexión", "entre dispositivos",
+    "con un solo clic", "durante el set en vivo", "desde la app móvil",
+    "por género musical", "según la energía del público", "con Rekordbox",
+    "por franja horaria", "para múltiples usuarios", "con baja latencia",
+    "desde la consola web", "al terminar la sesión",
+]
+PROBLEMS = [
+    "hoy el proceso es manual y lento", "Spotify API no lo expone directamente",
+    "se pierde información entre sesiones", "los errores solo se detectan en vivo",
+    "la latencia actual interrumpe el flujo", "no hay visibilidad del estado",
+    "cada venue usa una configuración distinta", "los datos quedan dispersos",
+    "el límite de la API se alcanza en horas pico", "no existe trazabilidad de cambios",
+]
+VALUES = [
+    "sets más fluidos y profesionales", "menos interrupciones durante el evento",
+    "ahorro de tiempo en la preparación", "mejor experiencia para el público",
+    "decisiones basadas en datos", "menor riesgo de errores en vivo",
+    "mayor retención de usuarios", "operación predecible en cualquier venue",
+]
+INTEGRATIONS = [
+    "Serato", "Traktor", "Ableton Link", "Pioneer CDJ", "Twitch", "Discord", "Slack",
+    "Google Calendar", "SoundCloud", "Beatport", "Shazam", "Philips Hue", "OBS Studio",
+    "Instagram Live", "Mixcloud", "Last.fm", "Zapier", "Notion", "WhatsApp", "Telegram",
+]
+SITUATIONS = [
+    "el venue tiene más de 500 asistentes", "hay cambios de DJ cada hora",
+    "el set dura más de cuatro horas", "la red del club se satura",
+    "se usan dos laptops en cabina", "el evento se transmite por streaming",
+    "el público pide canciones por chat", "la fiesta es al aire libre",
+    "el catálogo supera las 10000 canciones", "varios DJs comparten la misma cuenta",
+    "el controlador se desconecta", "hay un festival con varios escenarios",
+    "el cliente exige reportes al día siguiente", "la cabina no tiene pantalla",
+    "se tocan sets back to back",
+]
+AUDIENCES = [
+    "residentes de clubes", "DJs de bodas", "productores independientes", "radios online",
+    "agencias de eventos", "escuelas de DJ", "bares con música en vivo", "festivales",
+    "gimnasios y estudios de baile", "hoteles y lounges", "creadores de podcasts",
+    "equipos de soporte",
+]
+EPICS = [
+    "Integración con Spotify", "Control de Playback", "Sincronización en Tiempo Real",
+    "Integración DJ Hardware", "Gestión de Contenido", "UI/UX DJ",
+    "Analytics y Reporting", "Integración DJ Software",
+]
+SERVICES = [
+    "Spotify Integration API", "Playback Control API", "Session Sync API",
+    "MIDI Bridge API", "Analytics API", "Notification API", "User Profile API",
+]
+NOTES = [
+    "Publicar {event} en el bus de eventos", "Consumir {event} desde {service}",
+    "Aplicar patrón Outbox para {event}", "Cachear respuestas de {service}",
+    "Validar permisos con OAuth 2.0 antes de llamar a {service}",
+    "Registrar métricas de latencia de {service}",
+]
+SYNONYMS = {
+    "sincronizar": "coordinar", "exportar": "descargar", "filtrar": "seleccionar",
+    "compartir": "publicar", "analizar": "evaluar", "visualizar": "mostrar",
+    "buscar": "encontrar", "grabar": "registrar", "sugerir": "proponer",
+    "en tiempo real": "al instante", "sin conexión": "offline",
+    "con un solo clic": "rápidamente", "playlists colaborativas": "playlists compartidas",
+}
+
+PRIORITIES = [
+    ("Alta 🔴", "## 🔴 Ideas - Alta Prioridad", "### 🔴 Prioridad Alta - Crítico"),
+    ("Media 🟡", "## 🟡 Ideas - Media Prioridad", "### 🟡 Prioridad Media - Importante"),
+    ("Baja 🟢", "## 🟢 Ideas - Baja Prioridad", "### 🟢 Prioridad Baja - Mejoras"),
+]
+
+
+def _sentence(rng: random.Random) -> Tuple[str, str, str]:
+    """Pick (action, object, qualifier) for a new item."""
+    return rng.choice(ACTIONS), rng.choice(OBJECTS), rng.choice(QUALIFIERS)
+
+
+def _reword(text: str, rng: random.Random) -> str:
+    """Swap in synonyms and drop a trailing word, as a human copy-edit would."""
+    for word, synonym in SYNONYMS.items():
+        if word in text and rng.random() < 0.7:
+            text = text.replace(word, synonym)
+    words = text.split()
+    if len(words) > 6 and rng.random() < 0.5:
+        words.pop()
+    return " ".join(words)
+
+
+def make_user_stories(count: int, seed: int = 0) -> List[UserStory]:
+    """
+    Generate user stories spread over the three priorities.
+    
+    Args:
+        count: Number of stories
+        seed: Random seed
+        
+    Returns:
+        Stories numbered US-001 onwards
+    """
+    rng = random.Random(seed)
+    stories = []
+    for number in range(1, count + 1):
+        action, obj, qualifier = _sentence(rng)
+        service = rng.choice(SERVICES)
+        event = "".join(part.capitalize() for part in obj.split()[:2]) + "UpdatedEvent"
+        story = UserStory(
+            id=f"US-{number:03d}",
+            title=f"{action.capitalize()} {obj} {qualifier}",
+            as_a=rng.choice(ACTORS),
+            i_want=f"{action} {obj} {qualifier} usando {rng.choice(INTEGRATIONS)}",
+            so_that=f"lograr {rng.choice(VALUES)} para {rng.choice(AUDIENCES)} cuando {rng.choice(SITUATIONS)}",
+            acceptance_criteria=[
+                AcceptanceCriteria(text=f"Puedo {action} {obj} {qualifier}", completed=False),
+                AcceptanceCriteria(text=f"Veo confirmación cuando {obj} cambian de estado", completed=False),
+                AcceptanceCriteria(text=f"Si {rng.choice(PROBLEMS)}, recibo un mensaje descriptivo", completed=False),
+                AcceptanceCriteria(text=f"La operación responde en <{rng.choice([200, 500, 1000])}ms", completed=rng.random() < 0.2),
+            ],
+            estimation=rng.choice([1, 2, 3, 5, 8, 13]),
+            epic=rng.choice(EPICS),
+            priority=PRIORITIES[number % 3][0],
+            affected_services=sorted(set(rng.sample(SERVICES, 2)) | {service}),
+            dependencies=[f"US-{rng.randint(1, number - 1):03d}"] if number > 1 and rng.random() < 0.3 else [],
+            status=rng.choice(["To Do", "To Do", "To Do", "In Progress", "Done"]),
+            technical_notes=[
+                rng.choice(NOTES).format(event=event, service=service)
+                for _ in range(rng.randint(1, 3))
+            ],
+        )
+        stories.append(story)
+    return stories
+
+
+def render_backlog(stories: List[UserStory]) -> str:
+    """
+    Render stories as a BACKLOG.md with the usual sections.
+    
+    Args:
+        stories: Stories to include, grouped by their priority
+        
+    Returns:
+        BACKLOG.md content
+    """
+    lines = [
+        "# 📋 Product Backlog - Benchmark sintético",
+        "",
+        "> Archivo generado para benchmarks de escala.",
+        "",
+        "## Backlog por Prioridad",
+        "",
+    ]
+    for priority, _, section in PRIORITIES:
+        lines.append(section)
+        lines.append("")
+        lines.extend(story.to_markdown() for story in stories if story.priority == priority)
+    lines += [
+        "## Estado del Kanban Board",
+        "",
+        "### 📋 To Do (Backlog)",
+        "",
+        "## Historial de Cambios",
+        "",
+        "| Fecha | Cambio | Autor |",
+        "|-------|--------|-------|",
+        "| 2025-11-14 | Backlog sintético | Benchmark |",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def make_ideas(
+    count: int,
+    stories: List[UserStory],
+    pending_ratio: float = 0.1,
+    duplicate_ratio: float = 0.2,
+    seed: int = 0
+) -> Tuple[List[Dict[str, str]], Dict[str, str]]:
+    """
+    Generate ideas, a share of them pending and some planted duplicates.
+    
+    Args:
+        count: Number of ideas
+        stories: Existing stories (converted ideas point at them; duplicates copy them)
+        pending_ratio: Share of ideas still "Por refinar"
+        duplicate_ratio: Share of pending ideas that reword an existing item
+        seed: Random seed
+        
+    Returns:
+        Tuple of (idea field dictionaries in file order, mapping of planted
+        duplicate idea ID to the ID of the item it copies)
+    """
+    rng = random.Random(seed + 1)
+    ideas: List[Dict[str, str]] = []
+    # Pending ideas that are not copies themselves; converted and repeated
+    # ideas are represented in the corpus by their story or original instead
+    originals: List[Dict[str, str]] = []
+    planted: Dict[str, str] = {}
+    
+    for number in range(1, count + 1):
+        idea_id = f"ID-{number:03d}"
+        pending = rng.random() < pending_ratio
+        source = None
+        if pending and rng.random() < duplicate_ratio:
+            if stories and (not originals or rng.random() < 0.7):
+                source = rng.choice(stories)
+                fields = {
+                    "title": _reword(source.title, rng),
+                    "context": f"{source.as_a} necesita {_reword(source.i_want, rng)}",
+                    "problem": source.acceptance_criteria[2].text,
+                    "value": _reword(source.so_that, rng),
+                    "priority": source.priority,
+                }
+                planted[idea_id] = source.id
+            else:
+                source = rng.choice(originals)
+                fields = {key: _reword(value, rng) for key, value in source.items() if key in ("title", "context", "problem", "value")}
+                fields["priority"] = source["priority"]
+                planted[idea_id] = source["id"]
+        if source is None:
+            action, obj, qualifier = _sentence(rng)
+            fields = {
+                "title": f"{action.capitalize()} {obj} {qualifier}",
+                "context": f"{rng.choice(ACTORS)} necesita {action} {obj} usando {rng.choice(INTEGRATIONS)}",
+                "problem": f"{rng.choice(PROBLEMS)} cuando {rng.choice(SITUATIONS)}",
+                "value": f"{rng.choice(VALUES)} para {rng.choice(AUDIENCES)}",
+                "priority": rng.choice(PRIORITIES)[0],
+            }
+        
+        if pending:
+            status = "💭 Por refinar"
+        elif stories and rng.random() < 0.8:
+            status = f"✅ Convertida a {rng.choice(stories).id}"
+        else:
+            status = "⚠️ Repetida - Similar a US-001 (similitud: 85%)"
+        idea = {"id": idea_id, "status": status, "date": "2025-11-14", **fields}
+        ideas.append(idea)
+        if pending and idea_id not in planted:
+            originals.append(idea)
+    
+    return ideas, planted
+
+
+def render_ideas(ideas: List[Dict[str, str]]) -> str:
+    """
+    Render ideas as an IDEAS.md with priority sections.
+    
+    Args:
+        ideas: Idea field dictionaries from ``make_ideas``
+        
+    Returns:
+        IDEAS.md content
+    """
+    lines = [
+        "# 💡 Captura de Ideas - Benchmark sintético",
+        "",
+        "> Archivo generado para benchmarks de escala.",
+        "",
+        "---",
+        "",
+    ]
+    for priority, section, _ in PRIORITIES:
+        lines.append(section)
+        lines.append("")
+        for idea in ideas:
+            if idea["priority"] != priority:
+                continue
+            lines += [
+                f"### [{idea['id']}] {idea['title']}",
+                f"- **Contexto**: {idea['context']}",
+                f"- **Problema**: {idea['problem']}",
+                f"- **Valor**: {idea['value']}",
+                f"- **Fecha**: {idea['date']}",
+                f"- **Estado**: {idea['status']}",
+                "",
+            ]
+        lines += ["---", ""]
+    lines += [
+        "## 📊 Estadísticas",
+        "",
+        f"- **Total Ideas Capturadas**: {len(ideas)}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def generate_files(
+    n_ideas: int,
+    n_stories: int,
+    pending_ratio: float = 0.1,
+    duplicate_ratio: float = 0.2,
+    seed: int = 0
+) -> Tuple[str, str, Dict[str, str]]:
+    """
+    Generate a matching pair of IDEAS.md and BACKLOG.md contents.
+    
+    Args:
+        n_ideas: Number of ideas
+        n_stories: Number of user stories
+        pending_ratio: Share of ideas still "Por refinar"
+        duplicate_ratio: Share of pending ideas planted as duplicates
+        seed: Random seed
+        
+    Returns:
+        Tuple of (IDEAS.md content, BACKLOG.md content, planted duplicates)
+    """
+    stories = make_user_stories(n_stories, seed)
+    ideas, planted = make_ideas(n_ideas, stories, pending_ratio, duplicate_ratio, seed)
+    return render_ideas(ideas), render_backlog(stories), planted
@@ -0,0 +1,300 @@
+"""
+Persistent caches shared across processor runs.
+"""
+
+import atexit
+import hashlib
+import sqlite3
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def content_hash(*parts: str) -> str:
+    """
+    Compute a stable SHA-256 digest over one or more text parts.
+    
+    Args:
+        parts: Text fragments to hash (separated so ("ab", "c") != ("a", "bc"))
+        
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class _SqliteLRUCache:
+    """
+    SQLite table with least-recently-used eviction.
+    
+    Subclasses set ``table`` and ``columns``; every table gets a ``key``
+    primary key and a ``last_used`` timestamp maintained here.
+    """
+    
+    table = ""
+    columns = ""
+    
+    def __init__(self, path: Path, max_entries: int):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        # Keys whose last_used timestamp still has to be written back
+        self._touched: Set[str] = set()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                key TEXT PRIMARY KEY,
+                {self.columns},
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_last_used ON {self.table} (last_used)"
+        )
+        self._conn.commit()
+        self._closed = False
+        
+        # Make sure recency updates from read-only runs are persisted
+        atexit.register(self.close)
+    
+    def __len__(self) -> int:
+        return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+    
+    def close(self) -> None:
+        """Persist pending LRU timestamps and close the database connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._flush_touched()
+        self._conn.commit()
+        self._conn.close()
+    
+    def _select(self, key: str, fields: str) -> Optional[tuple]:
+        """Fetch ``fields`` for a key, counting the hit or miss."""
+        row = self._conn.execute(
+            f"SELECT {fields} FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+        else:
+            self._touched.add(key)
+            self.hits += 1
+        return row
+    
+    def _insert(self, fields: str, rows: List[tuple]) -> None:
+        """Insert or replace (key, *values) rows in one transaction."""
+        # Flush reads first so they are stamped as older than this write
+        self._flush_touched()
+        now = time.time()
+        placeholders = ", ".join("?" * (len(rows[0]) + 1))
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO {self.table} (key, {fields}, last_used) VALUES ({placeholders})",
+            [tuple(row) + (now,) for row in rows]
+        )
+        self._evict()
+        self._conn.commit()
+    
+    def _flush_touched(self) -> None:
+        """Write back last_used for entries read since the previous flush."""
+        if not self._touched:
+            return
+        
+        now = time.time()
+        self._conn.executemany(
+            f"UPDATE {self.table} SET last_used = ? WHERE key = ?",
+            [(now, key) for key in self._touched]
+        )
+        self._touched.clear()
+    
+    def _evict(self) -> None:
+        """Drop least recently used entries above ``max_entries``."""
+        if self.max_entries <= 0:
+            return
+        
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"""DELETE FROM {self.table} WHERE key IN (
+                    SELECT key FROM {self.table} ORDER BY last_used ASC LIMIT ?
+                )""",
+                (overflow,)
+            )
+
+
+class EmbeddingCache(_SqliteLRUCache):
+    """
+    On-disk, content-addressed cache of embedding vectors.
+    
+    Entries are keyed by a hash of the embedding model, the requested
+    dimensions and the text itself, so editing an idea or switching models
+    never returns a stale vector. The cache is bounded to ``max_entries``
+    rows and evicts the least recently used ones first.
+    """
+    
+    table = "embeddings"
+    columns = "vector BLOB NOT NULL"
+    
+    def __init__(
+        self,
+        path: Path,
+        model: str,
+        dimensions: Optional[int] = None,
+        max_entries: int = 20000
+    ):
+        super().__init__(path, max_entries)
+        self.model = model
+        self.dimensions = dimensions
+        
+        # Vectors already loaded during this run
+        self._memory: Dict[str, List[float]] = {}
+    
+    def key(self, text: str) -> str:
+        """Return the cache key for a text under the current model settings."""
+        return content_hash(self.model, str(self.dimensions or ""), text)
+    
+    def get(self, text: str) -> Optional[List[float]]:
+        """
+        Look up the embedding for a text.
+        
+        Args:
+            text: Text that was embedded
+            
+        Returns:
+            Embedding vector, or None if it is not cached
+        """
+        key = self.key(text)
+        if key in self._memory:
+            self._touched.add(key)
+            self.hits += 1
+            return self._memory[key]
+        
+        row = self._select(key, "vector")
+        if row is None:
+            return None
+        
+        vector = self._decode(row[0])
+        self._memory[key] = vector
+        return vector
+    
+    def put(self, text: str, vector: List[float]) -> None:
+        """
+        Store the embedding for a text, evicting old entries if needed.
+        
+        Args:
+            text: Text that was embedded
+            vector: Embedding vector returned by the provider
+        """
+        self.put_many({text: vector})
+    
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        """
+        Store several embeddings in a single transaction.
+        
+        Args:
+            items: Mapping of text to embedding vector
+        """
+        if not items:
+            return
+        
+        rows = []
+        for text, vector in items.items():
+            key = self.key(text)
+            self._memory[key] = list(vector)
+            rows.append((key, self._encode(vector)))
+        
+        self._insert("vector", rows)
+    
+    @staticmethod
+    def _encode(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+    
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+
+class VerdictCache(_SqliteLRUCache):
+    """
+    On-disk cache of AI duplicate verdicts for (idea, existing item) pairs.
+    
+    Entries are keyed by the hashes of both texts exactly as they are sent
+    in the prompt, plus the chat model and the version of the prompt that
+    produced the verdict (``prompt_version`` unless the caller names another,
+    e.g. the batched prompt). Editing either item, switching models or
+    changing the prompt misses the cache and triggers a fresh adjudication.
+    """
+    
+    table = "verdicts"
+    columns = "score REAL NOT NULL, reason TEXT NOT NULL"
+    
+    def __init__(
+        self,
+        path: Path,
+        model: str,
+        prompt_version: str,
+        max_entries: int = 50000
+    ):
+        super().__init__(path, max_entries)
+        self.model = model
+        self.prompt_version = prompt_version
+    
+    def key(self, idea_text: str, item_text: str, prompt_version: Optional[str] = None) -> str:
+        """Return the cache key for a pair of prompt-rendered texts."""
+        return content_hash(
+            self.model,
+            prompt_version or self.prompt_version,
+            content_hash(idea_text),
+            content_hash(item_text)
+        )
+    
+    def get(
+        self,
+        idea_text: str,
+        item_text: str,
+        prompt_version: Optional[str] = None
+    ) -> Optional[Tuple[float, str]]:
+        """
+        Look up a previous verdict.
+        
+        Args:
+            idea_text: The new idea as rendered in the prompt
+            item_text: The existing item as rendered in the prompt
+            prompt_version: Version of the prompt sent (the cache's by default)
+            
+        Returns:
+            Tuple of (similarity_score, reasoning), or None if not cached
+        """
+        row = self._select(self.key(idea_text, item_text, prompt_version), "score, reason")
+        return (row[0], row[1]) if row is not None else None
+    
+    def put(
+        self,
+        idea_text: str,
+        item_text: str,
+        score: float,
+        reason: str,
+        prompt_version: Optional[str] = None
+    ) -> None:
+        """
+        Store a verdict, evicting old entries if needed.
+        
+        Args:
+            idea_text: The new idea as rendered in the prompt
+            item_text: The existing item as rendered in the prompt
+            score: Similarity score returned by the model
+            reason: Explanation returned by the model
+            prompt_version: Version of the prompt sent (the cache's by default)
+        """
+        key = self.key(idea_text, item_text, prompt_version)
+        self._insert("score, reason", [(key, score, reason)])
@@ -0,0 +1,144 @@
+"""
+Append-only checkpoint journal of a processing run.
+
+Every similarity verdict and every generated user story is appended to a
+JSONL file as soon as it completes. When a run is interrupted (Ctrl+C, a
+quota error, a crash), the next run with ``--resume`` reuses them instead of
+calling the provider again. Entries are keyed by the idea's content hash, so
+an idea edited in between is processed again; a change of the settings that
+affect verdicts discards the whole journal.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .models import Idea, UserStory, SimilarityResult
+from .manifest import item_hash, settings_fingerprint
+
+
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointJournal:
+    """
+    Verdicts and user stories of the current run, persisted as they complete.
+    
+    Record with ``record_verdict`` and ``record_story``; look up work done
+    by an interrupted run with ``verdict`` and ``story``. Call ``clear``
+    once the run's results are written to IDEAS.md and BACKLOG.md.
+    """
+    
+    def __init__(self, path: Path, resume: bool = False):
+        """
+        Open the journal.
+        
+        Args:
+            path: JSONL file of the journal
+            resume: Keep the entries of the previous run (otherwise start empty)
+        """
+        self.path = Path(path)
+        self.settings = settings_fingerprint()
+        self.verdicts: Dict[str, List[SimilarityResult]] = {}
+        self.stories: Dict[str, UserStory] = {}
+        self._lock = threading.Lock()
+        
+        entries = self._load() if resume else []
+        if entries and entries[0].get("settings") == self.settings:
+            for entry in entries[1:]:
+                if entry.get("type") == "verdict":
+                    self.verdicts[entry["key"]] = [SimilarityResult(**result) for result in entry["results"]]
+                elif entry.get("type") == "story":
+                    self.stories[entry["key"]] = UserStory(**entry["story"])
+            self.resumed = len(self.verdicts) + len(self.stories)
+            # Rewrite the valid entries so new ones never follow a torn line
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(
+                "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries),
+                encoding="utf-8"
+            )
+            tmp_path.replace(self.path)
+        else:
+            self.resumed = 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+            self._append({"type": "run", "version": CHECKPOINT_VERSION, "settings": self.settings})
+    
+    def verdict(self, idea: Idea) -> Optional[List[SimilarityResult]]:
+        """Similarity results recorded for an idea, if it is unchanged since."""
+        return self.verdicts.get(self._key(idea))
+    
+    def story(self, idea: Idea, us_number: int) -> Optional[UserStory]:
+        """
+        User story recorded for an idea, if it is unchanged since.
+        
+        Args:
+            idea: Idea to convert
+            us_number: US number reserved for the idea in this run
+            
+        Returns:
+            The recorded story, renumbered to ``us_number``, or None
+        """
+        user_story = self.stories.get(self._key(idea))
+        if user_story is None:
+            return None
+        return user_story.model_copy(update={"id": f"US-{us_number:03d}"})
+    
+    def record_verdict(self, idea: Idea, results: List[SimilarityResult]) -> None:
+        """Append the similarity results of an adjudicated idea."""
+        key = self._key(idea)
+        self.verdicts[key] = results
+        self._append({
+            "type": "verdict",
+            "key": key,
+            "idea_id": idea.id,
+            "results": [result.model_dump() for result in results]
+        })
+    
+    def record_story(self, idea: Idea, user_story: UserStory) -> None:
+        """Append the user story generated from an idea."""
+        key = self._key(idea)
+        self.stories[key] = user_story
+        self._append({
+            "type": "story",
+            "key": key,
+            "idea_id": idea.id,
+            "story": user_story.model_dump()
+        })
+    
+    def clear(self) -> None:
+        """Delete the journal; its work is now in the output files."""
+        self.path.unlink(missing_ok=True)
+        self.verdicts = {}
+        self.stories = {}
+    
+    def _append(self, entry: Dict) -> None:
+        """Append one entry and flush it to disk (safe across threads)."""
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def _load(self) -> List[Dict]:
+        """Read the journal entries; a line torn by a crash ends the journal."""
+        entries = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+        except OSError:
+            return []
+        if entries and entries[0].get("version") != CHECKPOINT_VERSION:
+            return []
+        return entries
+    
+    @staticmethod
+    def _key(idea: Idea) -> str:
+        return f"{idea.id}:{item_hash(idea)}"
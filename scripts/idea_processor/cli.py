@@ -7,6 +7,16 @@ Usage:
 
 Options:
     --dry-run: Run without modifying files (preview mode)
+    --provider: Similarity/generation provider (openai, gemini or local)
+    --prefilter: Shortlist candidates with the local lexical engine first
+    --no-cache: Disable the on-disk embedding and AI verdict caches
+    --incremental: Only re-check ideas and corpus items changed since the last run
+    --resume: Reuse the verdicts and stories of an interrupted run
+    --store: Mirror the files in a SQLite store for indexed lookups and retrieval
+    --concurrency: Ideas checked and stories generated in parallel (1 = sequential)
+    --base-url: Send provider requests to a compatible server (e.g. the local stand-in)
+    --metrics: Write the run metrics (stage timings, API calls, tokens) to this file
+    --otel: Also emit the stages and API calls as OpenTelemetry spans
     --help: Show this help message
 """
 
@@ -41,8 +51,21 @@ Examples:
   # Use custom threshold for similarity
   python -m scripts.idea_processor.cli --threshold 0.85
 
+  # Continue a run interrupted by Ctrl+C or a quota error, without repeating API calls
+  python -m scripts.idea_processor.cli --resume
+
+  # Offline run with the local lexical engine (no API key needed)
+  python -m scripts.idea_processor.cli --provider local --dry-run
+
+  # Offline run against the stand-in server (benchmarks/fake_provider.py)
+  python -m scripts.idea_processor.cli --base-url http://127.0.0.1:8765 --dry-run
+
 Environment Variables:
-  OPENAI_API_KEY: Required - Your OpenAI API key for similarity checking
+  AI_PROVIDER: openai (default), gemini or local
+  OPENAI_API_KEY: Required with AI_PROVIDER=openai
+  GEMINI_API_KEY: Required with AI_PROVIDER=gemini
+  METRICS_REPORT: 0 to skip the metrics report (default: .idea_processor/metrics.json)
+  OTEL_TRACES: 1 to emit OpenTelemetry spans
         """
     )
     
@@ -59,6 +82,65 @@ Environment Variables:
         help='Similarity threshold for duplicates (0.0-1.0, default: 0.80)'
     )
     
+    parser.add_argument(
+        '--provider',
+        choices=['openai', 'gemini', 'local'],
+        help='Similarity/generation provider (default: AI_PROVIDER or openai)'
+    )
+    
+    parser.add_argument(
+        '--prefilter',
+        action='store_true',
+        help='Shortlist candidates with the local lexical engine before AI adjudication'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Disable the on-disk embedding and AI verdict caches (always call the API)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only re-check new or edited ideas, against corpus items changed since their last verdict'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Reuse the verdicts and user stories journaled by an interrupted run (.idea_processor/checkpoint.jsonl)'
+    )
+    
+    parser.add_argument(
+        '--store',
+        action='store_true',
+        help='Sync ideas and stories into .idea_processor/backlog.sqlite3 and query it (FTS5 prefilter, stored embeddings, ID allocation)'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='Ideas checked and user stories generated in parallel (default: MAX_CONCURRENCY or 4, 1 = sequential)'
+    )
+    
+    parser.add_argument(
+        '--base-url',
+        help='Root URL of an OpenAI/Gemini-compatible server, e.g. benchmarks/fake_provider.py (default: PROVIDER_BASE_URL)'
+    )
+    
+    parser.add_argument(
+        '--metrics',
+        type=Path,
+        help='Write the JSON metrics report here (default: .idea_processor/metrics.json)'
+    )
+    
+    parser.add_argument(
+        '--otel',
+        action='store_true',
+        help='Emit stages and API calls as OpenTelemetry spans (requires opentelemetry-api)'
+    )
+    
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -71,9 +153,40 @@ Environment Variables:
     config.dry_run = args.dry_run
     config.similarity_threshold = args.threshold
     config.verbose = args.verbose
+    if args.no_cache:
+        config.use_embedding_cache = False
+        config.use_verdict_cache = False
+    
+    if args.incremental:
+        config.incremental = True
+    if args.resume:
+        config.resume = True
+    if args.store:
+        config.backlog_store = True
+    if args.concurrency is not None:
+        config.max_concurrency = max(1, args.concurrency)
+    
+    if args.provider:
+        config.ai_provider = args.provider
+    if args.prefilter:
+        config.local_prefilter = True
+    if args.base_url:
+        config.provider_base_url = args.base_url
+    if args.metrics:
+        config.metrics_report = True
+        config.metrics_file = args.metrics
+    if args.otel:
+        config.otel_traces = True
+    
+    # Validate the API key for the selected provider (the local provider needs none)
+    # A compatible server given with --base-url/PROVIDER_BASE_URL needs no key either
+    if config.ai_provider == "gemini" and not config.gemini_api_key and not config.provider_base_url:
+        console.print("\n[bold red]Error:[/bold red] GEMINI_API_KEY environment variable is not set.\n")
+        console.print("Please set it with your Gemini API key:")
+        console.print("  export GEMINI_API_KEY='your-api-key-here'\n")
+        sys.exit(1)
     
-    # Validate OpenAI API key
-    if not config.openai_api_key:
+    if config.ai_provider == "openai" and not config.openai_api_key and not config.provider_base_url:
         console.print("\n[bold red]Error:[/bold red] OPENAI_API_KEY environment variable is not set.\n")
         console.print("Please set it with your OpenAI API key:")
         console.print("  export OPENAI_API_KEY='your-api-key-here'\n")
@@ -94,6 +207,8 @@ Environment Variables:
         duplicate_ideas, generated_stories = processor.process_ideas()
         
         console.print("\n[bold green]✅ Process completed successfully![/bold green]\n")
+        if config.metrics_report:
+            console.print(f"📊 Run metrics written to {config.metrics_file}\n")
         
         if args.dry_run:
             console.print("[yellow]Note: This was a dry run. No files were modified.[/yellow]")
@@ -103,9 +218,13 @@ Environment Variables:
         
     except KeyboardInterrupt:
         console.print("\n\n[yellow]Process interrupted by user.[/yellow]\n")
+        if config.checkpoint_file.exists():
+            console.print("[yellow]Run again with --resume to continue where it stopped.[/yellow]\n")
         sys.exit(1)
     except Exception as e:
         console.print(f"\n[bold red]Error:[/bold red] {str(e)}\n")
+        if config.checkpoint_file.exists():
+            console.print("[yellow]Completed work was saved; run again with --resume to continue.[/yellow]\n")
         if args.verbose:
             import traceback
             console.print(traceback.format_exc())
@@ -0,0 +1,166 @@
+"""
+Intra-batch duplicate clustering.
+
+When several new ideas duplicate each other, checking each one on its own
+compares every pair twice (A against B, then B against A) and can mark both
+ideas as duplicates of each other, so neither becomes a user story. This
+module keeps a single direction per unordered pair of batch ideas, groups
+transitive duplicates with union-find and picks one representative idea per
+cluster to go on to story generation.
+"""
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .models import Idea, SimilarityResult
+
+
+class UnionFind:
+    """Disjoint sets over ``0..size-1`` with path halving and union by size."""
+    
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+    
+    def find(self, x: int) -> int:
+        """Return the root of the set containing ``x``."""
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+    
+    def union(self, a: int, b: int) -> None:
+        """Merge the sets containing ``a`` and ``b``."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+    
+    def groups(self) -> List[List[int]]:
+        """Return all sets, each sorted, ordered by their smallest member."""
+        members: Dict[int, List[int]] = {}
+        for x in range(len(self.parent)):
+            members.setdefault(self.find(x), []).append(x)
+        return sorted(members.values(), key=lambda group: group[0])
+
+
+def dedupe_pair_candidates(
+    ideas: Sequence[Idea],
+    candidates: Dict[str, List[Tuple]]
+) -> Dict[str, List[Tuple]]:
+    """
+    Keep one direction of every unordered pair of batch ideas.
+    
+    If idea A lists idea B as a candidate and B (later in the batch) also
+    lists A, only A -> B is adjudicated; ``cluster_duplicates`` applies the
+    verdict to both ideas.
+    
+    Args:
+        ideas: Ideas being checked, in batch order
+        candidates: Mapping of idea ID to (item, score) candidates
+        
+    Returns:
+        A new candidate mapping with reversed batch pairs removed
+    """
+    batch_ids = {idea.id for idea in ideas}
+    seen_pairs: Set[frozenset] = set()
+    deduped: Dict[str, List[Tuple]] = {}
+    
+    for idea in ideas:
+        if idea.id in deduped:
+            continue
+        kept = []
+        for item, score in candidates.get(idea.id, []):
+            if isinstance(item, Idea) and item.id in batch_ids:
+                pair = frozenset((idea.id, item.id))
+                if pair in seen_pairs:
+                    continue
+                seen_pairs.add(pair)
+            kept.append((item, score))
+        deduped[idea.id] = kept
+    
+    return deduped
+
+
+def cluster_duplicates(
+    ideas: Sequence[Idea],
+    results: Sequence[List[SimilarityResult]]
+) -> Tuple[List[Optional[SimilarityResult]], List[List[int]]]:
+    """
+    Decide which batch ideas are duplicates, grouping them transitively.
+    
+    Duplicate verdicts between two batch ideas join their clusters. In a
+    cluster with no member duplicating an existing item, the first idea (in
+    batch order) is the representative and stays unique; the other members
+    are marked as duplicates of it. If some member already duplicates an
+    existing item, no representative is kept and the remaining members
+    point to that member.
+    
+    Args:
+        ideas: Ideas being processed, in batch order
+        results: Similarity results per idea (highest score first)
+        
+    Returns:
+        Tuple of (the result that makes each idea a duplicate, or None if it
+        is unique; clusters with more than one idea, as lists of positions)
+    """
+    positions: Dict[str, List[int]] = {}
+    for position, idea in enumerate(ideas):
+        positions.setdefault(idea.id, []).append(position)
+    
+    union_find = UnionFind(len(ideas))
+    links: Dict[int, SimilarityResult] = {}
+    external: List[Optional[SimilarityResult]] = [None] * len(ideas)
+    
+    for position, idea_results in enumerate(results):
+        for result in idea_results:
+            if not result.is_duplicate:
+                continue
+            
+            if result.similar_item_id not in positions:
+                # Best duplicate among user stories and ideas outside the batch
+                if external[position] is None:
+                    external[position] = result
+                continue
+            
+            for other in positions[result.similar_item_id]:
+                if other == position:
+                    continue
+                union_find.union(position, other)
+                
+                # Keep the strongest internal link for both ends of the pair
+                for source, target in ((position, other), (other, position)):
+                    current = links.get(source)
+                    if current is None or result.similarity_score > current.similarity_score:
+                        links[source] = result.model_copy(update={
+                            "idea_id": ideas[source].id,
+                            "similar_item_id": ideas[target].id
+                        })
+    
+    decisions: List[Optional[SimilarityResult]] = list(external)
+    clusters = [group for group in union_find.groups() if len(group) > 1]
+    
+    for group in clusters:
+        covered = [position for position in group if external[position] is not None]
+        if covered:
+            representative = None
+            anchor = max(covered, key=lambda position: external[position].similarity_score)
+        else:
+            representative = anchor = group[0]
+        
+        for position in group:
+            if position == representative or external[position] is not None:
+                continue
+            
+            link = links[position]
+            reason = link.reason
+            if link.similar_item_id != ideas[anchor].id:
+                reason = f"Mismo grupo de duplicados que {ideas[anchor].id} (vía {link.similar_item_id}): {link.reason}"
+            decisions[position] = link.model_copy(update={
+                "similar_item_id": ideas[anchor].id,
+                "reason": reason
+            })
+    
+    return decisions, clusters
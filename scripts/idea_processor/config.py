@@ -4,6 +4,7 @@ Configuration for the idea processor.
 
 import os
 from pathlib import Path
+from typing import Dict, Optional, Tuple
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
@@ -11,6 +12,37 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+# Requests and tokens per minute for each model (0 = unlimited). The defaults
+# match the lowest paid tiers; RATE_LIMITS="model=rpm:tpm,..." overrides them.
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-4o": (500, 30_000),
+    "gpt-4o-mini": (500, 200_000),
+    "text-embedding-3-small": (3_000, 1_000_000),
+    "text-embedding-3-large": (3_000, 1_000_000),
+    "gemini-1.5-pro": (1_000, 4_000_000),
+    "gemini-1.5-flash": (2_000, 4_000_000),
+    "models/text-embedding-004": (1_500, 0),
+}
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parse a ``model=rpm:tpm`` comma-separated list over the default limits.
+    
+    Args:
+        spec: Value of the RATE_LIMITS environment variable
+        
+    Returns:
+        Mapping of model name to (requests per minute, tokens per minute)
+    """
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        model, _, values = entry.rpartition("=")
+        rpm, _, tpm = values.partition(":")
+        limits[model.strip()] = (int(rpm or 0), int(tpm or 0))
+    return limits
+
+
 class Config(BaseModel):
     """Configuration settings for idea processor."""
     
@@ -20,27 +52,131 @@ class Config(BaseModel):
     backlog_file: Path = repo_root / "BACKLOG.md"
     backlog_template_file: Path = repo_root / "docs" / "backlog-template.md"
     
+    # Local state shared across runs (caches, indexes)
+    state_dir: Path = repo_root / ".idea_processor"
+    
+    # Journal of the IDEAS.md + BACKLOG.md commit, used to recover an interrupted write
+    commit_journal_file: Path = state_dir / "commit-journal.json"
+    
     # AI Provider selection
-    ai_provider: str = os.getenv("AI_PROVIDER", "openai")  # "openai" or "gemini"
+    ai_provider: str = os.getenv("AI_PROVIDER", "openai")  # "openai", "gemini" or "local"
     
     # OpenAI settings
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     openai_model: str = "gpt-4o"
     embedding_model: str = "text-embedding-3-small"
+    embedding_dimensions: Optional[int] = int(os.getenv("EMBEDDING_DIMENSIONS", "0")) or None
+    embedding_batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))  # Inputs per request
+    embedding_batch_max_tokens: int = 100_000  # Estimated tokens per request
     
     # Gemini settings
     gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
     gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
+    gemini_embedding_model: str = os.getenv("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004")
+    gemini_embedding_dimensions: Optional[int] = int(os.getenv("GEMINI_EMBEDDING_DIMENSIONS", "0")) or None
+    gemini_embedding_batch_size: int = 100  # batchEmbedContents accepts up to 100 inputs
+    gemini_retrieval: str = os.getenv("GEMINI_RETRIEVAL", "embedding")  # "embedding" or "none" (LLM on every pair)
+    
+    # Provider clients shared by the checkers and generators
+    provider_base_url: str = os.getenv("PROVIDER_BASE_URL", "")  # e.g. the local stand-in server (benchmarks/fake_provider.py)
+    rate_limits: Dict[str, Tuple[int, int]] = parse_rate_limits(os.getenv("RATE_LIMITS", ""))
+    default_rate_limit: Tuple[int, int] = (60, 100_000)  # Models missing from rate_limits
+    completion_token_estimate: int = 500  # Output tokens reserved per chat request
+    provider_max_retries: int = int(os.getenv("PROVIDER_MAX_RETRIES", "5"))  # Retries on 429/5xx/timeouts
+    retry_base_delay: float = 1.0  # Seconds; doubled on every attempt, with full jitter
+    retry_max_delay: float = 60.0
+    request_timeout: float = float(os.getenv("REQUEST_TIMEOUT", "60"))
     
     # Similarity threshold (0.0 - 1.0)
     similarity_threshold: float = 0.80  # Ideas with similarity > 80% are marked as duplicates
     
+    # AI adjudication: score all candidates of an idea in one request
+    batch_adjudication: bool = os.getenv("BATCH_ADJUDICATION", "1") != "0"
+    adjudication_batch_size: int = int(os.getenv("ADJUDICATION_BATCH_SIZE", "10"))  # Candidates per request
+    
+    # Concurrency: ideas adjudicated and user stories generated in parallel (1 = sequential)
+    max_concurrency: int = int(os.getenv("MAX_CONCURRENCY", "4"))
+    
+    # Lazy parsing: index every idea's header and status, and only parse the
+    # pending ones and the comparison corpus (converted and repeated ideas are skipped)
+    lazy_parsing: bool = os.getenv("LAZY_PARSING", "1") != "0"
+    
+    # Streaming writes: stage the updated BACKLOG.md piece by piece instead of
+    # building the full updated content in memory first
+    streaming_writes: bool = os.getenv("STREAMING_WRITES", "0") == "1"
+    
+    # Checkpoint journal: similarity verdicts and generated stories are appended
+    # as they complete; with RESUME=1 (--resume) an interrupted run picks up from it
+    checkpoints: bool = os.getenv("CHECKPOINTS", "1") != "0"
+    resume: bool = os.getenv("RESUME", "0") == "1"
+    checkpoint_file: Path = state_dir / "checkpoint.jsonl"
+    
+    # SQLite mirror of IDEAS.md/BACKLOG.md with an FTS5 index and stored embeddings,
+    # synced incrementally at the start of every run (the markdown stays the source of truth)
+    backlog_store: bool = os.getenv("BACKLOG_STORE", "0") == "1"
+    store_file: Path = state_dir / "backlog.sqlite3"
+    
+    # Incremental mode: only re-check ideas and corpus items changed since the last run
+    incremental: bool = os.getenv("INCREMENTAL", "0") == "1"
+    manifest_file: Path = state_dir / "manifest.json"
+    
+    # Near-verbatim duplicates found with MinHash/LSH before any AI call
+    near_duplicate_detection: bool = os.getenv("NEAR_DUPLICATES", "1") != "0"
+    near_duplicate_threshold: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.80"))  # Shingle Jaccard
+    shingle_size: int = 3  # Words per shingle
+    minhash_permutations: int = 128
+    lsh_bands: int = 32  # 4 rows per band: pairs above ~0.4 Jaccard become candidates
+    
+    # Local lexical similarity (AI_PROVIDER=local, or prefilter for AI providers)
+    local_similarity_threshold: float = float(os.getenv("LOCAL_SIMILARITY_THRESHOLD", "0.60"))
+    local_prefilter: bool = os.getenv("LOCAL_PREFILTER", "0") == "1"
+    local_prefilter_top_k: int = int(os.getenv("LOCAL_PREFILTER_TOP_K", "30"))
+    local_prefilter_min_score: float = 0.05
+    
+    # Similarity join settings
+    similarity_top_k: int = int(os.getenv("SIMILARITY_TOP_K", "10"))  # Candidates per idea sent to AI (0 = no limit)
+    similarity_join_block_size: int = 1024  # Rows per block in the matrix multiply
+    
+    # Approximate nearest-neighbour index, used once the corpus is large
+    ann_index: str = os.getenv("ANN_INDEX", "ivf")  # "exact", "ivf" or "hnsw"
+    ann_min_items: int = int(os.getenv("ANN_MIN_ITEMS", "5000"))
+    ann_index_dir: Path = state_dir / "ann"
+    ann_nprobe: int = 12  # IVF clusters scanned per query
+    ann_ef_search: int = 64  # HNSW search breadth
+    
+    # Embedding cache settings
+    use_embedding_cache: bool = os.getenv("EMBEDDING_CACHE", "1") != "0"
+    embedding_cache_file: Path = state_dir / "embeddings.sqlite3"
+    embedding_cache_max_entries: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "20000"))
+    
+    # AI verdict cache settings (one entry per compared idea/item pair)
+    use_verdict_cache: bool = os.getenv("VERDICT_CACHE", "1") != "0"
+    verdict_cache_file: Path = state_dir / "verdicts.sqlite3"
+    verdict_cache_max_entries: int = int(os.getenv("VERDICT_CACHE_MAX_ENTRIES", "50000"))
+    
+    # Run metrics (stage timings, provider calls, tokens, cache hit rates)
+    metrics_report: bool = os.getenv("METRICS_REPORT", "1") != "0"
+    metrics_file: Path = state_dir / "metrics.json"
+    otel_traces: bool = os.getenv("OTEL_TRACES", "0") == "1"  # Also emit OpenTelemetry spans
+    
     # Output settings
     verbose: bool = True
     dry_run: bool = False  # If True, don't modify files
     
     class Config:
         arbitrary_types_allowed = True
+    
+    def ann_index_options(self) -> dict:
+        """Constructor options for the configured ANN index type."""
+        if self.ann_index == "ivf":
+            return {"nprobe": self.ann_nprobe}
+        if self.ann_index == "hnsw":
+            return {"ef_search": self.ann_ef_search}
+        return {"block_size": self.similarity_join_block_size}
+    
+    def rate_limit(self, model: str) -> Tuple[int, int]:
+        """(requests, tokens) per minute allowed for a model."""
+        return self.rate_limits.get(model, self.default_rate_limit)
 
 
 # Global config instance
@@ -0,0 +1,248 @@
+"""
+Helpers shared by the embedding-based similarity checkers.
+"""
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .models import Idea, UserStory
+from .config import config
+from .cache import EmbeddingCache, content_hash
+from .ann_index import load_or_build_index
+from .similarity_join import normalize_matrix, top_k_join
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a text.
+    
+    Uses the usual ~4 characters per token heuristic, which is close enough
+    to keep batched requests under the provider's per-request token limit.
+    
+    Args:
+        text: Text to measure
+        
+    Returns:
+        Estimated token count (at least 1)
+    """
+    return max(1, len(text) // 4)
+
+
+def iter_embedding_batches(
+    texts: List[str],
+    max_items: int,
+    max_tokens: int
+) -> Iterator[List[str]]:
+    """
+    Split texts into size-bounded batches for multi-input embedding requests.
+    
+    Batches preserve input order. A single text larger than ``max_tokens`` is
+    still sent on its own rather than dropped.
+    
+    Args:
+        texts: Texts to embed
+        max_items: Maximum number of inputs per request
+        max_tokens: Maximum estimated tokens per request
+        
+    Yields:
+        Lists of texts, each one request worth
+    """
+    batch: List[str] = []
+    batch_tokens = 0
+    
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append(text)
+        batch_tokens += tokens
+    
+    if batch:
+        yield batch
+
+
+class EmbeddingRetrievalMixin:
+    """
+    Embedding-based candidate retrieval shared by the AI similarity checkers.
+    
+    Subclasses call ``_init_embeddings`` from their constructor and implement
+    ``_embed_batch`` for their provider. The mixin takes care of caching,
+    batching and the similarity join / ANN lookup.
+    """
+    
+    def _init_embeddings(
+        self,
+        model: str,
+        batch_size: int,
+        index_name: str,
+        dimensions: Optional[int] = None
+    ) -> None:
+        """
+        Set up embedding state.
+        
+        Args:
+            model: Embedding model name (part of every cache key)
+            batch_size: Maximum inputs per embedding request
+            index_name: Subdirectory of ``config.ann_index_dir`` for this provider
+            dimensions: Requested vector size, if not the model's default (part of every cache key)
+        """
+        self.embedding_model = model
+        self.embedding_dimensions = dimensions
+        self.embedding_batch_size = batch_size
+        self.ann_index_name = index_name
+        
+        self.embedding_cache = None
+        if config.use_embedding_cache:
+            self.embedding_cache = EmbeddingCache(
+                config.embedding_cache_file,
+                model=model,
+                dimensions=dimensions,
+                max_entries=config.embedding_cache_max_entries
+            )
+        
+        # Vectors computed for the current corpus, keyed by text
+        self.embeddings: Dict[str, List[float]] = {}
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Send one multi-input embedding request; vectors in input order."""
+        raise NotImplementedError
+    
+    def get_embedding(self, text: str) -> List[float]:
+        """
+        Get embedding vector for a single text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector as list of floats
+        """
+        return self.get_embeddings([text])[0]
+    
+    def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Get embedding vectors for many texts using batched requests.
+        
+        Cached and repeated texts are only looked up once; the remaining
+        texts are sent in multi-input requests bounded by the provider batch
+        size and ``config.embedding_batch_max_tokens``.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding vectors in the same order as ``texts``
+        """
+        vectors: Dict[str, List[float]] = {}
+        missing = []
+        
+        for text in dict.fromkeys(texts):
+            cached = self.embedding_cache.get(text) if self.embedding_cache is not None else None
+            if cached is not None:
+                vectors[text] = cached
+            else:
+                missing.append(text)
+        
+        for batch in iter_embedding_batches(
+            missing,
+            max_items=self.embedding_batch_size,
+            max_tokens=config.embedding_batch_max_tokens
+        ):
+            batch_vectors = dict(zip(batch, self._embed_batch(batch)))
+            vectors.update(batch_vectors)
+            
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(batch_vectors)
+        
+        return [vectors[text] for text in texts]
+    
+    def prepare_corpus(self, ideas: List[Idea], user_stories: List[UserStory]) -> None:
+        """
+        Embed every idea and user story up front in batched requests.
+        
+        ``find_candidates`` then reads these precomputed vectors instead of
+        calling the embedding API inside its loops.
+        
+        Args:
+            ideas: All parsed ideas
+            user_stories: All parsed user stories
+        """
+        self._embed_items(list(ideas) + list(user_stories))
+    
+    def find_candidates(
+        self,
+        ideas: List[Idea],
+        user_stories: List[UserStory],
+        other_ideas: List[Idea] = None
+    ) -> Dict[str, List[Tuple[UserStory | Idea, float]]]:
+        """
+        Retrieve the most similar existing items for many ideas at once.
+        
+        All embeddings are packed into normalized float32 matrices and scored
+        with a single blocked similarity join (or, for corpora of at least
+        ``config.ann_min_items`` items, an approximate nearest-neighbour
+        index persisted next to BACKLOG.md). Only the top
+        ``config.similarity_top_k`` items scoring within 0.1 of the threshold
+        are kept as candidates for AI adjudication.
+        
+        Args:
+            ideas: Ideas to check
+            user_stories: List of existing user stories
+            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            
+        Returns:
+            Mapping of idea ID to (item, embedding similarity) candidates,
+            highest similarity first
+        """
+        corpus: List[UserStory | Idea] = list(user_stories) + list(other_ideas or [])
+        embeddings = self._embed_items(list(ideas) + corpus)
+        
+        query_matrix = normalize_matrix([embeddings[idea.full_text] for idea in ideas])
+        corpus_matrix = normalize_matrix(
+            [embeddings[item.full_text] for item in corpus],
+            dimensions=query_matrix.shape[1]
+        )
+        
+        # Never match an idea against itself
+        idea_rows = {item.id: row for row, item in enumerate(corpus) if isinstance(item, Idea)}
+        exclude = [idea_rows.get(idea.id, -1) for idea in ideas]
+        
+        min_score = config.similarity_threshold - 0.1  # Check slightly below threshold
+        
+        if config.ann_index != "exact" and len(corpus) >= config.ann_min_items:
+            # Large backlog: query the persisted approximate index instead
+            index = load_or_build_index(
+                config.ann_index,
+                config.ann_index_dir / self.ann_index_name,
+                ids=[item.id for item in corpus],
+                fingerprints=[
+                    content_hash(self.embedding_model, str(self.embedding_dimensions or ""), item.full_text)
+                    for item in corpus
+                ],
+                matrix=corpus_matrix,
+                **config.ann_index_options()
+            )
+            neighbours = index.search(query_matrix, config.similarity_top_k, min_score, exclude)
+        else:
+            neighbours = top_k_join(
+                query_matrix,
+                corpus_matrix,
+                k=config.similarity_top_k,
+                min_score=min_score,
+                block_size=config.similarity_join_block_size,
+                exclude=exclude
+            )
+        
+        return {
+            idea.id: [(corpus[row], score) for row, score in matches]
+            for idea, matches in zip(ideas, neighbours)
+        }
+    
+    def _embed_items(self, items: Sequence[Idea | UserStory]) -> Dict[str, List[float]]:
+        """Make sure every item's full_text has a vector in ``self.embeddings``."""
+        missing = [item.full_text for item in items if item.full_text not in self.embeddings]
+        if missing:
+            unique = list(dict.fromkeys(missing))
+            self.embeddings.update(zip(unique, self.get_embeddings(unique)))
+        return self.embeddings
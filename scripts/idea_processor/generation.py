@@ -0,0 +1,39 @@
+"""
+Parallel user story generation shared by the generators.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from .models import Idea, UserStory
+
+
+def generate_user_stories_parallel(
+    generate: Callable[[Idea, int], UserStory],
+    ideas: List[Idea],
+    starting_us_number: int,
+    max_workers: int
+) -> List[UserStory]:
+    """
+    Generate user stories for several ideas with a pool of worker threads.
+    
+    Every idea gets its US number reserved up front (``starting_us_number``
+    plus its position), so numbering matches a sequential run exactly even
+    when completions finish out of order. Results are returned in input order.
+    
+    Args:
+        generate: A generator's ``generate_user_story`` method
+        ideas: Ideas to convert, in backlog order
+        starting_us_number: US number for the first idea
+        max_workers: Maximum concurrent generation requests (1 = sequential)
+        
+    Returns:
+        Generated UserStory objects, one per idea, in input order
+    """
+    us_numbers = [starting_us_number + i for i in range(len(ideas))]
+    
+    if max_workers <= 1 or len(ideas) <= 1:
+        return [generate(idea, number) for idea, number in zip(ideas, us_numbers)]
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(ideas))) as executor:
+        return list(executor.map(generate, ideas, us_numbers))
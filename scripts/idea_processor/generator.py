@@ -4,21 +4,18 @@ User story generator - converts ideas into formal user stories.
 
 import json
 from typing import List
-from openai import OpenAI
 from .models import Idea, UserStory, AcceptanceCriteria
 from .config import config
 from .parser import MarkdownParser
+from .generation import generate_user_stories_parallel
+from .providers import ProviderError, get_provider
 
 
 class UserStoryGenerator:
     """Generate formal user stories from ideas."""
     
     def __init__(self):
-        if not config.openai_api_key:
-            raise ValueError(
-                "OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
-            )
-        self.client = OpenAI(api_key=config.openai_api_key)
+        self.provider = get_provider("openai")
     
     def generate_user_story(
         self,
@@ -106,24 +103,15 @@ IMPORTANTE:
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model=config.openai_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """Eres un Product Owner senior experto en metodologías ágiles y arquitectura de microservicios.
-Tu especialidad es escribir historias de usuario claras, concisas y accionables que el equipo de desarrollo pueda implementar sin ambigüedades."""
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            response = self.provider.complete(
+                prompt,
+                system="""Eres un Product Owner senior experto en metodologías ágiles y arquitectura de microservicios.
+Tu especialidad es escribir historias de usuario claras, concisas y accionables que el equipo de desarrollo pueda implementar sin ambigüedades.""",
                 temperature=0.5,
-                response_format={"type": "json_object"}
+                json_mode=True
             )
             
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(response)
             
             # Convert to UserStory object
             acceptance_criteria = [
@@ -152,6 +140,8 @@ Tu especialidad es escribir historias de usuario claras, concisas y accionables
             
             return user_story
             
+        except ProviderError:
+            raise
         except Exception as e:
             print(f"Error generating user story: {e}")
             # Return a basic user story if AI generation fails
@@ -189,6 +179,9 @@ Tu especialidad es escribir historias de usuario claras, concisas y accionables
         """
         Generate user stories for multiple ideas.
         
+        Up to ``config.max_concurrency`` requests run in parallel; US numbers
+        are assigned by position, exactly as in a sequential run.
+        
         Args:
             ideas: List of ideas to convert
             starting_us_number: Starting US number
@@ -196,11 +189,9 @@ Tu especialidad es escribir historias de usuario claras, concisas y accionables
         Returns:
             List of generated UserStory objects
         """
-        user_stories = []
-        
-        for i, idea in enumerate(ideas):
-            us_number = starting_us_number + i
-            user_story = self.generate_user_story(idea, us_number)
-            user_stories.append(user_story)
-        
-        return user_stories
+        return generate_user_stories_parallel(
+            self.generate_user_story,
+            ideas,
+            starting_us_number,
+            max_workers=config.max_concurrency
+        )
@@ -4,22 +4,18 @@ User story generator using Google Gemini API - converts ideas into formal user s
 
 import json
 from typing import List
-import google.generativeai as genai
 from .models import Idea, UserStory, AcceptanceCriteria
 from .config import config
 from .parser import MarkdownParser
+from .generation import generate_user_stories_parallel
+from .providers import ProviderError, get_provider
 
 
 class GeminiUserStoryGenerator:
     """Generate formal user stories from ideas using Gemini."""
     
     def __init__(self):
-        if not config.gemini_api_key:
-            raise ValueError(
-                "Gemini API key not found. Please set GEMINI_API_KEY environment variable."
-            )
-        genai.configure(api_key=config.gemini_api_key)
-        self.model = genai.GenerativeModel(config.gemini_model)
+        self.provider = get_provider("gemini")
     
     def generate_user_story(
         self,
@@ -107,9 +103,8 @@ IMPORTANTE:
 """
         
         try:
-            response = self.model.generate_content(prompt)
             # Extract JSON from response
-            text = response.text.strip()
+            text = self.provider.complete(prompt).strip()
             # Remove markdown code blocks if present
             if text.startswith("```"):
                 text = text.split("```")[1]
@@ -146,6 +141,8 @@ IMPORTANTE:
             
             return user_story
             
+        except ProviderError:
+            raise
         except Exception as e:
             print(f"Error generating user story with Gemini: {e}")
             # Return a basic user story if AI generation fails
@@ -183,6 +180,9 @@ IMPORTANTE:
         """
         Generate user stories for multiple ideas.
         
+        Up to ``config.max_concurrency`` requests run in parallel; US numbers
+        are assigned by position, exactly as in a sequential run.
+        
         Args:
             ideas: List of ideas to convert
             starting_us_number: Starting US number
@@ -190,11 +190,9 @@ IMPORTANTE:
         Returns:
             List of generated UserStory objects
         """
-        user_stories = []
-        
-        for i, idea in enumerate(ideas):
-            us_number = starting_us_number + i
-            user_story = self.generate_user_story(idea, us_number)
-            user_stories.append(user_story)
-        
-        return user_stories
+        return generate_user_stories_parallel(
+            self.generate_user_story,
+            ideas,
+            starting_us_number,
+            max_workers=config.max_concurrency
+        )
@@ -0,0 +1,75 @@
+"""
+Offline user story generator - builds template user stories without an LLM.
+"""
+
+from typing import List
+from .models import Idea, UserStory, AcceptanceCriteria
+
+
+class LocalUserStoryGenerator:
+    """Generate draft user stories from ideas without calling an AI provider."""
+    
+    def generate_user_story(
+        self,
+        idea: Idea,
+        next_us_number: int,
+        backlog_template: str = ""
+    ) -> UserStory:
+        """
+        Generate a draft user story from an idea.
+        
+        The story mirrors the idea's fields and is flagged for manual
+        refinement, since no model was involved in writing it.
+        
+        Args:
+            idea: The idea to convert
+            next_us_number: The next available US number
+            backlog_template: Unused, kept for interface compatibility
+            
+        Returns:
+            Generated UserStory object
+        """
+        user_story = UserStory(
+            id=f"US-{next_us_number:03d}",
+            title=idea.title,
+            as_a="usuario del sistema",
+            i_want=f"implementar la siguiente idea: {idea.title}",
+            so_that=idea.value,
+            acceptance_criteria=[
+                AcceptanceCriteria(text=f"Resuelve el problema: {idea.problem}", completed=False),
+                AcceptanceCriteria(text=f"Proporciona el valor: {idea.value}", completed=False)
+            ],
+            estimation=None,
+            epic="Por Definir",
+            priority=idea.priority,
+            affected_services=[],
+            dependencies=[],
+            status="To Do",
+            technical_notes=[
+                f"Esta historia fue generada automáticamente desde {idea.id} sin IA (AI_PROVIDER=local)",
+                "Requiere refinamiento manual"
+            ]
+        )
+        user_story.full_text = f"{user_story.title} {user_story.as_a} {user_story.i_want} {user_story.so_that}"
+        
+        return user_story
+    
+    def generate_multiple_user_stories(
+        self,
+        ideas: List[Idea],
+        starting_us_number: int
+    ) -> List[UserStory]:
+        """
+        Generate user stories for multiple ideas.
+        
+        Args:
+            ideas: List of ideas to convert
+            starting_us_number: Starting US number
+            
+        Returns:
+            List of generated UserStory objects
+        """
+        return [
+            self.generate_user_story(idea, starting_us_number + i)
+            for i, idea in enumerate(ideas)
+        ]
@@ -0,0 +1,252 @@
+"""
+Run instrumentation: stage timings, provider calls, tokens and cache hit rates.
+
+Every run of the processor records the wall time of its stages, and every
+provider request its latency, outcome and token usage (as reported by the
+provider, or estimated when it reports none). The collected metrics are
+written as a JSON report and, with ``OTEL_TRACES=1``, stages and requests
+are also emitted as OpenTelemetry spans, following ADR 010
+(observability-first architecture). Spans go to the tracer provider
+configured by the application, e.g. through ``opentelemetry-instrument``.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .config import config
+
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# (input tokens, output tokens) reported by a provider for one request
+Usage = Optional[Tuple[int, int]]
+
+
+class CallRecord:
+    """Outcome of one provider request, filled in while it runs."""
+    
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.usage: Usage = None
+        self.retry = False
+
+
+class CallStats:
+    """Aggregated requests of one provider operation on one model."""
+    
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.estimated_calls = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    
+    def add(self, record: CallRecord, seconds: float, failed: bool) -> None:
+        """Count one finished request."""
+        self.calls += 1
+        self.errors += failed
+        self.retries += record.retry
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        
+        milliseconds = seconds * 1000
+        bucket = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if milliseconds <= bound),
+            len(LATENCY_BUCKETS_MS)
+        )
+        self.histogram[bucket] += 1
+        
+        if record.usage is not None:
+            self.input_tokens += record.usage[0]
+            self.output_tokens += record.usage[1]
+        elif not failed:
+            self.input_tokens += record.estimated_tokens
+            self.estimated_calls += 1
+    
+    def report(self) -> dict:
+        """JSON-serializable summary."""
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "latency_ms": {
+                "mean": round(self.seconds * 1000 / self.calls, 1) if self.calls else 0.0,
+                "max": round(self.max_seconds * 1000, 1),
+                "histogram": dict(zip(labels, self.histogram)),
+            },
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "estimated_calls": self.estimated_calls,
+        }
+
+
+class Metrics:
+    """Thread-safe collector of the metrics of one processor run."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tracer = None
+        self.reset()
+    
+    def reset(self) -> None:
+        """Discard everything recorded so far and start a new run."""
+        with self._lock:
+            self.started_at = datetime.now(timezone.utc)
+            self._started = time.perf_counter()
+            self.stages: Dict[str, float] = {}
+            self.calls: Dict[Tuple[str, str, str], CallStats] = {}
+            self.caches: Dict[str, Dict[str, float]] = {}
+            self.counters: Dict[str, int] = {}
+            self._stage: Optional[Tuple[str, float, object]] = None
+    
+    @property
+    def tracer(self):
+        """OpenTelemetry tracer, or None when tracing is disabled."""
+        if not config.otel_traces:
+            return None
+        if self._tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError as e:
+                raise ImportError(
+                    "OTEL_TRACES=1 requires OpenTelemetry. Install it with: "
+                    "pip install opentelemetry-api opentelemetry-sdk"
+                ) from e
+            self._tracer = trace.get_tracer("idea_processor")
+        return self._tracer
+    
+    def _start_span(self, name: str, attributes: Dict):
+        tracer = self.tracer
+        return tracer.start_span(name, attributes=attributes) if tracer is not None else None
+    
+    def begin_stage(self, name: str) -> None:
+        """
+        Start timing a pipeline stage, ending the previous one.
+        
+        Args:
+            name: Stage name; time spent in repeated stages is added up
+        """
+        self.end_stage()
+        self._stage = (name, time.perf_counter(), self._start_span(f"idea_processor.{name}", {}))
+    
+    def end_stage(self) -> None:
+        """Stop timing the current stage, if any."""
+        if self._stage is None:
+            return
+        name, started, span = self._stage
+        self._stage = None
+        with self._lock:
+            self.stages[name] = round(self.stages.get(name, 0.0) + time.perf_counter() - started, 4)
+        if span is not None:
+            span.end()
+    
+    @contextmanager
+    def call(self, provider: str, operation: str, model: str, estimated_tokens: int) -> Iterator[CallRecord]:
+        """
+        Time one provider request (usable around sync and async calls alike).
+        
+        Args:
+            provider: Provider name (e.g. "OpenAI")
+            operation: "chat" or "embed"
+            model: Model the request is sent to
+            estimated_tokens: Input tokens counted when the provider reports no usage
+            
+        Yields:
+            Record on which the caller sets the reported usage
+        """
+        record = CallRecord(estimated_tokens)
+        span = self._start_span(f"{provider}.{operation}", {"ai.model": model})
+        started = time.perf_counter()
+        failed = True
+        try:
+            yield record
+            failed = False
+        finally:
+            seconds = time.perf_counter() - started
+            with self._lock:
+                stats = self.calls.setdefault((provider, operation, model), CallStats())
+                stats.add(record, seconds, failed)
+            if span is not None:
+                if record.usage is not None:
+                    span.set_attribute("ai.input_tokens", record.usage[0])
+                    span.set_attribute("ai.output_tokens", record.usage[1])
+                span.set_attribute("error", failed)
+                span.end()
+    
+    def count(self, name: str, value: int = 1) -> None:
+        """Add ``value`` to a named counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def record_cache(self, name: str, cache) -> None:
+        """
+        Record the hit rate of an embedding or verdict cache.
+        
+        Args:
+            name: Cache name in the report
+            cache: Cache with ``hits`` and ``misses`` counters (ignored if None)
+        """
+        if cache is None:
+            return
+        lookups = cache.hits + cache.misses
+        with self._lock:
+            self.caches[name] = {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "hit_rate": round(cache.hits / lookups, 4) if lookups else 0.0,
+            }
+    
+    def report(self) -> dict:
+        """
+        Build the JSON report of the run.
+        
+        Returns:
+            Dictionary with stage timings, provider calls, caches and counters
+        """
+        self.end_stage()
+        with self._lock:
+            providers: Dict[str, List[dict]] = {}
+            for (provider, operation, model), stats in sorted(self.calls.items()):
+                providers.setdefault(provider, []).append(
+                    {"operation": operation, "model": model, **stats.report()}
+                )
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "total_seconds": round(time.perf_counter() - self._started, 4),
+                "provider": config.ai_provider,
+                "stages": dict(self.stages),
+                "providers": providers,
+                "caches": dict(self.caches),
+                "counters": dict(self.counters),
+            }
+    
+    def write(self, path: Path) -> dict:
+        """
+        Write the JSON report to a file.
+        
+        Args:
+            path: Destination file (parent directories are created)
+            
+        Returns:
+            The report that was written
+        """
+        report = self.report()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        return report
+
+
+# Global collector, shared by the processor and the provider clients
+metrics = Metrics()
@@ -0,0 +1,226 @@
+"""
+Per-idea state manifest for incremental processing.
+
+The manifest remembers a content hash for every idea and user story, the run
+in which each hash was first seen, and the similarity results of the last
+check of each idea. On the next run an idea whose text is unchanged only has
+to be compared against corpus items that changed after its last verdict.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from .models import Idea, UserStory, SimilarityResult
+from .config import config
+from .cache import content_hash
+
+
+MANIFEST_VERSION = 1
+
+
+def item_hash(item: Idea | UserStory) -> str:
+    """Return the content hash recorded for an idea or user story."""
+    return content_hash(item.full_text)
+
+
+def settings_fingerprint() -> str:
+    """Hash of the settings that affect verdicts; a change invalidates them all."""
+    if config.ai_provider == "gemini":
+        models = (
+            config.gemini_model,
+            config.gemini_embedding_model,
+            str(config.gemini_embedding_dimensions),
+            config.gemini_retrieval
+        )
+    elif config.ai_provider == "openai":
+        models = (config.openai_model, config.embedding_model, str(config.embedding_dimensions))
+    else:
+        models = ()
+    return content_hash(
+        config.ai_provider,
+        *models,
+        str(config.similarity_threshold),
+        str(config.local_similarity_threshold),
+        str(config.similarity_top_k),
+        str(config.local_prefilter),
+        str(config.batch_adjudication),
+        str(config.near_duplicate_detection),
+        str(config.near_duplicate_threshold)
+    )
+
+
+class ProcessingManifest:
+    """
+    Content hashes and last verdicts persisted between processor runs.
+    
+    Call ``sync`` once per run with the parsed files, then ``needs_check``
+    and ``pending_candidates`` to decide what to adjudicate, ``resolve`` for
+    every processed idea, and finally ``save``.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        data = self._load()
+        
+        self.run: int = data.get("run", 0) + 1
+        self.ideas: Dict[str, Dict] = data.get("ideas", {})
+        self.user_stories: Dict[str, Dict] = data.get("user_stories", {})
+        self.verdicts: Dict[str, Dict] = data.get("verdicts", {})
+        self.latest_change = 0
+        
+        # Verdicts computed under other settings are not reusable
+        self.settings = settings_fingerprint()
+        if data.get("settings") != self.settings:
+            self.verdicts = {}
+    
+    def sync(self, ideas: Sequence[Idea], user_stories: Sequence[UserStory]) -> None:
+        """
+        Record the current content hash of every idea and user story.
+        
+        Items that are new or whose hash changed are stamped with the current
+        run; items no longer present are forgotten.
+        
+        Args:
+            ideas: All parsed ideas
+            user_stories: All parsed user stories
+        """
+        self.ideas = self._stamp(self.ideas, ideas)
+        self.user_stories = self._stamp(self.user_stories, user_stories)
+        current = {self._verdict_key(idea) for idea in ideas}
+        self.verdicts = {
+            key: verdict for key, verdict in self.verdicts.items()
+            if key in current
+        }
+        self.latest_change = max(
+            (record["seen_run"] for record in list(self.ideas.values()) + list(self.user_stories.values())),
+            default=0
+        )
+    
+    def needs_check(self, idea: Idea) -> bool:
+        """
+        Whether an idea has to go through adjudication this run.
+        
+        Args:
+            idea: Idea pending processing
+            
+        Returns:
+            True for new or edited ideas, and for unchanged ideas when some
+            corpus item changed after their last verdict
+        """
+        verdict = self.verdicts.get(self._verdict_key(idea))
+        if verdict is None:
+            return True
+        return self.latest_change > verdict["run"]
+    
+    def pending_candidates(self, idea: Idea, candidates: List[tuple]) -> List[tuple]:
+        """
+        Drop candidates whose verdict from the last run is still valid.
+        
+        Args:
+            idea: Idea being checked
+            candidates: (item, score) pairs from ``find_candidates``
+            
+        Returns:
+            The candidates that still have to be adjudicated
+        """
+        verdict = self.verdicts.get(self._verdict_key(idea))
+        if verdict is None:
+            return candidates
+        return [
+            (item, score) for item, score in candidates
+            if self._record(item)["seen_run"] > verdict["run"]
+        ]
+    
+    def resolve(self, idea: Idea, new_results: List[SimilarityResult]) -> List[SimilarityResult]:
+        """
+        Merge fresh results with still-valid ones from earlier runs and record them.
+        
+        Args:
+            idea: Idea that was processed
+            new_results: Results adjudicated this run (empty if it was skipped)
+            
+        Returns:
+            All similarity results for the idea, highest score first
+        """
+        results = list(new_results)
+        judged = {result.similar_item_id for result in new_results}
+        
+        verdict = self.verdicts.get(self._verdict_key(idea))
+        if verdict is not None:
+            for stored in verdict["results"]:
+                record = self.user_stories.get(stored["similar_item_id"]) or self.ideas.get(stored["similar_item_id"])
+                # Reuse only verdicts whose item is unchanged since it was judged
+                if (
+                    record is not None
+                    and record["hash"] == stored["item_hash"]
+                    and stored["similar_item_id"] not in judged
+                ):
+                    results.append(SimilarityResult(
+                        **{key: value for key, value in stored.items() if key != "item_hash"}
+                    ))
+        
+        merged = sorted(results, key=lambda x: x.similarity_score, reverse=True)
+        
+        self.verdicts[self._verdict_key(idea)] = {
+            "run": self.run,
+            "results": [
+                {**result.model_dump(), "item_hash": self._hash_of(result.similar_item_id)}
+                for result in merged
+            ]
+        }
+        return merged
+    
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({
+                "version": MANIFEST_VERSION,
+                "run": self.run,
+                "settings": self.settings,
+                "ideas": self.ideas,
+                "user_stories": self.user_stories,
+                "verdicts": self.verdicts
+            }, ensure_ascii=False),
+            encoding="utf-8"
+        )
+        tmp_path.replace(self.path)
+    
+    def _load(self) -> Dict:
+        """Read the manifest, starting over if it is missing, corrupt or outdated."""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if data.get("version") == MANIFEST_VERSION else {}
+    
+    def _stamp(self, records: Dict[str, Dict], items: Sequence[Idea | UserStory]) -> Dict[str, Dict]:
+        """Refresh hash records; items sharing an ID are hashed together."""
+        hashes: Dict[str, List[str]] = {}
+        for item in items:
+            hashes.setdefault(item.id, []).append(item_hash(item))
+        
+        stamped = {}
+        for item_id, digests in hashes.items():
+            digest = digests[0] if len(digests) == 1 else content_hash(*digests)
+            previous = records.get(item_id)
+            if previous is not None and previous["hash"] == digest:
+                stamped[item_id] = previous
+            else:
+                stamped[item_id] = {"hash": digest, "seen_run": self.run}
+        return stamped
+    
+    def _record(self, item: Idea | UserStory) -> Dict:
+        records = self.user_stories if isinstance(item, UserStory) else self.ideas
+        return records.get(item.id) or {"hash": item_hash(item), "seen_run": self.run}
+    
+    def _hash_of(self, item_id: str) -> str:
+        record = self.user_stories.get(item_id) or self.ideas.get(item_id)
+        return record["hash"] if record is not None else ""
+    
+    @staticmethod
+    def _verdict_key(idea: Idea) -> str:
+        """Verdicts are keyed by ID and content, so editing an idea discards them."""
+        return f"{idea.id}:{item_hash(idea)}"
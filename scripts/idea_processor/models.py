@@ -2,7 +2,7 @@
 Data models for ideas and user stories.
 """
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from pydantic import BaseModel, Field
 from datetime import date
 
@@ -25,6 +25,9 @@ class Idea(BaseModel):
     similar_to: Optional[str] = None  # Reference to similar US-XXX or ID-XXX
     similarity_score: Optional[float] = None
     
+    # Offsets of the "**Estado**: ..." line in the parsed IDEAS.md content
+    status_span: Optional[Tuple[int, int]] = Field(default=None, exclude=True)
+    
     def __str__(self) -> str:
         return f"{self.id}: {self.title}"
 
@@ -0,0 +1,165 @@
+"""
+MinHash/LSH near-duplicate detection for copy-pasted ideas.
+
+Ideas are often pasted twice with only small edits. Such pairs are found
+here by comparing word shingles, with no API call: every text gets a MinHash
+signature, LSH banding buckets texts that share a band, and only bucket
+collisions have their exact shingle Jaccard similarity computed. Pairs at
+or above the threshold are marked as duplicates; everything else goes on to
+the semantic checkers.
+"""
+
+import zlib
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from .models import Idea, UserStory, SimilarityResult
+from .config import config
+from .text_normalization import normalize_tokens
+
+
+# Mersenne prime for the universal hash family; 32-bit inputs keep a * x + b in int64
+_PRIME = (1 << 31) - 1
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """
+    Split text into overlapping word shingles of normalized tokens.
+    
+    Args:
+        text: Raw idea or user story text
+        size: Words per shingle
+        
+    Returns:
+        Set of shingles (a single shingle for texts shorter than ``size``)
+    """
+    tokens = normalize_tokens(text)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """Jaccard similarity of two sets (0.0 when both are empty)."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSH:
+    """MinHash signatures with a banded LSH index over them."""
+    
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+        self.buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    
+    def signature(self, items: Set[str]) -> np.ndarray:
+        """
+        Compute the MinHash signature of a shingle set.
+        
+        Args:
+            items: Shingles of one text
+            
+        Returns:
+            Array of ``num_perm`` minimum hash values
+        """
+        if not items:
+            return np.full(self.num_perm, _PRIME, dtype=np.int64)
+        
+        hashes = np.fromiter(
+            (zlib.crc32(item.encode("utf-8")) % _PRIME for item in items),
+            dtype=np.int64,
+            count=len(items)
+        )
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+    
+    def insert(self, key: int, signature: np.ndarray) -> None:
+        """Add a signature to every band bucket it falls into."""
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            self.buckets.setdefault((band, chunk), []).append(key)
+    
+    def query(self, signature: np.ndarray) -> Set[int]:
+        """Return the keys sharing at least one band with a signature."""
+        found: Set[int] = set()
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            found.update(self.buckets.get((band, chunk), ()))
+        return found
+
+
+class NearDuplicateDetector:
+    """Mark near-verbatim duplicates of ideas without calling an AI provider."""
+    
+    def __init__(self, threshold: float = None):
+        """
+        Args:
+            threshold: Minimum shingle Jaccard similarity for a duplicate
+                (default ``config.near_duplicate_threshold``)
+        """
+        self.threshold = config.near_duplicate_threshold if threshold is None else threshold
+        self.shingle_size = config.shingle_size
+    
+    def find_near_duplicates(
+        self,
+        ideas: List[Idea],
+        user_stories: List[UserStory],
+        other_ideas: List[Idea] = None
+    ) -> List[List[SimilarityResult]]:
+        """
+        Find near-verbatim copies of each idea among existing items.
+        
+        Between two ideas of the same batch only the later one is reported
+        as the copy, so the earlier one still goes through the semantic
+        check and can become the cluster representative.
+        
+        Args:
+            ideas: Ideas to check, in batch order
+            user_stories: List of existing user stories
+            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            
+        Returns:
+            For each idea, its near duplicates (highest score first); an
+            empty list when it has none
+        """
+        corpus: List[UserStory | Idea] = list(user_stories) + list(other_ideas or [])
+        batch_position = {id(idea): position for position, idea in enumerate(ideas)}
+        
+        lsh = MinHashLSH(num_perm=config.minhash_permutations, bands=config.lsh_bands)
+        corpus_shingles = [shingles(item.full_text, self.shingle_size) for item in corpus]
+        for key, item_shingles in enumerate(corpus_shingles):
+            if item_shingles:
+                lsh.insert(key, lsh.signature(item_shingles))
+        
+        results: List[List[SimilarityResult]] = []
+        for position, idea in enumerate(ideas):
+            idea_shingles = shingles(idea.full_text, self.shingle_size)
+            matches = []
+            if idea_shingles:
+                for key in lsh.query(lsh.signature(idea_shingles)):
+                    item = corpus[key]
+                    # Skip the idea itself and copies that come later in the batch
+                    if item is idea or batch_position.get(id(item), -1) > position:
+                        continue
+                    score = jaccard(idea_shingles, corpus_shingles[key])
+                    if score >= self.threshold:
+                        matches.append(SimilarityResult(
+                            idea_id=idea.id,
+                            similar_item_id=item.id,
+                            similarity_score=score,
+                            is_duplicate=True,
+                            reason=f"Copia casi literal ({score:.0%} de fragmentos de texto en común)"
+                        ))
+            matches.sort(key=lambda x: (-x.similarity_score, x.similar_item_id))
+            results.append(matches)
+        
+        return results
@@ -3,61 +3,299 @@ Parser for IDEAS.md and BACKLOG.md files.
 """
 
 import re
-from typing import List, Tuple
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Match, NamedTuple, Optional, Pattern, Tuple
 from pathlib import Path
 from .models import Idea, UserStory, AcceptanceCriteria
 
 
+# Line tokens of IDEAS.md and BACKLOG.md
+IDEA_HEADER = re.compile(r'\s*#{3,}\s+\[([^\]]+)\]\s+(.+)')   # ### [ID-XXX] Title
+STORY_HEADER = re.compile(r'\s*#{4,}\s+(US-\d+):\s+(.+)')      # #### US-XXX: Title
+HEADING = re.compile(r'[ \t]*#{2,}[ \t]')
+# A field label starting its line (after an optional "- "): **Label**: value,
+# **Label:** value, or the colon-less **Como**/**Quiero**/**Para** of a story;
+# bold words further along the line are part of the value
+LABEL = re.compile(
+    r'[ \t]*(?:- )?\*\*(?:([^*\n]+?):\*\*|([^*\n:]+?)\*\*:|(Como|Quiero|Para)\*\*(?=\s))'
+)
+CHECKBOX = re.compile(r'\[(.)\]\s+(.+)')
+ESTIMATION = re.compile(r'(\d+)\s+Story Points')
+# Whole-document scans; both start with a literal, which the regex engine
+# searches for quickly. A status match only counts when LABEL_PREFIX is all
+# that precedes it on its line, as for any other field label.
+HEADING_MARK = re.compile(r'(###*)[ \t]([^\n]*)')
+STATUS_FIELD = re.compile(r'\*\*Estado(?::\*\*|\*\*:)([^\r\n]*)')
+LABEL_PREFIX = re.compile(r'[ \t]*(?:- )?')
+
+# Priority section markers and the priority of the items below them
+PRIORITY_MARKERS = {"🔴": "Alta 🔴", "🟡": "Media 🟡", "🟢": "Baja 🟢"}
+DEFAULT_PRIORITY = "Media 🟡"
+
+# Idea states: pending ideas are processed; converted and repeated ones are
+# already represented in the corpus by their user story or original
+PENDING_MARKERS = ("Por refinar", "💭")
+SUPERSEDED_MARKERS = ("Convertida", "Repetida")
+
+
+def is_pending(status: str) -> bool:
+    """Whether an idea with this ``Estado`` still has to be processed."""
+    return any(marker in status for marker in PENDING_MARKERS)
+
+
+def is_superseded(status: str) -> bool:
+    """Whether an idea with this ``Estado`` was converted or marked as repeated."""
+    return any(marker in status for marker in SUPERSEDED_MARKERS)
+
+
+class IdeaEntry(NamedTuple):
+    """Header and status of one idea in IDEAS.md, indexed without parsing its fields."""
+    
+    id: str
+    title: str
+    status: str
+    start: int  # Offset of the header line
+    end: int  # Offset of the heading that ends the idea (or of the end of the file)
+    status_span: Optional[Tuple[int, int]]  # "**Estado**: ..." up to the end of its line
+
+
+def heading_lines(content: str) -> Iterator[Tuple[int, Match]]:
+    """
+    Find the heading lines (level 2 or deeper) of a document.
+    
+    Args:
+        content: Markdown document
+        
+    Yields:
+        (offset of the line, match of its ``#`` marks and text) per heading
+    """
+    for match in HEADING_MARK.finditer(content):
+        line_start = content.rfind('\n', 0, match.start()) + 1
+        # "##" in the middle of a line is not a heading
+        if line_start == match.start() or not content[line_start:match.start()].strip(' \t'):
+            yield line_start, match
+
+
+def next_line_value(content: str, position: int, end: int) -> Tuple[str, int]:
+    """
+    Value of a label alone on its line: the next non-blank line, as in ``scan_blocks``.
+    
+    Args:
+        content: Markdown document
+        position: Offset of the end of the label's line
+        end: Offset where the label's block ends
+        
+    Returns:
+        (stripped value, offset of the end of its line), or ("", position) if none
+    """
+    line_start = content.find('\n', position, end) + 1
+    while 0 < line_start < end:
+        line_end = content.find('\n', line_start, end)
+        line_end = end if line_end == -1 else line_end
+        value = content[line_start:line_end].strip()
+        if value:
+            return value, line_start + len(content[line_start:line_end].rstrip('\r'))
+        line_start = line_end + 1
+    return "", position
+
+
+class MarkdownBlock:
+    """
+    One idea or user story, as tokenized from its lines.
+    
+    ``fields`` holds the first value of every bold label; a label alone on
+    its line takes the next non-blank line as value, and the ``- `` list
+    items right below it are collected in ``lists``. ``spans`` holds the
+    offsets of each field, from its label to the end of its value's line.
+    """
+    
+    __slots__ = ("header", "start", "fields", "lists", "spans")
+    
+    def __init__(self, header: Match, start: int):
+        self.header = header
+        self.start = start
+        self.fields: Dict[str, str] = {}
+        self.lists: Dict[str, List[str]] = {}
+        self.spans: Dict[str, Tuple[int, int]] = {}
+
+
+def scan_blocks(content: str, header: Pattern) -> Iterator[MarkdownBlock]:
+    """
+    Tokenize a markdown document into item blocks in a single pass over its lines.
+    
+    A block starts at a line matching ``header`` and ends at the next
+    heading of level 2 or deeper (which may start the next block).
+    
+    Args:
+        content: Markdown document
+        header: Pattern of the line that starts an item (``IDEA_HEADER`` or ``STORY_HEADER``)
+        
+    Yields:
+        One MarkdownBlock per item, in document order
+    """
+    block = None
+    pending = None  # (label, list items, label offset) of a label waiting for the lines below it
+    offset = 0
+    
+    for line in content.split('\n'):
+        start = offset
+        offset += len(line) + 1
+        
+        if '#' in line and HEADING.match(line):
+            if block is not None:
+                yield block
+            match = header.match(line)
+            block = MarkdownBlock(match, start) if match else None
+            pending = None
+            continue
+        if block is None:
+            continue
+        
+        stripped = line.strip()
+        line_end = start + len(line.rstrip('\r'))
+        if pending is not None:
+            label, items, label_start = pending
+            if stripped and label not in block.fields:
+                block.fields[label] = stripped
+                block.spans[label] = (label_start, line_end)
+            if stripped.startswith('- '):
+                items.append(stripped[2:].strip())
+            elif stripped or items:
+                pending = None
+        
+        match = LABEL.match(line) if '**' in line else None
+        if match is not None:
+            label = (match.group(1) or match.group(2) or match.group(3)).strip()
+            label_start = start + line.index('**')
+            value = line[match.end():].strip()
+            if value:
+                if label not in block.fields:
+                    block.fields[label] = value
+                    block.spans[label] = (label_start, line_end)
+            elif label not in block.fields:
+                pending = (label, [], label_start)
+                block.lists.setdefault(label, pending[1])
+    
+    if block is not None:
+        yield block
+
+
+class PriorityIndex:
+    """
+    Sorted priority-section boundaries of a document, for O(log n) lookups.
+    
+    A heading with a priority marker (🔴, 🟡, 🟢) opens a section that
+    lasts until the next heading of the same or a higher level; items
+    outside any such section get the default priority.
+    """
+    
+    def __init__(self, content: str):
+        self.offsets: List[int] = [0]
+        self.priorities: List[str] = [DEFAULT_PRIORITY]
+        
+        open_sections: List[Tuple[int, str]] = []  # (heading level, priority), innermost last
+        for line_start, match in heading_lines(content):
+            level = len(match.group(1))
+            priority = next(
+                (value for marker, value in PRIORITY_MARKERS.items() if marker in match.group(2)),
+                None
+            )
+            if priority is None and not (open_sections and level <= open_sections[-1][0]):
+                continue
+            
+            while open_sections and open_sections[-1][0] >= level:
+                open_sections.pop()
+            if priority is not None:
+                open_sections.append((level, priority))
+            
+            current = open_sections[-1][1] if open_sections else DEFAULT_PRIORITY
+            if current != self.priorities[-1]:
+                self.offsets.append(line_start)
+                self.priorities.append(current)
+    
+    def priority_at(self, position: int) -> str:
+        """Priority of the section containing a character offset."""
+        return self.priorities[bisect_right(self.offsets, position) - 1]
+
+
 class MarkdownParser:
     """Parser for extracting ideas and user stories from markdown files."""
     
     @staticmethod
-    def parse_ideas(content: str) -> List[Idea]:
+    def index_ideas(content: str) -> List[IdeaEntry]:
+        """
+        Index the ideas of IDEAS.md by header and ``Estado`` line only.
+        
+        Two literal-prefixed regex scans (headings and ``**Estado**:`` fields)
+        merged in order; fields are not tokenized and no Idea objects are built.
+        
+        Args:
+            content: The content of IDEAS.md
+            
+        Returns:
+            One IdeaEntry per idea, in document order
+        """
+        entries = []
+        headings = list(heading_lines(content))
+        statuses = STATUS_FIELD.finditer(content)
+        status_match = next(statuses, None)
+        
+        for position, (start, heading) in enumerate(headings):
+            end = headings[position + 1][0] if position + 1 < len(headings) else len(content)
+            header = IDEA_HEADER.match(heading.group(0))
+            status, status_span = "", None
+            
+            # Statuses before the next heading belong to this block; the first
+            # non-empty field below the header line is the idea's, with its value
+            # on the same line or, as in scan_blocks, on the next non-blank one
+            while status_match is not None and status_match.start() < end:
+                if header is not None and status_span is None and status_match.start() > heading.end():
+                    line_start = content.rfind("\n", 0, status_match.start()) + 1
+                    if LABEL_PREFIX.fullmatch(content, line_start, status_match.start()):
+                        value, value_end = status_match.group(1).strip(), status_match.end()
+                        if not value:
+                            value, value_end = next_line_value(content, value_end, end)
+                        if value:
+                            status, status_span = value, (status_match.start(), value_end)
+                status_match = next(statuses, None)
+            
+            if header is not None:
+                entries.append(IdeaEntry(header.group(1), header.group(2).strip(), status, start, end, status_span))
+        return entries
+    
+    @staticmethod
+    def parse_ideas(content: str, entries: Optional[List[IdeaEntry]] = None) -> List[Idea]:
         """
         Parse IDEAS.md content and extract all ideas.
         
         Args:
             content: The content of IDEAS.md
+            entries: Only parse these ideas (from ``index_ideas``); all of them if None
             
         Returns:
             List of Idea objects
         """
         ideas = []
+        priorities = PriorityIndex(content)
         
-        # Pattern to match idea sections
-        # Looking for: ### [ID-XXX] Title
-        idea_pattern = r'###\s+\[([^\]]+)\]\s+([^\n]+)'
+        if entries is None:
+            blocks = scan_blocks(content, IDEA_HEADER)
+        else:
+            blocks = (MarkdownParser._entry_block(content, entry) for entry in entries)
         
-        # Find all idea sections
-        idea_matches = list(re.finditer(idea_pattern, content))
-        
-        for i, match in enumerate(idea_matches):
-            idea_id = match.group(1)
-            title = match.group(2).strip()
-            
-            # Get the content between this idea and the next one (or end of section)
-            start_pos = match.end()
-            if i + 1 < len(idea_matches):
-                end_pos = idea_matches[i + 1].start()
-            else:
-                # Find the next section header (##) or end of file
-                next_section = re.search(r'\n##\s+', content[start_pos:])
-                if next_section:
-                    end_pos = start_pos + next_section.start()
-                else:
-                    end_pos = len(content)
-            
-            idea_content = content[start_pos:end_pos].strip()
+        for block in blocks:
+            idea_id = block.header.group(1)
+            title = block.header.group(2).strip()
             
             # Extract fields
-            context = MarkdownParser._extract_field(idea_content, "Contexto")
-            problem = MarkdownParser._extract_field(idea_content, "Problema")
-            value = MarkdownParser._extract_field(idea_content, "Valor")
-            date_created = MarkdownParser._extract_field(idea_content, "Fecha")
-            status = MarkdownParser._extract_field(idea_content, "Estado")
+            context = block.fields.get("Contexto", "")
+            problem = block.fields.get("Problema", "")
+            value = block.fields.get("Valor", "")
+            date_created = block.fields.get("Fecha", "")
+            status = block.fields.get("Estado", "")
             
             # Determine priority based on section
-            priority = MarkdownParser._determine_priority_from_position(content, match.start())
+            priority = priorities.priority_at(block.start)
             
             # Build full text for similarity comparison
             full_text = f"{title} {context} {problem} {value}"
@@ -71,7 +309,8 @@ class MarkdownParser:
                 date_created=date_created,
                 status=status,
                 priority=priority,
-                full_text=full_text
+                full_text=full_text,
+                status_span=block.spans.get("Estado")
             )
             
             ideas.append(idea)
@@ -90,71 +329,41 @@ class MarkdownParser:
             List of UserStory objects
         """
         user_stories = []
+        priorities = PriorityIndex(content)
         
-        # Pattern to match user story sections
-        # Looking for: #### US-XXX: Title
-        us_pattern = r'####\s+(US-\d+):\s+([^\n]+)'
-        
-        # Find all user story sections
-        us_matches = list(re.finditer(us_pattern, content))
-        
-        for i, match in enumerate(us_matches):
-            us_id = match.group(1)
-            title = match.group(2).strip()
-            
-            # Get the content between this US and the next one
-            start_pos = match.end()
-            if i + 1 < len(us_matches):
-                end_pos = us_matches[i + 1].start()
-            else:
-                # Find next major section or end of file
-                next_section = re.search(r'\n###\s+', content[start_pos:])
-                if next_section:
-                    end_pos = start_pos + next_section.start()
-                else:
-                    end_pos = len(content)
-            
-            us_content = content[start_pos:end_pos].strip()
+        for block in scan_blocks(content, STORY_HEADER):
+            us_id = block.header.group(1)
+            title = block.header.group(2).strip()
+            fields = block.fields
             
-            # Extract "Como... Quiero... Para..." pattern
-            as_a_match = re.search(r'\*\*Como\*\*\s+([^\n]+)', us_content)
-            i_want_match = re.search(r'\*\*Quiero\*\*\s+([^\n]+)', us_content)
-            so_that_match = re.search(r'\*\*Para\*\*\s+([^\n]+)', us_content)
+            # "Como... Quiero... Para..." pattern
+            as_a = fields.get("Como", "")
+            i_want = fields.get("Quiero", "")
+            so_that = fields.get("Para", "")
             
-            as_a = as_a_match.group(1).strip() if as_a_match else ""
-            i_want = i_want_match.group(1).strip() if i_want_match else ""
-            so_that = so_that_match.group(1).strip() if so_that_match else ""
-            
-            # Extract acceptance criteria
-            acceptance_criteria = MarkdownParser._extract_acceptance_criteria(us_content)
+            acceptance_criteria = MarkdownParser._extract_acceptance_criteria(block)
             
             # Extract other fields
-            estimation_match = re.search(r'\*\*Estimación\*\*:\s+(\d+)\s+Story Points', us_content)
+            estimation_match = ESTIMATION.match(fields.get("Estimación", ""))
             estimation = int(estimation_match.group(1)) if estimation_match else None
             
-            epic_match = re.search(r'\*\*Epic\*\*:\s+([^\n]+)', us_content)
-            epic = epic_match.group(1).strip() if epic_match else None
+            epic = fields.get("Epic")
             
-            priority = MarkdownParser._determine_priority_from_position(content, match.start())
+            priority = priorities.priority_at(block.start)
             
-            services_match = re.search(r'\*\*Servicios Afectados\*\*:\s+([^\n]+)', us_content)
             affected_services = []
-            if services_match:
-                services_text = services_match.group(1).strip()
-                affected_services = [s.strip() for s in services_text.split(',')]
+            if "Servicios Afectados" in fields:
+                affected_services = [s.strip() for s in fields["Servicios Afectados"].split(',')]
             
-            deps_match = re.search(r'\*\*Dependencias\*\*:\s+([^\n]+)', us_content)
             dependencies = []
-            if deps_match:
-                deps_text = deps_match.group(1).strip()
-                if deps_text.lower() != "ninguna":
-                    dependencies = [d.strip() for d in deps_text.split(',')]
+            deps_text = fields.get("Dependencias", "")
+            if deps_text and deps_text.lower() != "ninguna":
+                dependencies = [d.strip() for d in deps_text.split(',')]
             
-            status_match = re.search(r'\*\*Estado\*\*:\s+([^\n]+)', us_content)
-            status = status_match.group(1).strip() if status_match else "To Do"
+            status = fields.get("Estado", "To Do")
             
-            # Extract technical notes
-            technical_notes = MarkdownParser._extract_technical_notes(us_content)
+            # Technical notes given as a list (an inline note is not a list)
+            technical_notes = block.lists.get("Notas Técnicas", [])
             
             # Build full text for similarity comparison
             full_text = f"{title} {as_a} {i_want} {so_that} {' '.join([ac.text for ac in acceptance_criteria])}"
@@ -181,87 +390,25 @@ class MarkdownParser:
         return user_stories
     
     @staticmethod
-    def _extract_field(content: str, field_name: str) -> str:
-        """Extract a field value from markdown content."""
-        pattern = rf'\*\*{field_name}\*\*:\s+([^\n]+)'
-        match = re.search(pattern, content)
-        if match:
-            return match.group(1).strip()
-        
-        # Try with dash format: - **Field**: value
-        pattern = rf'-\s+\*\*{field_name}\*\*:\s+([^\n]+)'
-        match = re.search(pattern, content)
-        if match:
-            return match.group(1).strip()
-        
-        return ""
+    def _entry_block(content: str, entry: IdeaEntry) -> MarkdownBlock:
+        """Tokenize the lines of one indexed idea."""
+        block = next(scan_blocks(content[entry.start:entry.end], IDEA_HEADER))
+        block.start += entry.start
+        block.spans = {label: (start + entry.start, end + entry.start) for label, (start, end) in block.spans.items()}
+        return block
     
     @staticmethod
-    def _extract_acceptance_criteria(content: str) -> List[AcceptanceCriteria]:
-        """Extract acceptance criteria from user story content."""
+    def _extract_acceptance_criteria(block: MarkdownBlock) -> List[AcceptanceCriteria]:
+        """Extract the leading checkbox items of the acceptance criteria list."""
         criteria = []
-        
-        # Find the acceptance criteria section
-        ac_section_match = re.search(
-            r'\*\*Criterios de Aceptación\*\*:?\s*\n((?:- \[.\].*\n?)*)',
-            content,
-            re.MULTILINE
-        )
-        
-        if ac_section_match:
-            ac_text = ac_section_match.group(1)
-            # Find all checkbox items
-            ac_items = re.findall(r'- \[(.)\]\s+([^\n]+)', ac_text)
-            for checkbox, text in ac_items:
-                completed = checkbox.lower() == 'x'
-                criteria.append(AcceptanceCriteria(text=text.strip(), completed=completed))
-        
+        for item in block.lists.get("Criterios de Aceptación", []):
+            match = CHECKBOX.match(item)
+            if match is None:
+                break
+            checkbox, text = match.groups()
+            criteria.append(AcceptanceCriteria(text=text.strip(), completed=checkbox.lower() == 'x'))
         return criteria
     
-    @staticmethod
-    def _extract_technical_notes(content: str) -> List[str]:
-        """Extract technical notes from user story content."""
-        notes = []
-        
-        # Find the technical notes section
-        notes_section_match = re.search(
-            r'\*\*Notas Técnicas\*\*:?\s*\n((?:- .*\n?)*)',
-            content,
-            re.MULTILINE
-        )
-        
-        if notes_section_match:
-            notes_text = notes_section_match.group(1)
-            # Find all list items
-            note_items = re.findall(r'- ([^\n]+)', notes_text)
-            notes = [note.strip() for note in note_items]
-        
-        return notes
-    
-    @staticmethod
-    def _determine_priority_from_position(content: str, position: int) -> str:
-        """
-        Determine priority based on which section the item is in.
-        Looks backwards from the position to find the priority section header.
-        """
-        content_before = content[:position]
-        
-        # Look for priority headers in reverse order
-        if "🔴" in content_before.split('\n')[-20:]:  # Check last 20 lines
-            return "Alta 🔴"
-        elif "## 🔴" in content_before[-500:]:
-            return "Alta 🔴"
-        elif "🟡" in content_before.split('\n')[-20:]:
-            return "Media 🟡"
-        elif "## 🟡" in content_before[-500:]:
-            return "Media 🟡"
-        elif "🟢" in content_before.split('\n')[-20:]:
-            return "Baja 🟢"
-        elif "## 🟢" in content_before[-500:]:
-            return "Baja 🟢"
-        
-        return "Media 🟡"  # Default
-    
     @staticmethod
     def get_next_us_number(backlog_content: str) -> int:
         """Get the next available US number from backlog."""
@@ -2,8 +2,8 @@
 Main workflow orchestrator for processing ideas.
 """
 
-import re
-from typing import List, Tuple
+import asyncio
+from typing import Dict, List, Optional, Tuple
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -11,7 +11,15 @@ from rich import print as rprint
 
 from .config import config
 from .models import Idea, UserStory, SimilarityResult
-from .parser import MarkdownParser, load_file_content, save_file_content
+from .parser import MarkdownParser, is_pending, is_superseded, load_file_content
+from .manifest import ProcessingManifest
+from .clustering import cluster_duplicates, dedupe_pair_candidates
+from .near_duplicates import NearDuplicateDetector
+from .instrumentation import metrics
+from .checkpoint import CheckpointJournal
+from .store import BacklogStore
+from .generation import generate_user_stories_parallel
+from .writer import FileTransaction, apply_patches, backlog_patches, iter_patched, recover_files, status_patches
 
 
 console = Console()
@@ -25,7 +33,13 @@ class IdeaProcessor:
         self.parser = MarkdownParser()
         
         # Select AI provider based on configuration
-        if config.ai_provider == "gemini":
+        if config.ai_provider == "local":
+            from .similarity_local import LocalSimilarityChecker
+            from .generator_local import LocalUserStoryGenerator
+            self.similarity_checker = LocalSimilarityChecker()
+            self.generator = LocalUserStoryGenerator()
+            console.print("\n[bold cyan]🚀 Idea Processor Initialized (using local lexical similarity, no AI)[/bold cyan]\n")
+        elif config.ai_provider == "gemini":
             from .similarity_gemini import GeminiSimilarityChecker
             from .generator_gemini import GeminiUserStoryGenerator
             self.similarity_checker = GeminiSimilarityChecker()
@@ -38,37 +52,68 @@ class IdeaProcessor:
             self.generator = UserStoryGenerator()
             console.print("\n[bold cyan]🚀 Idea Processor Initialized (using OpenAI)[/bold cyan]\n")
         
+        # Optional offline first stage that shortlists candidates for the AI checker
+        self.prefilter = None
+        if config.local_prefilter and config.ai_provider != "local":
+            from .similarity_local import LocalSimilarityChecker
+            self.prefilter = LocalSimilarityChecker(
+                top_k=config.local_prefilter_top_k,
+                min_score=config.local_prefilter_min_score
+            )
+            console.print(f"[cyan]🔎 Local lexical prefilter enabled (top {config.local_prefilter_top_k} candidates per idea)[/cyan]\n")
+        
         if self.dry_run:
             console.print("[yellow]⚠️  Running in DRY RUN mode - no files will be modified[/yellow]\n")
+        
+        # Checkpoint journal of the run (opened in step 3 by ``_open_checkpoint``)
+        self.checkpoint = None
+        
+        # Optional SQLite mirror of the files (synced in step 2 by ``_sync_store``)
+        self.store = None
     
     def process_ideas(self) -> Tuple[List[Idea], List[UserStory]]:
         """
         Main workflow to process ideas.
         
+        Stage timings, provider calls and cache hit rates of the run are
+        written to ``config.metrics_file``, also when the run fails.
+        
         Returns:
             Tuple of (ideas_marked_as_duplicate, generated_user_stories)
         """
-        console.print("[bold]Step 1:[/bold] Loading files...\n")
-        
-        # Load files
-        ideas_content = load_file_content(config.ideas_file)
-        backlog_content = load_file_content(config.backlog_file)
+        metrics.reset()
+        try:
+            return self._process_ideas()
+        finally:
+            metrics.end_stage()
+            self._record_cache_metrics()
+            if config.metrics_report:
+                metrics.write(config.metrics_file)
+    
+    def _process_ideas(self) -> Tuple[List[Idea], List[UserStory]]:
+        """Run steps 1-5 of the workflow (see ``process_ideas``)."""
+        ideas_content, backlog_content = self._load_files()
         
         # Parse ideas and user stories
         console.print("[bold]Step 2:[/bold] Parsing ideas and user stories...\n")
-        ideas = self.parser.parse_ideas(ideas_content)
+        metrics.begin_stage("parse")
+        ideas, total_ideas = self._parse_ideas(ideas_content)
         user_stories = self.parser.parse_user_stories(backlog_content)
+        self._sync_store(ideas_content, backlog_content, user_stories)
         
-        console.print(f"✓ Found [green]{len(ideas)}[/green] ideas")
+        console.print(f"✓ Found [green]{total_ideas}[/green] ideas")
+        if total_ideas > len(ideas):
+            console.print(f"  └─ {total_ideas - len(ideas)} converted or repeated ideas skipped (lazy parsing)")
         console.print(f"✓ Found [green]{len(user_stories)}[/green] existing user stories\n")
         
         # Filter ideas that need processing (status "Por refinar")
-        ideas_to_process = [
-            idea for idea in ideas
-            if "Por refinar" in idea.status or "💭" in idea.status
-        ]
+        ideas_to_process = [idea for idea in ideas if is_pending(idea.status)]
         
         console.print(f"📝 Ideas to process: [cyan]{len(ideas_to_process)}[/cyan]\n")
+        metrics.count("ideas", total_ideas)
+        metrics.count("ideas_parsed", len(ideas))
+        metrics.count("user_stories", len(user_stories))
+        metrics.count("ideas_to_process", len(ideas_to_process))
         
         if not ideas_to_process:
             console.print("[yellow]No ideas to process. All ideas are either converted or discarded.[/yellow]")
@@ -76,146 +121,507 @@ class IdeaProcessor:
         
         # Check for duplicates
         console.print("[bold]Step 3:[/bold] Checking for duplicates...\n")
+        duplicate_ideas, unique_ideas = self._check_duplicates(ideas_to_process, ideas, user_stories)
+        
+        # Display summary
+        self._display_duplicate_summary(duplicate_ideas)
+        
+        # Generate user stories from unique ideas
+        generated_user_stories = self._generate_stories(unique_ideas, backlog_content)
+        
+        # Update files
+        if not self.dry_run:
+            self._write_files(ideas_content, backlog_content, duplicate_ideas, unique_ideas, generated_user_stories)
+        
+        metrics.end_stage()
+        
+        # Final summary
+        self._display_final_summary(duplicate_ideas, generated_user_stories)
+        
+        return duplicate_ideas, generated_user_stories
+    
+    def _load_files(self) -> Tuple[str, str]:
+        """
+        Step 1: recover an interrupted file update, then read both files.
+        
+        Returns:
+            Tuple of (IDEAS.md content, BACKLOG.md content)
+        """
+        console.print("[bold]Step 1:[/bold] Loading files...\n")
+        metrics.begin_stage("load")
+        
+        # Finish or undo the file update of an interrupted run
+        recovery = recover_files(config.commit_journal_file, [config.backlog_file, config.ideas_file])
+        if recovery == "rolled_forward":
+            console.print("[yellow]♻️  Completed the file update of an interrupted run[/yellow]\n")
+        elif recovery == "rolled_back":
+            console.print("[yellow]♻️  Discarded the partial file update of an interrupted run[/yellow]\n")
+        
+        return load_file_content(config.ideas_file), load_file_content(config.backlog_file)
+    
+    def _sync_store(self, ideas_content: str, backlog_content: str, user_stories: List[UserStory]) -> None:
+        """Open the backlog store, if enabled, and sync it with the parsed files."""
+        if not config.backlog_store:
+            return
+        
+        self.store = BacklogStore(config.store_file)
+        changes = self.store.sync(ideas_content, backlog_content, user_stories)
+        console.print(f"🗄️  Backlog store synced: {changes['ideas_added']} ideas and "
+                      f"{changes['user_stories_added']} user stories added or edited, "
+                      f"{changes['ideas_removed'] + changes['user_stories_removed']} removed\n")
+    
+    def _check_duplicates(
+        self,
+        ideas_to_process: List[Idea],
+        ideas: List[Idea],
+        user_stories: List[UserStory]
+    ) -> Tuple[List[Idea], List[Idea]]:
+        """
+        Step 3: decide which pending ideas duplicate an existing item or each other.
+        
+        Near-verbatim copies are settled first; the rest go through candidate
+        retrieval and AI adjudication, and the ideas of this batch that
+        duplicate each other are clustered.
+        
+        Args:
+            ideas_to_process: Pending ideas
+            ideas: All parsed ideas (comparison corpus)
+            user_stories: Existing user stories (comparison corpus)
+            
+        Returns:
+            Tuple of (duplicate ideas, unique ideas), marked on the Idea objects
+        """
+        metrics.begin_stage("near_duplicates")
+        
+        # Incremental mode: unchanged ideas are only compared against corpus
+        # items that changed after their last verdict
+        manifest = None
+        needs_check = [True] * len(ideas_to_process)
+        if config.incremental:
+            manifest = ProcessingManifest(config.manifest_file)
+            manifest.sync(ideas, user_stories)
+            needs_check = [manifest.needs_check(idea) for idea in ideas_to_process]
+            console.print(f"♻️  Incremental mode: [cyan]{sum(needs_check)}[/cyan] of "
+                          f"{len(ideas_to_process)} ideas need checking\n")
+        ideas_to_check = [idea for idea, check in zip(ideas_to_process, needs_check) if check]
+        
+        self._open_checkpoint()
+        
+        # Near-verbatim copies are settled with MinHash/LSH, without any AI call
+        near_duplicates = [[] for _ in ideas_to_check]
+        if config.near_duplicate_detection and ideas_to_check:
+            near_duplicates = NearDuplicateDetector().find_near_duplicates(ideas_to_check, user_stories, ideas)
+            copies = sum(1 for matches in near_duplicates if matches)
+            if copies:
+                console.print(f"✂️  Found [cyan]{copies}[/cyan] near-verbatim copies (no AI calls needed)\n")
+        semantic_ideas = [idea for idea, matches in zip(ideas_to_check, near_duplicates) if not matches]
+        
+        candidates = self._retrieve_candidates(semantic_ideas, user_stories, ideas, manifest)
+        verdicts = iter(self._adjudicate_ideas(semantic_ideas, candidates))
+        
+        near_iter = iter(near_duplicates)
+        results = []
+        for idea, check in zip(ideas_to_process, needs_check):
+            near_matches = next(near_iter) if check else []
+            if not check:
+                similar_items = []
+            elif near_matches:
+                similar_items = near_matches
+            else:
+                similar_items = next(verdicts)
+            
+            if manifest is not None:
+                similar_items = manifest.resolve(idea, similar_items)
+            results.append(similar_items)
+        
+        # Group ideas of this batch that duplicate each other; one representative
+        # per cluster goes on to story generation
+        metrics.begin_stage("clustering")
+        decisions, clusters = cluster_duplicates(ideas_to_process, results)
+        if clusters:
+            console.print(f"🔗 Found [cyan]{len(clusters)}[/cyan] clusters of duplicate ideas within this batch\n")
+        
         duplicate_ideas = []
         unique_ideas = []
         
-        for idea in ideas_to_process:
+        for idea, duplicate_of in zip(ideas_to_process, decisions):
             console.print(f"Checking [cyan]{idea.id}[/cyan]: {idea.title}")
             
-            similar_items = self.similarity_checker.find_similar_items(
-                idea,
-                user_stories,
-                other_ideas=ideas
-            )
-            
-            if similar_items and similar_items[0].is_duplicate:
+            if duplicate_of is not None:
                 # Mark as duplicate
                 duplicate_ideas.append(idea)
                 idea.is_duplicate = True
-                idea.similar_to = similar_items[0].similar_item_id
-                idea.similarity_score = similar_items[0].similarity_score
+                idea.similar_to = duplicate_of.similar_item_id
+                idea.similarity_score = duplicate_of.similarity_score
                 
-                console.print(f"  ⚠️  [yellow]Duplicate found[/yellow] - Similar to {similar_items[0].similar_item_id} "
-                            f"(score: {similar_items[0].similarity_score:.2f})")
-                console.print(f"  └─ Reason: {similar_items[0].reason}\n")
+                console.print(f"  ⚠️  [yellow]Duplicate found[/yellow] - Similar to {duplicate_of.similar_item_id} "
+                            f"(score: {duplicate_of.similarity_score:.2f})")
+                console.print(f"  └─ Reason: {duplicate_of.reason}\n")
             else:
                 unique_ideas.append(idea)
                 console.print(f"  ✓ [green]Unique idea[/green]\n")
         
-        # Display summary
-        self._display_duplicate_summary(duplicate_ideas)
+        if manifest is not None:
+            manifest.save()
         
-        # Generate user stories from unique ideas
-        if unique_ideas:
-            console.print(f"\n[bold]Step 4:[/bold] Generating user stories from {len(unique_ideas)} unique ideas...\n")
-            
-            next_us_number = self.parser.get_next_us_number(backlog_content)
-            generated_user_stories = []
+        metrics.count("duplicates", len(duplicate_ideas))
+        metrics.count("clusters", len(clusters))
+        
+        return duplicate_ideas, unique_ideas
+    
+    def _open_checkpoint(self) -> None:
+        """Open the checkpoint journal of the run (the local engine makes no API calls)."""
+        # Verdicts and stories are journaled as they complete; --resume reuses
+        # those of an interrupted run instead of calling the provider again.
+        # A dry run is never cleared by a file update, so it keeps no journal.
+        if config.checkpoints and config.ai_provider != "local" and not self.dry_run:
+            self.checkpoint = CheckpointJournal(config.checkpoint_file, resume=config.resume)
+            if self.checkpoint.resumed:
+                console.print(f"⏯️  Resuming: [cyan]{self.checkpoint.resumed}[/cyan] verdicts and "
+                              f"user stories recorded by an interrupted run\n")
+    
+    def _retrieve_candidates(
+        self,
+        semantic_ideas: List[Idea],
+        user_stories: List[UserStory],
+        ideas: List[Idea],
+        manifest: Optional[ProcessingManifest] = None
+    ) -> Dict[str, list]:
+        """
+        Retrieval stage: embed the corpus and shortlist adjudication candidates.
+        
+        Args:
+            semantic_ideas: Ideas to adjudicate (not settled as near-verbatim copies)
+            user_stories: Existing user stories
+            ideas: All parsed ideas
+            manifest: Incremental manifest; drops candidates already adjudicated
             
-            for idea in unique_ideas:
-                console.print(f"Generating user story for [cyan]{idea.id}[/cyan]...")
-                user_story = self.generator.generate_user_story(idea, next_us_number)
-                generated_user_stories.append(user_story)
-                console.print(f"  ✓ Generated [green]{user_story.id}[/green]: {user_story.title}\n")
-                next_us_number += 1
+        Returns:
+            Candidates per idea ID, each pair of batch ideas kept once
+        """
+        metrics.begin_stage("retrieval")
+        if not semantic_ideas:
+            return {}
+        
+        # Vectors stored for unchanged corpus texts are not requested again
+        embedding_key = self._store_embedding_key()
+        if embedding_key is not None:
+            self.similarity_checker.embeddings.update(self.store.embeddings(embedding_key))
+            stored = set(self.similarity_checker.embeddings)
+        
+        self.similarity_checker.prepare_corpus(ideas, user_stories)
+        
+        # Similarity join: retrieve candidates for every idea in one pass
+        candidates = self._find_candidates(semantic_ideas, user_stories, ideas)
+        
+        if embedding_key is not None:
+            self.store.put_embeddings(embedding_key, {
+                text: vector for text, vector in self.similarity_checker.embeddings.items()
+                if text not in stored
+            })
+        if manifest is not None:
+            for idea in semantic_ideas:
+                candidates[idea.id] = manifest.pending_candidates(idea, candidates[idea.id])
+        
+        # Adjudicate each pair of batch ideas once; clustering applies it both ways
+        return dedupe_pair_candidates(semantic_ideas, candidates)
+    
+    def _adjudicate_ideas(
+        self,
+        semantic_ideas: List[Idea],
+        candidates: Dict[str, list]
+    ) -> List[List[SimilarityResult]]:
+        """
+        Adjudication stage: score every idea's candidates with the checker.
+        
+        Verdicts recorded by an interrupted run are reused; the rest are
+        adjudicated concurrently when the checker supports it.
+        
+        Args:
+            semantic_ideas: Ideas to adjudicate
+            candidates: Candidates per idea ID (from ``_retrieve_candidates``)
             
-            # Display generated user stories
-            self._display_generated_stories(generated_user_stories)
+        Returns:
+            Similarity results per idea, in the order of ``semantic_ideas``
+        """
+        metrics.begin_stage("adjudication")
+        
+        # Resumed run: verdicts recorded before the interruption are reused
+        verdicts = [None] * len(semantic_ideas)
+        if self.checkpoint is not None:
+            verdicts = [self.checkpoint.verdict(idea) for idea in semantic_ideas]
+            metrics.count("resumed_verdicts", sum(1 for verdict in verdicts if verdict is not None))
+        ideas_to_adjudicate = [idea for idea, verdict in zip(semantic_ideas, verdicts) if verdict is None]
+        
+        # Concurrent adjudication; results keep the order of ideas_to_adjudicate
+        if (config.max_concurrency > 1 and len(ideas_to_adjudicate) > 1
+                and hasattr(self.similarity_checker, "adjudicate_async")):
+            console.print(f"[cyan]⚡ Checking {len(ideas_to_adjudicate)} ideas concurrently "
+                          f"(max {config.max_concurrency} at a time)...[/cyan]\n")
+            results = asyncio.run(self._adjudicate_concurrently(ideas_to_adjudicate, candidates))
         else:
-            console.print("\n[yellow]No unique ideas to generate user stories from.[/yellow]")
-            generated_user_stories = []
+            results = [self._adjudicate(idea, candidates[idea.id]) for idea in ideas_to_adjudicate]
         
-        # Update files
-        if not self.dry_run:
-            console.print("\n[bold]Step 5:[/bold] Updating files...\n")
-            
-            if duplicate_ideas:
-                console.print("Marking duplicate ideas in IDEAS.md...")
-                updated_ideas_content = self._mark_duplicates_in_ideas(
-                    ideas_content,
-                    duplicate_ideas
-                )
-                save_file_content(config.ideas_file, updated_ideas_content)
-                console.print("  ✓ IDEAS.md updated\n")
+        adjudicated = iter(results)
+        return [verdict if verdict is not None else next(adjudicated) for verdict in verdicts]
+    
+    def _generate_stories(self, unique_ideas: List[Idea], backlog_content: str) -> List[UserStory]:
+        """
+        Step 4: generate one user story per unique idea.
+        
+        Args:
+            unique_ideas: Ideas to convert, in backlog order
+            backlog_content: BACKLOG.md content (for the next US number)
             
+        Returns:
+            Generated user stories, in the order of ``unique_ideas``
+        """
+        if not unique_ideas:
+            console.print("\n[yellow]No unique ideas to generate user stories from.[/yellow]")
+            return []
+        
+        console.print(f"\n[bold]Step 4:[/bold] Generating user stories from {len(unique_ideas)} unique ideas...\n")
+        metrics.begin_stage("generation")
+        
+        if self.store is not None:
+            next_us_number = self.store.next_us_number()
+        else:
+            next_us_number = self.parser.get_next_us_number(backlog_content)
+        
+        # US numbers are reserved per idea up front, so parallel generation
+        # numbers stories exactly like a sequential run
+        if config.max_concurrency > 1 and len(unique_ideas) > 1:
+            console.print(f"[cyan]⚡ Generating {len(unique_ideas)} user stories in parallel "
+                          f"(max {config.max_concurrency} at a time)...[/cyan]\n")
+        generated_user_stories = generate_user_stories_parallel(
+            self._generate_user_story,
+            unique_ideas,
+            next_us_number,
+            max_workers=config.max_concurrency
+        )
+        
+        for idea, user_story in zip(unique_ideas, generated_user_stories):
+            console.print(f"Generated user story for [cyan]{idea.id}[/cyan]")
+            console.print(f"  ✓ Generated [green]{user_story.id}[/green]: {user_story.title}\n")
+        
+        metrics.count("user_stories_generated", len(generated_user_stories))
+        
+        # Display generated user stories
+        self._display_generated_stories(generated_user_stories)
+        return generated_user_stories
+    
+    def _write_files(
+        self,
+        ideas_content: str,
+        backlog_content: str,
+        duplicate_ideas: List[Idea],
+        unique_ideas: List[Idea],
+        generated_user_stories: List[UserStory]
+    ) -> None:
+        """
+        Step 5: write the new stories and idea statuses, both files or neither.
+        
+        Args:
+            ideas_content: IDEAS.md content the ideas were parsed from
+            backlog_content: BACKLOG.md content the stories were parsed from
+            duplicate_ideas: Ideas to mark as repeated
+            unique_ideas: Ideas to mark as converted
+            generated_user_stories: Story generated for each unique idea
+        """
+        console.print("\n[bold]Step 5:[/bold] Updating files...\n")
+        metrics.begin_stage("write")
+        
+        # Both files are replaced together, or neither is
+        with FileTransaction(config.commit_journal_file) as transaction:
             if generated_user_stories:
                 console.print("Appending new user stories to BACKLOG.md...")
-                updated_backlog_content = self._append_user_stories_to_backlog(
-                    backlog_content,
-                    generated_user_stories
-                )
-                save_file_content(config.backlog_file, updated_backlog_content)
-                console.print("  ✓ BACKLOG.md updated\n")
+                if config.streaming_writes:
+                    transaction.stage(config.backlog_file, iter_patched(
+                        backlog_content,
+                        backlog_patches(backlog_content, generated_user_stories)
+                    ))
+                else:
+                    transaction.stage(config.backlog_file, self._append_user_stories_to_backlog(
+                        backlog_content,
+                        generated_user_stories
+                    ))
             
-            if generated_user_stories:
-                console.print("Marking ideas as converted in IDEAS.md...")
-                updated_ideas_content = self._mark_ideas_as_converted(
-                    load_file_content(config.ideas_file),
+            if duplicate_ideas or generated_user_stories:
+                console.print("Updating idea statuses in IDEAS.md...")
+                transaction.stage(config.ideas_file, self._update_idea_statuses(
+                    ideas_content,
+                    duplicate_ideas,
                     unique_ideas,
                     generated_user_stories
-                )
-                save_file_content(config.ideas_file, updated_ideas_content)
-                console.print("  ✓ IDEAS.md updated with conversion status\n")
+                ))
         
-        # Final summary
-        self._display_final_summary(duplicate_ideas, generated_user_stories)
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
         
-        return duplicate_ideas, generated_user_stories
+        if generated_user_stories:
+            console.print("  ✓ BACKLOG.md updated")
+        if duplicate_ideas or generated_user_stories:
+            console.print(f"  ✓ IDEAS.md updated ({len(duplicate_ideas)} repeated, "
+                          f"{len(generated_user_stories)} converted)\n")
     
-    def _mark_duplicates_in_ideas(self, content: str, duplicate_ideas: List[Idea]) -> str:
-        """Mark duplicate ideas in IDEAS.md content."""
-        for idea in duplicate_ideas:
-            # Find the idea section and update its status
-            pattern = rf'(###\s+\[{re.escape(idea.id)}\][^\n]+\n.*?)\*\*Estado\*\*:\s+[^\n]+'
-            replacement = rf'\1**Estado**: ⚠️ Repetida - Similar a {idea.similar_to} (similitud: {idea.similarity_score:.0%})'
-            content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    def _parse_ideas(self, ideas_content: str) -> Tuple[List[Idea], int]:
+        """
+        Parse the ideas to process and the ideas of the comparison corpus.
+        
+        With lazy parsing, ideas are indexed by header and status first and
+        only those not converted or marked as repeated are parsed: their user
+        story or original is already in the corpus.
+        
+        Args:
+            ideas_content: The content of IDEAS.md
+            
+        Returns:
+            Tuple of (parsed ideas, number of ideas in the file)
+        """
+        if not config.lazy_parsing:
+            ideas = self.parser.parse_ideas(ideas_content)
+            return ideas, len(ideas)
         
-        return content
+        entries = self.parser.index_ideas(ideas_content)
+        wanted = [entry for entry in entries if not is_superseded(entry.status)]
+        return self.parser.parse_ideas(ideas_content, wanted), len(entries)
+    
+    def _record_cache_metrics(self) -> None:
+        """Add the hit rates of the embedding and verdict caches to the run metrics."""
+        metrics.record_cache("embeddings", getattr(self.similarity_checker, "embedding_cache", None))
+        metrics.record_cache("verdicts", getattr(self.similarity_checker, "verdict_cache", None))
     
-    def _mark_ideas_as_converted(
+    def _find_candidates(
+        self,
+        ideas_to_process: List[Idea],
+        user_stories: List[UserStory],
+        ideas: List[Idea]
+    ) -> Dict[str, list]:
+        """
+        Retrieve adjudication candidates for each idea.
+        
+        With the local prefilter enabled, the AI checker only sees the
+        lexical shortlist for each idea instead of the whole corpus. With the
+        backlog store, the shortlist comes from its FTS5 index.
+        """
+        if self.prefilter is None:
+            return self.similarity_checker.find_candidates(
+                ideas_to_process,
+                user_stories,
+                other_ideas=ideas
+            )
+        
+        if self.store is not None:
+            shortlist = {
+                idea.id: self.store.lexical_candidates(idea, config.local_prefilter_top_k)
+                for idea in ideas_to_process
+            }
+        else:
+            self.prefilter.prepare_corpus(ideas, user_stories)
+            shortlist = self.prefilter.find_candidates(ideas_to_process, user_stories, other_ideas=ideas)
+        
+        candidates = {}
+        for idea in ideas_to_process:
+            items = [item for item, _ in shortlist[idea.id]]
+            candidates.update(self.similarity_checker.find_candidates(
+                [idea],
+                [item for item in items if isinstance(item, UserStory)],
+                other_ideas=[item for item in items if isinstance(item, Idea)]
+            ))
+        
+        return candidates
+    
+    def _store_embedding_key(self) -> Optional[str]:
+        """Model key of the checker's vectors in the backlog store, or None if not stored."""
+        model = getattr(self.similarity_checker, "embedding_model", None)
+        if self.store is None or model is None:
+            return None
+        return f"{model}:{self.similarity_checker.embedding_dimensions or ''}"
+    
+    def _generate_user_story(self, idea: Idea, us_number: int) -> UserStory:
+        """Generate one user story, reusing or recording it in the checkpoint journal."""
+        if self.checkpoint is None:
+            return self.generator.generate_user_story(idea, us_number)
+        user_story = self.checkpoint.story(idea, us_number)
+        if user_story is not None:
+            metrics.count("resumed_stories")
+            return user_story
+        user_story = self.generator.generate_user_story(idea, us_number)
+        self.checkpoint.record_story(idea, user_story)
+        return user_story
+    
+    def _adjudicate(self, idea: Idea, candidates: list) -> List[SimilarityResult]:
+        """Adjudicate one idea, recording its verdict in the checkpoint journal."""
+        results = self.similarity_checker.adjudicate(idea, candidates)
+        if self.checkpoint is not None:
+            self.checkpoint.record_verdict(idea, results)
+        return results
+    
+    async def _adjudicate_concurrently(
+        self,
+        ideas_to_process: List[Idea],
+        candidates: Dict[str, list]
+    ) -> List[List[SimilarityResult]]:
+        """
+        Adjudicate every idea with at most ``config.max_concurrency`` in flight.
+        
+        Returns:
+            Similarity results per idea, in the same order as ``ideas_to_process``
+        """
+        semaphore = asyncio.Semaphore(config.max_concurrency)
+        
+        async def adjudicate(idea: Idea) -> List[SimilarityResult]:
+            async with semaphore:
+                results = await self.similarity_checker.adjudicate_async(idea, candidates[idea.id])
+            if self.checkpoint is not None:
+                self.checkpoint.record_verdict(idea, results)
+            return results
+        
+        return await asyncio.gather(*(adjudicate(idea) for idea in ideas_to_process))
+    
+    def _update_idea_statuses(
         self,
         content: str,
-        ideas: List[Idea],
+        duplicate_ideas: List[Idea],
+        converted_ideas: List[Idea],
         user_stories: List[UserStory]
     ) -> str:
-        """Mark ideas as converted to user stories in IDEAS.md."""
-        idea_to_us_map = {idea.id: us.id for idea, us in zip(ideas, user_stories)}
+        """
+        Mark duplicate and converted ideas in IDEAS.md content.
         
-        for idea_id, us_id in idea_to_us_map.items():
-            # Find the idea section and update its status
-            pattern = rf'(###\s+\[{re.escape(idea_id)}\][^\n]+\n.*?)\*\*Estado\*\*:\s+[^\n]+'
-            replacement = rf'\1**Estado**: ✅ Convertida a {us_id}'
-            content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+        Every ``**Estado**`` line is rewritten in a single pass, at the
+        offsets recorded when ``content`` was parsed.
         
-        return content
+        Args:
+            content: IDEAS.md content the ideas were parsed from
+            duplicate_ideas: Ideas to mark as repeated
+            converted_ideas: Ideas to mark as converted
+            user_stories: Story generated for each converted idea, in the same order
+            
+        Returns:
+            Updated IDEAS.md content
+        """
+        return apply_patches(content, status_patches(duplicate_ideas, converted_ideas, user_stories))
     
     def _append_user_stories_to_backlog(
         self,
         content: str,
         user_stories: List[UserStory]
     ) -> str:
-        """Append new user stories to BACKLOG.md."""
-        # Find the appropriate section based on priority
-        for us in user_stories:
-            us_markdown = us.to_markdown()
-            
-            # Determine which priority section to add to
-            if "Alta 🔴" in us.priority or "🔴" in us.priority:
-                section_marker = "### 🔴 Prioridad Alta - Crítico"
-            elif "Media 🟡" in us.priority or "🟡" in us.priority:
-                section_marker = "### 🟡 Prioridad Media - Importante"
-            else:
-                section_marker = "### 🟢 Prioridad Baja - Mejoras"
+        """
+        Insert new user stories under their priority sections of BACKLOG.md.
+        
+        Stories are grouped by section, each section is looked up once and
+        the updated content is assembled in a single join.
+        
+        Args:
+            content: BACKLOG.md content
+            user_stories: Generated user stories
             
-            # Find the section and insert after it
-            section_pos = content.find(section_marker)
-            if section_pos != -1:
-                # Find the next line after the section header
-                next_line_pos = content.find('\n', section_pos) + 1
-                # Insert the user story
-                content = content[:next_line_pos] + '\n' + us_markdown + '\n' + content[next_line_pos:]
-        
-        return content
+        Returns:
+            Updated BACKLOG.md content
+        """
+        return apply_patches(content, backlog_patches(content, user_stories))
     
     def _display_duplicate_summary(self, duplicate_ideas: List[Idea]):
         """Display table of duplicate ideas."""
@@ -0,0 +1,469 @@
+"""
+Shared AI provider clients with rate limiting, retries and connection reuse.
+
+The similarity checkers and user story generators of a provider all go
+through one ``ProviderClient``. It holds a single SDK client, whose
+keep-alive connections are reused by every call, throttles requests with
+per-model token buckets sized to the account's RPM and TPM limits, and
+retries transient failures (429, 5xx, timeouts) with jittered exponential backoff.
+When a request still fails, a ``ProviderError`` is raised rather than the
+failure being recorded as a verdict or a user story.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from .config import config
+from .embeddings import estimate_tokens
+from .instrumentation import Usage, metrics
+
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+# Transient SDK errors without an HTTP status, matched by name so neither SDK
+# has to be importable here (openai and google.api_core)
+RETRYABLE_ERRORS = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "RateLimitError",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+}
+
+
+class ProviderError(RuntimeError):
+    """An AI provider request failed for good (non-transient, or out of retries)."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed request may succeed if it is sent again.
+    
+    Args:
+        error: Exception raised by an SDK call
+        
+    Returns:
+        True for rate limits, server errors, timeouts and dropped connections
+    """
+    status = getattr(error, "status_code", None)
+    if status is None and isinstance(getattr(error, "code", None), int):
+        status = error.code
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+def retry_delay(error: BaseException, attempt: int) -> float:
+    """
+    Seconds to wait before retrying, with full jitter.
+    
+    A ``Retry-After`` header sent with the error is honoured as a minimum.
+    
+    Args:
+        error: Exception raised by the failed attempt
+        attempt: Number of the failed attempt, starting at 0
+        
+    Returns:
+        Delay in seconds
+    """
+    delay = random.uniform(0, min(config.retry_max_delay, config.retry_base_delay * 2 ** attempt))
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        delay = max(delay, float(headers.get("retry-after", 0)))
+    except (TypeError, ValueError):
+        pass
+    return delay
+
+
+class TokenBucket:
+    """Thread-safe token bucket that refills ``per_minute`` tokens every minute."""
+    
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: float) -> float:
+        """
+        Take tokens from the bucket, going into debt if it runs dry.
+        
+        Args:
+            amount: Tokens needed (capped at the bucket capacity)
+            
+        Returns:
+            Seconds the caller has to wait before using them
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits of one model."""
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+    
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and ``tokens`` tokens; return the wait in seconds."""
+        delays = [0.0]
+        if self.requests is not None:
+            delays.append(self.requests.reserve(1))
+        if self.tokens is not None:
+            delays.append(self.tokens.reserve(tokens))
+        return max(delays)
+    
+    def acquire(self, tokens: int) -> None:
+        """Block until a request of ``tokens`` tokens is allowed."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+    
+    async def acquire_async(self, tokens: int) -> None:
+        """Wait, without blocking the event loop, until a request is allowed."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_providers: Dict[str, "ProviderClient"] = {}
+_registry_lock = threading.Lock()
+
+
+def limiter_for(model: str) -> RateLimiter:
+    """Return the process-wide rate limiter of a model."""
+    with _registry_lock:
+        if model not in _limiters:
+            _limiters[model] = RateLimiter(*config.rate_limit(model))
+        return _limiters[model]
+
+
+class ProviderClient:
+    """
+    Chat completions and embeddings of one provider, rate limited and retried.
+    
+    Subclasses implement ``_complete``, ``_complete_async`` and ``_embed``
+    as single raw SDK calls, returning their result together with the
+    token usage reported by the provider (None if it reports none).
+    """
+    
+    name = "AI"
+    
+    def __init__(self, chat_model: str, embedding_model: str):
+        self.chat_model = chat_model
+        self.embedding_model = embedding_model
+    
+    def complete(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False
+    ) -> str:
+        """
+        Send a prompt to the chat model.
+        
+        Args:
+            prompt: User prompt
+            system: Optional system instructions
+            temperature: Sampling temperature (provider default if None)
+            json_mode: Ask the model for a JSON object, where supported
+            
+        Returns:
+            Raw response text
+            
+        Raises:
+            ProviderError: If the request fails after all retries
+        """
+        return self._call(
+            self.chat_model,
+            "chat",
+            self._chat_tokens(prompt, system),
+            lambda: self._complete(prompt, system, temperature, json_mode)
+        )
+    
+    async def complete_async(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False
+    ) -> str:
+        """Async variant of ``complete``."""
+        return await self._call_async(
+            self.chat_model,
+            "chat",
+            self._chat_tokens(prompt, system),
+            lambda: self._complete_async(prompt, system, temperature, json_mode)
+        )
+    
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts with a single request.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding vectors in input order
+            
+        Raises:
+            ProviderError: If the request fails after all retries
+        """
+        return self._call(
+            self.embedding_model,
+            "embed",
+            sum(estimate_tokens(text) for text in texts),
+            lambda: self._embed(texts)
+        )
+    
+    def _complete(self, prompt: str, system: Optional[str], temperature: Optional[float], json_mode: bool) -> Tuple[str, Usage]:
+        raise NotImplementedError
+    
+    async def _complete_async(self, prompt: str, system: Optional[str], temperature: Optional[float], json_mode: bool) -> Tuple[str, Usage]:
+        raise NotImplementedError
+    
+    def _embed(self, texts: List[str]) -> Tuple[List[List[float]], Usage]:
+        raise NotImplementedError
+    
+    @staticmethod
+    def _chat_tokens(prompt: str, system: Optional[str]) -> int:
+        return estimate_tokens((system or "") + prompt) + config.completion_token_estimate
+    
+    def _call(self, model: str, operation: str, tokens: int, request: Callable[[], Tuple[T, Usage]]) -> T:
+        """Run a request under the model's rate limit, retrying transient errors."""
+        limiter = limiter_for(model)
+        for attempt in range(config.provider_max_retries + 1):
+            limiter.acquire(tokens)
+            try:
+                with metrics.call(self.name, operation, model, tokens) as record:
+                    record.retry = attempt > 0
+                    result, record.usage = request()
+                return result
+            except Exception as e:
+                if not is_retryable(e) or attempt == config.provider_max_retries:
+                    raise ProviderError(f"{self.name} request to {model} failed: {e}") from e
+                time.sleep(retry_delay(e, attempt))
+    
+    async def _call_async(self, model: str, operation: str, tokens: int, request: Callable[[], Awaitable[Tuple[T, Usage]]]) -> T:
+        """Async variant of ``_call``."""
+        limiter = limiter_for(model)
+        for attempt in range(config.provider_max_retries + 1):
+            await limiter.acquire_async(tokens)
+            try:
+                with metrics.call(self.name, operation, model, tokens) as record:
+                    record.retry = attempt > 0
+                    result, record.usage = await request()
+                return result
+            except Exception as e:
+                if not is_retryable(e) or attempt == config.provider_max_retries:
+                    raise ProviderError(f"{self.name} request to {model} failed: {e}") from e
+                await asyncio.sleep(retry_delay(e, attempt))
+
+
+class OpenAIProvider(ProviderClient):
+    """OpenAI chat and embeddings through one shared SDK client."""
+    
+    name = "OpenAI"
+    
+    def __init__(self):
+        if not config.openai_api_key and not config.provider_base_url:
+            raise ValueError(
+                "OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
+            )
+        super().__init__(config.openai_model, config.embedding_model)
+        
+        from openai import OpenAI
+        
+        # One SDK client per process keeps its pool of keep-alive connections
+        # warm; retries are handled here, under the rate limiter, not by the SDK
+        self.client = OpenAI(
+            **self._client_options(),
+            max_retries=0,
+            timeout=config.request_timeout
+        )
+        self._async_client = None
+        self._async_loop = None
+    
+    @property
+    def async_client(self):
+        """Async client bound to the running event loop (created on first use)."""
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            from openai import AsyncOpenAI
+            
+            self._async_client = AsyncOpenAI(
+                **self._client_options(),
+                max_retries=0,
+                timeout=config.request_timeout
+            )
+            self._async_loop = loop
+        return self._async_client
+    
+    @staticmethod
+    def _client_options() -> dict:
+        # A stand-in server (config.provider_base_url) does not check the key
+        if not config.provider_base_url:
+            return {"api_key": config.openai_api_key}
+        return {
+            "api_key": config.openai_api_key or "local",
+            "base_url": f"{config.provider_base_url.rstrip('/')}/v1"
+        }
+    
+    @staticmethod
+    def _chat_request(prompt: str, system: Optional[str], temperature: Optional[float], json_mode: bool) -> dict:
+        messages = [{"role": "user", "content": prompt}]
+        if system:
+            messages.insert(0, {"role": "system", "content": system})
+        
+        kwargs = dict(model=config.openai_model, messages=messages)
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+    
+    @staticmethod
+    def _usage(response) -> Usage:
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return None
+        return usage.prompt_tokens or 0, getattr(usage, "completion_tokens", 0) or 0
+    
+    def _complete(self, prompt, system, temperature, json_mode) -> Tuple[str, Usage]:
+        response = self.client.chat.completions.create(**self._chat_request(prompt, system, temperature, json_mode))
+        return response.choices[0].message.content, self._usage(response)
+    
+    async def _complete_async(self, prompt, system, temperature, json_mode) -> Tuple[str, Usage]:
+        response = await self.async_client.chat.completions.create(
+            **self._chat_request(prompt, system, temperature, json_mode)
+        )
+        return response.choices[0].message.content, self._usage(response)
+    
+    def _embed(self, texts: List[str]) -> Tuple[List[List[float]], Usage]:
+        kwargs = {}
+        if config.embedding_dimensions:
+            kwargs["dimensions"] = config.embedding_dimensions
+        
+        response = self.client.embeddings.create(
+            model=self.embedding_model,
+            input=texts,
+            **kwargs
+        )
+        vectors = [None] * len(texts)
+        for item in response.data:
+            vectors[item.index] = item.embedding
+        return vectors, self._usage(response)
+
+
+class GeminiProvider(ProviderClient):
+    """Gemini generation and embeddings through one configured SDK model."""
+    
+    name = "Gemini"
+    
+    def __init__(self):
+        if not config.gemini_api_key and not config.provider_base_url:
+            raise ValueError(
+                "Gemini API key not found. Please set GEMINI_API_KEY environment variable."
+            )
+        super().__init__(config.gemini_model, config.gemini_embedding_model)
+        
+        import google.generativeai as genai
+        
+        if config.provider_base_url:
+            # The stand-in server speaks the REST transport only
+            genai.configure(
+                api_key=config.gemini_api_key or "local",
+                transport="rest",
+                client_options={"api_endpoint": config.provider_base_url}
+            )
+        else:
+            genai.configure(api_key=config.gemini_api_key)
+        self.genai = genai
+        self.model = genai.GenerativeModel(config.gemini_model)
+    
+    @staticmethod
+    def _contents(prompt: str, system: Optional[str]) -> str:
+        return f"{system}\n\n{prompt}" if system else prompt
+    
+    @staticmethod
+    def _options(temperature: Optional[float]) -> dict:
+        # JSON mode is not requested: responses are unwrapped from code fences instead
+        if temperature is None:
+            return {}
+        return {"generation_config": {"temperature": temperature}}
+    
+    @staticmethod
+    def _usage(response) -> Usage:
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return None
+        return usage.prompt_token_count or 0, usage.candidates_token_count or 0
+    
+    def _complete(self, prompt, system, temperature, json_mode) -> Tuple[str, Usage]:
+        response = self.model.generate_content(self._contents(prompt, system), **self._options(temperature))
+        return response.text, self._usage(response)
+    
+    async def _complete_async(self, prompt, system, temperature, json_mode) -> Tuple[str, Usage]:
+        if config.provider_base_url:
+            # The SDK's async client is gRPC-only; run the REST call in a thread
+            return await asyncio.to_thread(self._complete, prompt, system, temperature, json_mode)
+        response = await self.model.generate_content_async(
+            self._contents(prompt, system),
+            **self._options(temperature)
+        )
+        return response.text, self._usage(response)
+    
+    def _embed(self, texts: List[str]) -> Tuple[List[List[float]], Usage]:
+        kwargs = {}
+        if config.gemini_embedding_dimensions:
+            kwargs["output_dimensionality"] = config.gemini_embedding_dimensions
+        
+        response = self.genai.embed_content(
+            model=self.embedding_model,
+            content=texts,
+            task_type="semantic_similarity",
+            **kwargs
+        )
+        # Gemini reports no token usage for embeddings
+        return response["embedding"], None
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "gemini": GeminiProvider,
+}
+
+
+def get_provider(name: str) -> ProviderClient:
+    """
+    Return the process-wide client of an AI provider, creating it on first use.
+    
+    Args:
+        name: "openai" or "gemini"
+        
+    Returns:
+        The shared ProviderClient
+    """
+    with _registry_lock:
+        if name not in _providers:
+            _providers[name] = PROVIDERS[name]()
+        return _providers[name]
@@ -2,38 +2,55 @@
 Similarity checker using OpenAI embeddings and GPT for semantic comparison.
 """
 
-import json
 from typing import List, Tuple
-from openai import OpenAI
 from .models import Idea, UserStory, SimilarityResult
 from .config import config
+from .cache import VerdictCache
+from .providers import get_provider
+from .adjudication import AdjudicationMixin
+from .embeddings import EmbeddingRetrievalMixin
+from .similarity_join import cosine_similarity
 
 
-class SimilarityChecker:
+# Bump whenever the comparison prompt changes so cached verdicts are discarded
+SIMILARITY_PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = "Eres un asistente experto en análisis de requerimientos de software. Tu tarea es identificar ideas duplicadas o muy similares en un backlog de producto."
+
+
+class SimilarityChecker(EmbeddingRetrievalMixin, AdjudicationMixin):
     """Check for semantic similarity between ideas and user stories."""
     
+    provider_name = "AI"
+    
     def __init__(self):
-        if not config.openai_api_key:
-            raise ValueError(
-                "OpenAI API key not found. Please set OPENAI_API_KEY environment variable."
+        self.provider = get_provider("openai")
+        self._init_embeddings(
+            model=config.embedding_model,
+            batch_size=config.embedding_batch_size,
+            index_name="openai",
+            dimensions=config.embedding_dimensions
+        )
+        self.verdict_cache = None
+        if config.use_verdict_cache:
+            self.verdict_cache = VerdictCache(
+                config.verdict_cache_file,
+                model=config.openai_model,
+                prompt_version=SIMILARITY_PROMPT_VERSION,
+                max_entries=config.verdict_cache_max_entries
             )
-        self.client = OpenAI(api_key=config.openai_api_key)
     
-    def get_embedding(self, text: str) -> List[float]:
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
         """
-        Get embedding vector for text using OpenAI's embedding model.
+        Embed a batch of texts with a single OpenAI embeddings request.
         
         Args:
-            text: Text to embed
+            texts: Texts to embed
             
         Returns:
-            Embedding vector as list of floats
+            Embedding vectors in input order
         """
-        response = self.client.embeddings.create(
-            model=config.embedding_model,
-            input=text
-        )
-        return response.data[0].embedding
+        return self.provider.embed(texts)
     
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
@@ -46,33 +63,20 @@ class SimilarityChecker:
         Returns:
             Similarity score between 0 and 1
         """
-        import math
-        
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(b * b for b in vec2))
-        
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
-        
-        return dot_product / (magnitude1 * magnitude2)
+        return cosine_similarity(vec1, vec2)
     
-    def check_similarity_with_ai(
-        self,
-        idea: Idea,
-        existing_item: UserStory | Idea
-    ) -> Tuple[float, str]:
+    def _similarity_prompt(self, idea: Idea, existing_item: UserStory | Idea) -> str:
         """
-        Use GPT to analyze semantic similarity and provide reasoning.
+        Build the GPT prompt comparing an idea with one existing item.
         
         Args:
             idea: The new idea to check
             existing_item: Existing user story or idea to compare against
             
         Returns:
-            Tuple of (similarity_score, reasoning)
+            Prompt text asking for a JSON similarity verdict
         """
-        prompt = f"""Analiza si estas dos descripciones representan la misma idea o funcionalidad.
+        return f"""Analiza si estas dos descripciones representan la misma idea o funcionalidad.
 
 IDEA NUEVA:
 Título: {idea.title}
@@ -95,99 +99,78 @@ Responde en formato JSON:
     "reason": "Ambas tratan sobre..."
 }}
 """
+    
+    def _complete_prompt(self, prompt: str) -> str:
+        """
+        Send a prompt to GPT.
         
-        try:
-            response = self.client.chat.completions.create(
-                model=config.openai_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Eres un asistente experto en análisis de requerimientos de software. Tu tarea es identificar ideas duplicadas o muy similares en un backlog de producto."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
+        Args:
+            prompt: Single-pair or batched adjudication prompt
             
-            result = json.loads(response.choices[0].message.content)
-            return (
-                float(result.get("similarity_score", 0.0)),
-                result.get("reason", "")
-            )
-        except Exception as e:
-            print(f"Error in AI similarity check: {e}")
-            return (0.0, "Error al analizar similitud")
+        Returns:
+            Raw JSON response text
+        """
+        return self.provider.complete(prompt, system=SYSTEM_PROMPT, temperature=0.3, json_mode=True)
     
-    def find_similar_items(
+    async def _complete_prompt_async(self, prompt: str) -> str:
+        """Send a prompt to GPT with the async client."""
+        return await self.provider.complete_async(prompt, system=SYSTEM_PROMPT, temperature=0.3, json_mode=True)
+    
+    def _build_results(
         self,
         idea: Idea,
-        user_stories: List[UserStory],
-        other_ideas: List[Idea] = None
+        items: List[UserStory | Idea],
+        verdicts: List[Tuple[float, str]]
     ) -> List[SimilarityResult]:
         """
-        Find similar user stories or ideas for a given idea.
+        Turn GPT verdicts into similarity results.
         
         Args:
-            idea: The idea to check
-            user_stories: List of existing user stories
-            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            idea: The idea that was checked
+            items: Candidates that were scored
+            verdicts: (similarity_score, reasoning) per candidate
             
         Returns:
-            List of SimilarityResult objects
+            List of SimilarityResult objects, highest score first
         """
         results = []
         
-        # Get embedding for the idea
-        idea_embedding = self.get_embedding(idea.full_text)
-        
-        # Check against user stories
-        for us in user_stories:
-            us_embedding = self.get_embedding(us.full_text)
-            similarity = self.cosine_similarity(idea_embedding, us_embedding)
+        for item, (ai_score, reason) in zip(items, verdicts):
+            is_duplicate = ai_score >= config.similarity_threshold
             
-            # If similarity is above a certain threshold, use AI for detailed analysis
-            if similarity >= (config.similarity_threshold - 0.1):  # Check slightly below threshold
-                ai_score, reason = self.check_similarity_with_ai(idea, us)
-                is_duplicate = ai_score >= config.similarity_threshold
-                
-                results.append(SimilarityResult(
-                    idea_id=idea.id,
-                    similar_item_id=us.id,
-                    similarity_score=ai_score,
-                    is_duplicate=is_duplicate,
-                    reason=reason
-                ))
-        
-        # Check against other ideas if provided
-        if other_ideas:
-            for other_idea in other_ideas:
-                if other_idea.id == idea.id:
-                    continue
-                
-                other_embedding = self.get_embedding(other_idea.full_text)
-                similarity = self.cosine_similarity(idea_embedding, other_embedding)
-                
-                if similarity >= (config.similarity_threshold - 0.1):
-                    ai_score, reason = self.check_similarity_with_ai(idea, other_idea)
-                    is_duplicate = ai_score >= config.similarity_threshold
-                    
-                    results.append(SimilarityResult(
-                        idea_id=idea.id,
-                        similar_item_id=other_idea.id,
-                        similarity_score=ai_score,
-                        is_duplicate=is_duplicate,
-                        reason=reason
-                    ))
+            results.append(SimilarityResult(
+                idea_id=idea.id,
+                similar_item_id=item.id,
+                similarity_score=ai_score,
+                is_duplicate=is_duplicate,
+                reason=reason
+            ))
         
         # Sort by similarity score (highest first)
         results.sort(key=lambda x: x.similarity_score, reverse=True)
         
         return results
     
+    def find_similar_items(
+        self,
+        idea: Idea,
+        user_stories: List[UserStory],
+        other_ideas: List[Idea] = None
+    ) -> List[SimilarityResult]:
+        """
+        Find similar user stories or ideas for a given idea.
+        
+        Args:
+            idea: The idea to check
+            user_stories: List of existing user stories
+            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            
+        Returns:
+            List of SimilarityResult objects
+        """
+        candidates = self.find_candidates([idea], user_stories, other_ideas)
+        return self.adjudicate(idea, candidates[idea.id])
+    
     def _format_existing_item(self, item: UserStory | Idea) -> str:
         """Format existing item for comparison prompt."""
         if isinstance(item, UserStory):
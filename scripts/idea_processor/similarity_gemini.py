@@ -2,23 +2,66 @@
 Similarity checker using Google Gemini API for semantic comparison.
 """
 
-import json
-from typing import List, Tuple
-import google.generativeai as genai
+from typing import Dict, List, Optional, Tuple
 from .models import Idea, UserStory, SimilarityResult
 from .config import config
+from .cache import VerdictCache
+from .providers import get_provider
+from .adjudication import AdjudicationMixin
+from .embeddings import EmbeddingRetrievalMixin
+from .similarity_join import cosine_similarity
 
 
-class GeminiSimilarityChecker:
+# Bump whenever the comparison prompt changes so cached verdicts are discarded
+SIMILARITY_PROMPT_VERSION = "1"
+
+
+class GeminiSimilarityChecker(EmbeddingRetrievalMixin, AdjudicationMixin):
     """Check for semantic similarity between ideas and user stories using Gemini."""
     
+    provider_name = "Gemini"
+    
     def __init__(self):
-        if not config.gemini_api_key:
-            raise ValueError(
-                "Gemini API key not found. Please set GEMINI_API_KEY environment variable."
+        self.provider = get_provider("gemini")
+        self._init_embeddings(
+            model=config.gemini_embedding_model,
+            batch_size=config.gemini_embedding_batch_size,
+            index_name="gemini",
+            dimensions=config.gemini_embedding_dimensions
+        )
+        self.verdict_cache = None
+        if config.use_verdict_cache:
+            self.verdict_cache = VerdictCache(
+                config.verdict_cache_file,
+                model=config.gemini_model,
+                prompt_version=SIMILARITY_PROMPT_VERSION,
+                max_entries=config.verdict_cache_max_entries
             )
-        genai.configure(api_key=config.gemini_api_key)
-        self.model = genai.GenerativeModel(config.gemini_model)
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a batch of texts with a single Gemini embedding request.
+        
+        Args:
+            texts: Texts to embed
+            
+        Returns:
+            Embedding vectors in input order
+        """
+        return self.provider.embed(texts)
+    
+    def prepare_corpus(self, ideas: List[Idea], user_stories: List[UserStory]) -> None:
+        """
+        Embed every idea and user story up front in batched requests.
+        
+        Nothing is embedded when embedding retrieval is disabled.
+        
+        Args:
+            ideas: All parsed ideas
+            user_stories: All parsed user stories
+        """
+        if config.gemini_retrieval == "embedding":
+            super().prepare_corpus(ideas, user_stories)
     
     def cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """
@@ -31,33 +74,51 @@ class GeminiSimilarityChecker:
         Returns:
             Similarity score between 0 and 1
         """
-        import math
+        return cosine_similarity(vec1, vec2)
+    
+    def find_candidates(
+        self,
+        ideas: List[Idea],
+        user_stories: List[UserStory],
+        other_ideas: List[Idea] = None
+    ) -> Dict[str, List[Tuple[UserStory | Idea, Optional[float]]]]:
+        """
+        Retrieve the existing items each idea should be compared against.
         
-        dot_product = sum(a * b for a, b in zip(vec1, vec2))
-        magnitude1 = math.sqrt(sum(a * a for a in vec1))
-        magnitude2 = math.sqrt(sum(b * b for b in vec2))
+        By default candidates come from Gemini embeddings (top-k within the
+        threshold band), so only those pairs reach ``check_similarity_with_ai``.
+        With ``config.gemini_retrieval == "none"`` every user story and every
+        other idea is a candidate.
         
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
+        Args:
+            ideas: Ideas to check
+            user_stories: List of existing user stories
+            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            
+        Returns:
+            Mapping of idea ID to (item, embedding similarity or None) candidates
+        """
+        if config.gemini_retrieval == "embedding":
+            return super().find_candidates(ideas, user_stories, other_ideas)
         
-        return dot_product / (magnitude1 * magnitude2)
+        corpus: List[UserStory | Idea] = list(user_stories) + list(other_ideas or [])
+        return {
+            idea.id: [(item, None) for item in corpus if item.id != idea.id]
+            for idea in ideas
+        }
     
-    def check_similarity_with_ai(
-        self,
-        idea: Idea,
-        existing_item: UserStory | Idea
-    ) -> Tuple[float, str]:
+    def _similarity_prompt(self, idea: Idea, existing_item: UserStory | Idea) -> str:
         """
-        Use Gemini to analyze semantic similarity and provide reasoning.
+        Build the Gemini prompt comparing an idea with one existing item.
         
         Args:
             idea: The new idea to check
             existing_item: Existing user story or idea to compare against
             
         Returns:
-            Tuple of (similarity_score, reasoning)
+            Prompt text asking for a JSON similarity verdict
         """
-        prompt = f"""Analiza si estas dos descripciones representan la misma idea o funcionalidad.
+        return f"""Analiza si estas dos descripciones representan la misma idea o funcionalidad.
 
 IDEA NUEVA:
 Título: {idea.title}
@@ -80,87 +141,80 @@ Responde SOLO con un JSON válido (sin markdown ni texto adicional):
     "reason": "Ambas tratan sobre..."
 }}
 """
+    
+    def _complete_prompt(self, prompt: str) -> str:
+        """
+        Send a prompt to Gemini.
         
-        try:
-            response = self.model.generate_content(prompt)
-            # Extract JSON from response
-            text = response.text.strip()
-            # Remove markdown code blocks if present
-            if text.startswith("```"):
-                text = text.split("```")[1]
-                if text.startswith("json"):
-                    text = text[4:]
-                text = text.strip()
+        Args:
+            prompt: Single-pair or batched adjudication prompt
             
-            result = json.loads(text)
-            return (
-                float(result.get("similarity_score", 0.0)),
-                result.get("reason", "")
-            )
-        except Exception as e:
-            print(f"Error in Gemini similarity check: {e}")
-            return (0.0, "Error al analizar similitud")
+        Returns:
+            Raw response text (may be wrapped in a markdown code block)
+        """
+        return self.provider.complete(prompt)
     
-    def find_similar_items(
+    async def _complete_prompt_async(self, prompt: str) -> str:
+        """Send a prompt to Gemini without blocking the event loop."""
+        return await self.provider.complete_async(prompt)
+    
+    def _build_results(
         self,
         idea: Idea,
-        user_stories: List[UserStory],
-        other_ideas: List[Idea] = None
+        items: List[UserStory | Idea],
+        verdicts: List[Tuple[float, str]]
     ) -> List[SimilarityResult]:
         """
-        Find similar user stories or ideas for a given idea using Gemini.
+        Turn Gemini verdicts into similarity results.
         
         Args:
-            idea: The idea to check
-            user_stories: List of existing user stories
-            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            idea: The idea that was checked
+            items: Candidates that were scored
+            verdicts: (similarity_score, reasoning) per candidate
             
         Returns:
-            List of SimilarityResult objects
+            List of SimilarityResult objects, highest score first
         """
         results = []
         
-        # Check against user stories
-        for us in user_stories:
-            # Use Gemini for detailed analysis
-            ai_score, reason = self.check_similarity_with_ai(idea, us)
-            
+        for item, (ai_score, reason) in zip(items, verdicts):
             # Only add if similarity is above a threshold
             if ai_score >= (config.similarity_threshold - 0.1):
                 is_duplicate = ai_score >= config.similarity_threshold
                 
                 results.append(SimilarityResult(
                     idea_id=idea.id,
-                    similar_item_id=us.id,
+                    similar_item_id=item.id,
                     similarity_score=ai_score,
                     is_duplicate=is_duplicate,
                     reason=reason
                 ))
         
-        # Check against other ideas if provided
-        if other_ideas:
-            for other_idea in other_ideas:
-                if other_idea.id == idea.id:
-                    continue
-                
-                ai_score, reason = self.check_similarity_with_ai(idea, other_idea)
-                
-                if ai_score >= (config.similarity_threshold - 0.1):
-                    is_duplicate = ai_score >= config.similarity_threshold
-                    
-                    results.append(SimilarityResult(
-                        idea_id=idea.id,
-                        similar_item_id=other_idea.id,
-                        similarity_score=ai_score,
-                        is_duplicate=is_duplicate,
-                        reason=reason
-                    ))
-        
         # Sort by similarity score (highest first)
         results.sort(key=lambda x: x.similarity_score, reverse=True)
         
         return results
     
+    def find_similar_items(
+        self,
+        idea: Idea,
+        user_stories: List[UserStory],
+        other_ideas: List[Idea] = None
+    ) -> List[SimilarityResult]:
+        """
+        Find similar user stories or ideas for a given idea using Gemini.
+        
+        Args:
+            idea: The idea to check
+            user_stories: List of existing user stories
+            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            
+        Returns:
+            List of SimilarityResult objects
+        """
+        candidates = self.find_candidates([idea], user_stories, other_ideas)
+        return self.adjudicate(idea, candidates[idea.id])
+    
     def _format_existing_item(self, item: UserStory | Idea) -> str:
         """Format existing item for comparison prompt."""
         if isinstance(item, UserStory):
@@ -0,0 +1,128 @@
+"""
+Vectorized similarity join over embedding matrices.
+
+Scores every candidate idea against the whole corpus (user stories and other
+ideas) with blocked float32 matrix multiplies and keeps only the top-k
+neighbours per candidate, so memory stays bounded by the block size rather
+than by candidates x corpus.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def normalize_matrix(vectors: Sequence[Sequence[float]], dimensions: int = 0) -> np.ndarray:
+    """
+    Pack vectors into an L2-normalized float32 matrix.
+    
+    Args:
+        vectors: Embedding vectors (all the same length)
+        dimensions: Column count to use when ``vectors`` is empty
+        
+    Returns:
+        Matrix of shape (len(vectors), dimensions); zero vectors stay zero
+    """
+    if len(vectors) == 0:
+        return np.zeros((0, dimensions), dtype=np.float32)
+    
+    matrix = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarity(vec1: Sequence[float], vec2: Sequence[float]) -> float:
+    """
+    Calculate cosine similarity between two vectors.
+    
+    Args:
+        vec1: First vector
+        vec2: Second vector
+        
+    Returns:
+        Similarity score between -1 and 1 (0.0 if either vector is zero)
+    """
+    a = np.asarray(vec1, dtype=np.float32)
+    b = np.asarray(vec2, dtype=np.float32)
+    magnitude = float(np.linalg.norm(a) * np.linalg.norm(b))
+    if magnitude == 0:
+        return 0.0
+    return float(np.dot(a, b) / magnitude)
+
+
+def top_k_join(
+    queries: np.ndarray,
+    corpus: np.ndarray,
+    k: int,
+    min_score: float = -1.0,
+    block_size: int = 1024,
+    exclude: Optional[Sequence[int]] = None
+) -> List[List[Tuple[int, float]]]:
+    """
+    Find the top-k most similar corpus rows for every query row.
+    
+    Both matrices must already be L2-normalized (see ``normalize_matrix``),
+    so the dot product is the cosine similarity. Queries and corpus are
+    processed in blocks of ``block_size`` rows, which caps the score buffer
+    at ``block_size x block_size`` floats regardless of corpus size.
+    
+    Args:
+        queries: Normalized query matrix (n_queries x dims)
+        corpus: Normalized corpus matrix (n_corpus x dims)
+        k: Neighbours to keep per query (0 keeps every row above ``min_score``)
+        min_score: Discard neighbours scoring below this value
+        block_size: Rows per block for both queries and corpus
+        exclude: Optional corpus row to skip for each query (-1 for none),
+            used to stop an idea from matching itself
+            
+    Returns:
+        For each query, a list of (corpus_row, score) sorted by score descending
+    """
+    n_queries, n_corpus = queries.shape[0], corpus.shape[0]
+    if n_queries == 0:
+        return []
+    if n_corpus == 0:
+        return [[] for _ in range(n_queries)]
+    
+    k = n_corpus if k <= 0 else min(k, n_corpus)
+    exclude_rows = np.asarray(exclude if exclude is not None else [-1] * n_queries, dtype=np.int64)
+    results: List[List[Tuple[int, float]]] = []
+    
+    for q_start in range(0, n_queries, block_size):
+        q_block = queries[q_start:q_start + block_size]
+        q_exclude = exclude_rows[q_start:q_start + block_size]
+        rows = np.arange(q_block.shape[0])
+        
+        best_scores = np.full((q_block.shape[0], k), -np.inf, dtype=np.float32)
+        best_index = np.full((q_block.shape[0], k), -1, dtype=np.int64)
+        
+        for c_start in range(0, n_corpus, block_size):
+            scores = q_block @ corpus[c_start:c_start + block_size].T
+            
+            # Mask each query's own row if it falls in this corpus block
+            local = q_exclude - c_start
+            in_block = (local >= 0) & (local < scores.shape[1])
+            scores[rows[in_block], local[in_block]] = -np.inf
+            
+            block_k = min(k, scores.shape[1])
+            part = np.argpartition(-scores, block_k - 1, axis=1)[:, :block_k]
+            
+            merged_scores = np.concatenate(
+                [best_scores, np.take_along_axis(scores, part, axis=1)], axis=1
+            )
+            merged_index = np.concatenate([best_index, part + c_start], axis=1)
+            keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+            best_index = np.take_along_axis(merged_index, keep, axis=1)
+        
+        for scores_row, index_row in zip(best_scores, best_index):
+            # Highest score first; ties broken by corpus order for stable output
+            order = np.lexsort((index_row, -scores_row))
+            results.append([
+                (int(index_row[i]), float(scores_row[i]))
+                for i in order
+                if index_row[i] >= 0 and scores_row[i] >= min_score
+            ])
+    
+    return results
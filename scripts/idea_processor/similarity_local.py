@@ -0,0 +1,216 @@
+"""
+Offline similarity checker using TF-IDF vectors over normalized text.
+
+Needs no network or API key: it can run as a standalone provider
+(AI_PROVIDER=local) or as a cheap first-stage filter that shortlists
+candidates before an OpenAI or Gemini checker adjudicates them.
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .models import Idea, UserStory, SimilarityResult
+from .config import config
+from .text_normalization import normalize_tokens
+
+
+class LexicalIndex:
+    """Sparse TF-IDF vectors with an inverted index for fast scoring."""
+    
+    def __init__(self, documents: Dict[str, str]):
+        """
+        Build the index.
+        
+        Args:
+            documents: Mapping of item ID to text
+        """
+        term_counts = {doc_id: Counter(normalize_tokens(text)) for doc_id, text in documents.items()}
+        
+        document_frequency: Counter = Counter()
+        for counts in term_counts.values():
+            document_frequency.update(counts.keys())
+        
+        n_docs = len(documents)
+        self.idf = {
+            term: math.log((1 + n_docs) / (1 + df)) + 1.0
+            for term, df in document_frequency.items()
+        }
+        
+        self.vectors: Dict[str, Dict[str, float]] = {}
+        self.postings: Dict[str, List[Tuple[str, float]]] = defaultdict(list)
+        
+        for doc_id, counts in term_counts.items():
+            vector = {
+                term: (1.0 + math.log(tf)) * self.idf[term]
+                for term, tf in counts.items()
+            }
+            norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+            vector = {term: w / norm for term, w in vector.items()}
+            self.vectors[doc_id] = vector
+            for term, weight in vector.items():
+                self.postings[term].append((doc_id, weight))
+    
+    def query(
+        self,
+        doc_id: str,
+        allowed: Optional[set] = None,
+        top_k: int = 0,
+        min_score: float = 0.0
+    ) -> List[Tuple[str, float]]:
+        """
+        Score indexed documents against one indexed document.
+        
+        Args:
+            doc_id: ID of the query document
+            allowed: Restrict results to these IDs (None allows all)
+            top_k: Maximum results (0 for no limit)
+            min_score: Minimum cosine score to keep
+            
+        Returns:
+            (doc_id, score) pairs sorted by score descending
+        """
+        scores: Dict[str, float] = defaultdict(float)
+        for term, weight in self.vectors.get(doc_id, {}).items():
+            for other_id, other_weight in self.postings[term]:
+                if other_id != doc_id and (allowed is None or other_id in allowed):
+                    scores[other_id] += weight * other_weight
+        
+        ranked = sorted(
+            ((other_id, score) for other_id, score in scores.items() if score >= min_score),
+            key=lambda pair: (-pair[1], pair[0])
+        )
+        return ranked[:top_k] if top_k > 0 else ranked
+    
+    def shared_terms(self, doc_a: str, doc_b: str, limit: int = 5) -> List[str]:
+        """Return the terms contributing most to the similarity of two documents."""
+        vec_a, vec_b = self.vectors.get(doc_a, {}), self.vectors.get(doc_b, {})
+        common = sorted(
+            (term for term in vec_a if term in vec_b),
+            key=lambda term: -(vec_a[term] * vec_b[term])
+        )
+        return common[:limit]
+
+
+class LocalSimilarityChecker:
+    """Check for lexical similarity between ideas and user stories, offline."""
+    
+    def __init__(self, top_k: Optional[int] = None, min_score: Optional[float] = None):
+        """
+        Args:
+            top_k: Candidates kept per idea (default ``config.similarity_top_k``)
+            min_score: Minimum lexical score for a candidate (default: 0.1
+                below ``config.local_similarity_threshold``)
+        """
+        self.top_k = config.similarity_top_k if top_k is None else top_k
+        self.min_score = (
+            config.local_similarity_threshold - 0.1 if min_score is None else min_score
+        )
+        self.index: Optional[LexicalIndex] = None
+    
+    def prepare_corpus(self, ideas: List[Idea], user_stories: List[UserStory]) -> None:
+        """
+        Build the TF-IDF index over every idea and user story.
+        
+        Args:
+            ideas: All parsed ideas
+            user_stories: All parsed user stories
+        """
+        self.index = LexicalIndex(
+            {item.id: item.full_text for item in list(user_stories) + list(ideas)}
+        )
+    
+    def find_candidates(
+        self,
+        ideas: List[Idea],
+        user_stories: List[UserStory],
+        other_ideas: List[Idea] = None
+    ) -> Dict[str, List[Tuple[UserStory | Idea, float]]]:
+        """
+        Retrieve the most lexically similar existing items for each idea.
+        
+        Args:
+            ideas: Ideas to check
+            user_stories: List of existing user stories
+            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            
+        Returns:
+            Mapping of idea ID to (item, lexical score) candidates,
+            highest score first
+        """
+        corpus: Dict[str, UserStory | Idea] = {
+            item.id: item for item in list(user_stories) + list(other_ideas or [])
+        }
+        self._ensure_indexed(list(ideas) + list(corpus.values()))
+        
+        candidates = {}
+        for idea in ideas:
+            matches = self.index.query(
+                idea.id,
+                allowed=set(corpus),
+                top_k=self.top_k,
+                min_score=self.min_score
+            )
+            candidates[idea.id] = [(corpus[item_id], score) for item_id, score in matches]
+        
+        return candidates
+    
+    def adjudicate(
+        self,
+        idea: Idea,
+        candidates: List[Tuple[UserStory | Idea, float]]
+    ) -> List[SimilarityResult]:
+        """
+        Turn lexical candidates into similarity results.
+        
+        Args:
+            idea: The idea to check
+            candidates: (item, lexical score) pairs from ``find_candidates``
+            
+        Returns:
+            List of SimilarityResult objects, highest score first
+        """
+        results = []
+        
+        for item, score in candidates:
+            terms = self.index.shared_terms(idea.id, item.id) if self.index else []
+            reason = f"Similitud léxica {score:.0%}"
+            if terms:
+                reason += f" (términos comunes: {', '.join(terms)})"
+            
+            results.append(SimilarityResult(
+                idea_id=idea.id,
+                similar_item_id=item.id,
+                similarity_score=score,
+                is_duplicate=score >= config.local_similarity_threshold,
+                reason=reason
+            ))
+        
+        results.sort(key=lambda x: x.similarity_score, reverse=True)
+        
+        return results
+    
+    def find_similar_items(
+        self,
+        idea: Idea,
+        user_stories: List[UserStory],
+        other_ideas: List[Idea] = None
+    ) -> List[SimilarityResult]:
+        """
+        Find lexically similar user stories or ideas for a given idea.
+        
+        Args:
+            idea: The idea to check
+            user_stories: List of existing user stories
+            other_ideas: List of other ideas (optional, to check for duplicate ideas)
+            
+        Returns:
+            List of SimilarityResult objects
+        """
+        candidates = self.find_candidates([idea], user_stories, other_ideas)
+        return self.adjudicate(idea, candidates[idea.id])
+    
+    def _ensure_indexed(self, items: Sequence[Idea | UserStory]) -> None:
+        """Rebuild the index if any item is missing from it."""
+        if self.index is None or any(item.id not in self.index.vectors for item in items):
+            self.index = LexicalIndex({item.id: item.full_text for item in items})
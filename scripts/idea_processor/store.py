@@ -0,0 +1,529 @@
+"""
+Optional SQLite mirror of IDEAS.md and BACKLOG.md.
+
+The markdown files stay the source of truth; the store is a derived index
+that is synced incrementally from them at the start of every run. Each
+idea and user story is a row keyed by a hash of its content, so a sync only
+parses and writes the items that were added or edited and deletes the ones
+that disappeared. Acceptance criteria, dependencies, affected services and
+technical notes live in child tables, an FTS5 table indexes the comparison
+corpus (user stories and ideas not converted or marked as repeated) for
+lexical candidate retrieval, and an embeddings table keeps one vector per
+corpus text and model. ID allocation reads the highest numbers in use
+instead of scanning the files.
+
+Enable it with ``BACKLOG_STORE=1`` or ``--store``.
+"""
+
+import atexit
+import re
+import sqlite3
+from array import array
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .cache import content_hash
+from .models import AcceptanceCriteria, Idea, UserStory
+from .parser import MarkdownParser, PriorityIndex, is_superseded
+
+
+# Bumped whenever the schema changes; an older database is rebuilt from scratch
+STORE_VERSION = 1
+
+# Words of an idea used in its full-text query
+QUERY_TOKEN = re.compile(r'\w{3,}')
+MAX_QUERY_TERMS = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ideas (
+    rowid INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    number INTEGER,
+    title TEXT NOT NULL,
+    context TEXT NOT NULL,
+    problem TEXT NOT NULL,
+    value TEXT NOT NULL,
+    date_created TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    superseded INTEGER NOT NULL,
+    full_text TEXT NOT NULL,
+    text_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ideas_hash ON ideas (hash);
+CREATE INDEX IF NOT EXISTS idx_ideas_id ON ideas (id);
+CREATE INDEX IF NOT EXISTS idx_ideas_number ON ideas (number);
+CREATE INDEX IF NOT EXISTS idx_ideas_text_hash ON ideas (text_hash);
+CREATE TABLE IF NOT EXISTS user_stories (
+    rowid INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    number INTEGER,
+    title TEXT NOT NULL,
+    as_a TEXT NOT NULL,
+    i_want TEXT NOT NULL,
+    so_that TEXT NOT NULL,
+    estimation INTEGER,
+    epic TEXT,
+    priority TEXT NOT NULL,
+    status TEXT NOT NULL,
+    full_text TEXT NOT NULL,
+    text_hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_user_stories_hash ON user_stories (hash);
+CREATE INDEX IF NOT EXISTS idx_user_stories_id ON user_stories (id);
+CREATE INDEX IF NOT EXISTS idx_user_stories_number ON user_stories (number);
+CREATE INDEX IF NOT EXISTS idx_user_stories_text_hash ON user_stories (text_hash);
+CREATE TABLE IF NOT EXISTS acceptance_criteria (
+    story INTEGER NOT NULL REFERENCES user_stories (rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    completed INTEGER NOT NULL,
+    PRIMARY KEY (story, position)
+);
+CREATE TABLE IF NOT EXISTS story_dependencies (
+    story INTEGER NOT NULL REFERENCES user_stories (rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    dependency TEXT NOT NULL,
+    PRIMARY KEY (story, position)
+);
+CREATE INDEX IF NOT EXISTS idx_story_dependencies ON story_dependencies (dependency);
+CREATE TABLE IF NOT EXISTS story_services (
+    story INTEGER NOT NULL REFERENCES user_stories (rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    service TEXT NOT NULL,
+    PRIMARY KEY (story, position)
+);
+CREATE INDEX IF NOT EXISTS idx_story_services ON story_services (service);
+CREATE TABLE IF NOT EXISTS story_notes (
+    story INTEGER NOT NULL REFERENCES user_stories (rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    note TEXT NOT NULL,
+    PRIMARY KEY (story, position)
+);
+CREATE TABLE IF NOT EXISTS embeddings (
+    text_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (text_hash, model)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS search USING fts5 (
+    title,
+    body,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _number(item_id: str) -> Optional[int]:
+    """Numeric part of an ID such as "US-012" (None for "ID-XXX")."""
+    match = re.search(r'(\d+)$', item_id)
+    return int(match.group(1)) if match else None
+
+
+def _search_rowid(rowid: int, is_story: bool) -> int:
+    """Row of an item in the FTS table (ideas even, user stories odd)."""
+    return rowid * 2 + is_story
+
+
+class BacklogStore:
+    """
+    SQLite database mirroring the ideas and user stories of the markdown files.
+    
+    Call ``sync`` with the current file contents before querying.
+    """
+    
+    # Columns the models are rebuilt from
+    _IDEA_COLUMNS = "id, title, context, problem, value, date_created, status, priority, full_text"
+    _STORY_COLUMNS = "rowid, id, title, as_a, i_want, so_that, estimation, epic, priority, status, full_text"
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = self._connect()
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] not in (0, STORE_VERSION):
+            # Derived data only: rebuild instead of migrating
+            self._conn.close()
+            self.path.unlink()
+            self._conn = self._connect()
+        
+        try:
+            self._conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(
+                "BACKLOG_STORE=1 requires a SQLite build with the FTS5 extension "
+                f"(SQLite {sqlite3.sqlite_version}): {e}"
+            ) from e
+        self._conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        self._conn.commit()
+        self._closed = False
+        atexit.register(self.close)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._conn.close()
+    
+    def sync(
+        self,
+        ideas_content: str,
+        backlog_content: str,
+        user_stories: Optional[Sequence[UserStory]] = None
+    ) -> Dict[str, int]:
+        """
+        Bring the store up to date with the markdown files.
+        
+        A file whose content hash is unchanged since the last sync is
+        skipped; otherwise only added or edited items are written and
+        missing ones deleted.
+        
+        Args:
+            ideas_content: The content of IDEAS.md
+            backlog_content: The content of BACKLOG.md
+            user_stories: Stories already parsed from ``backlog_content`` (parsed here if None)
+            
+        Returns:
+            Number of ideas and user stories added and removed
+        """
+        changes = {"ideas_added": 0, "ideas_removed": 0, "user_stories_added": 0, "user_stories_removed": 0}
+        ideas_hash = content_hash(ideas_content)
+        backlog_hash = content_hash(backlog_content)
+        
+        with self._conn:
+            if self._meta("ideas_hash") != ideas_hash:
+                changes["ideas_added"], changes["ideas_removed"] = self._sync_ideas(ideas_content)
+                self._set_meta("ideas_hash", ideas_hash)
+                self._set_meta("max_idea_reference", MarkdownParser.get_next_id_number(ideas_content) - 1)
+            
+            if self._meta("backlog_hash") != backlog_hash:
+                if user_stories is None:
+                    user_stories = MarkdownParser.parse_user_stories(backlog_content)
+                changes["user_stories_added"], changes["user_stories_removed"] = self._sync_user_stories(user_stories)
+                self._set_meta("backlog_hash", backlog_hash)
+                self._set_meta("max_us_reference", MarkdownParser.get_next_us_number(backlog_content) - 1)
+            
+            if changes["ideas_removed"] or changes["user_stories_removed"]:
+                self._conn.execute(
+                    """DELETE FROM embeddings WHERE text_hash NOT IN (
+                        SELECT text_hash FROM ideas UNION SELECT text_hash FROM user_stories
+                    )"""
+                )
+        return changes
+    
+    def next_us_number(self) -> int:
+        """Next free US number (above every story and every US-XXX mention in BACKLOG.md)."""
+        highest = self._conn.execute("SELECT MAX(number) FROM user_stories").fetchone()[0] or 0
+        return max(highest, int(self._meta("max_us_reference") or 0)) + 1
+    
+    def next_idea_number(self) -> int:
+        """Next free ID number (above every idea and every ID-XXX mention in IDEAS.md)."""
+        highest = self._conn.execute("SELECT MAX(number) FROM ideas").fetchone()[0] or 0
+        return max(highest, int(self._meta("max_idea_reference") or 0)) + 1
+    
+    def get_user_story(self, us_id: str) -> Optional[UserStory]:
+        """Look up a user story by ID."""
+        row = self._conn.execute(
+            f"SELECT {self._STORY_COLUMNS} FROM user_stories WHERE id = ? ORDER BY position LIMIT 1",
+            (us_id,)
+        ).fetchone()
+        return self._story_from_row(row) if row is not None else None
+    
+    def get_ideas(self, idea_id: str) -> List[Idea]:
+        """Look up the ideas with an ID (IDEAS.md may repeat one), in document order."""
+        rows = self._conn.execute(
+            f"SELECT {self._IDEA_COLUMNS} FROM ideas WHERE id = ? ORDER BY position",
+            (idea_id,)
+        ).fetchall()
+        return [self._idea_from_row(row) for row in rows]
+    
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Idea | UserStory, float]]:
+        """
+        Full-text search over the comparison corpus.
+        
+        Args:
+            query: FTS5 query (e.g. ``"cache OR caché"``)
+            limit: Maximum number of results
+            
+        Returns:
+            (item, relevance) pairs, most relevant first
+        """
+        rows = self._conn.execute(
+            "SELECT rowid, -bm25(search) FROM search WHERE search MATCH ? ORDER BY bm25(search) LIMIT ?",
+            (query, limit)
+        ).fetchall()
+        return self._materialize(rows)
+    
+    def lexical_candidates(self, idea: Idea, top_k: int) -> List[Tuple[Idea | UserStory, float]]:
+        """
+        Retrieve the corpus items sharing the most relevant words with an idea.
+        
+        Args:
+            idea: Idea to find candidates for
+            top_k: Maximum number of candidates
+            
+        Returns:
+            (item, BM25 relevance) pairs, most relevant first, without the idea itself
+        """
+        text = f"{idea.title} {idea.context} {idea.problem} {idea.value}"
+        terms = list(dict.fromkeys(token.lower() for token in QUERY_TOKEN.findall(text)))[:MAX_QUERY_TERMS]
+        if not terms:
+            return []
+        
+        query = " OR ".join(f'"{term}"' for term in terms)
+        matches = self.search(query, top_k + 1)
+        return [
+            (item, score) for item, score in matches
+            if not (isinstance(item, Idea) and item.id == idea.id)
+        ][:top_k]
+    
+    def embeddings(self, model: str) -> Dict[str, List[float]]:
+        """
+        Stored vectors of the current corpus texts.
+        
+        Args:
+            model: Embedding model key (model name and dimensions)
+            
+        Returns:
+            Mapping of item full_text to vector
+        """
+        rows = self._conn.execute(
+            """SELECT items.full_text, embeddings.vector FROM embeddings
+               JOIN (SELECT full_text, text_hash FROM ideas
+                     UNION SELECT full_text, text_hash FROM user_stories) AS items
+               USING (text_hash)
+               WHERE embeddings.model = ?""",
+            (model,)
+        ).fetchall()
+        return {full_text: self._decode(blob) for full_text, blob in rows}
+    
+    def put_embeddings(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """
+        Store vectors of corpus texts; they are dropped when their item is.
+        
+        Texts that are not the full_text of a stored item are ignored.
+        
+        Args:
+            model: Embedding model key (model name and dimensions)
+            vectors: Mapping of item full_text to vector
+        """
+        if not vectors:
+            return
+        with self._conn:
+            self._conn.executemany(
+                """INSERT OR REPLACE INTO embeddings (text_hash, model, vector)
+                   SELECT :text_hash, :model, :vector
+                   WHERE EXISTS (SELECT 1 FROM ideas WHERE text_hash = :text_hash)
+                      OR EXISTS (SELECT 1 FROM user_stories WHERE text_hash = :text_hash)""",
+                [
+                    {"text_hash": content_hash(text), "model": model, "vector": self._encode(vector)}
+                    for text, vector in vectors.items()
+                ]
+            )
+    
+    def _sync_ideas(self, content: str) -> Tuple[int, int]:
+        """Write added or edited ideas and delete missing ones."""
+        entries = MarkdownParser.index_ideas(content)
+        priorities = PriorityIndex(content)
+        # The section decides an idea's priority, so it is part of the hash
+        keys = [
+            content_hash(priorities.priority_at(entry.start), content[entry.start:entry.end])
+            for entry in entries
+        ]
+        kept, added = self._match_rows("ideas", keys)
+        
+        stale = self._stale_rows("ideas", kept)
+        self._delete_rows("ideas", stale, is_story=False)
+        self._conn.executemany("UPDATE ideas SET position = ? WHERE rowid = ?", kept)
+        
+        parsed = MarkdownParser.parse_ideas(content, [entries[position] for position in added])
+        for position, idea in zip(added, parsed):
+            self._insert_idea(keys[position], position, idea)
+        return len(added), len(stale)
+    
+    def _sync_user_stories(self, user_stories: Sequence[UserStory]) -> Tuple[int, int]:
+        """Write added or edited user stories and delete missing ones."""
+        keys = [content_hash(user_story.model_dump_json()) for user_story in user_stories]
+        kept, added = self._match_rows("user_stories", keys)
+        
+        stale = self._stale_rows("user_stories", kept)
+        self._delete_rows("user_stories", stale, is_story=True)
+        self._conn.executemany("UPDATE user_stories SET position = ? WHERE rowid = ?", kept)
+        
+        for position in added:
+            self._insert_user_story(keys[position], position, user_stories[position])
+        return len(added), len(stale)
+    
+    def _match_rows(self, table: str, keys: List[str]) -> Tuple[List[Tuple[int, int]], List[int]]:
+        """
+        Pair item hashes with existing rows.
+        
+        Returns:
+            (position, rowid) of items already stored, and positions of new items
+        """
+        rows: Dict[str, List[int]] = defaultdict(list)
+        for rowid, key in self._conn.execute(f"SELECT rowid, hash FROM {table}"):
+            rows[key].append(rowid)
+        
+        kept, added = [], []
+        for position, key in enumerate(keys):
+            if rows.get(key):
+                kept.append((position, rows[key].pop()))
+            else:
+                added.append(position)
+        return kept, added
+    
+    def _stale_rows(self, table: str, kept: List[Tuple[int, int]]) -> List[int]:
+        kept_rows = {rowid for _, rowid in kept}
+        return [rowid for (rowid,) in self._conn.execute(f"SELECT rowid FROM {table}") if rowid not in kept_rows]
+    
+    def _delete_rows(self, table: str, rowids: List[int], is_story: bool) -> None:
+        self._conn.executemany(f"DELETE FROM {table} WHERE rowid = ?", [(rowid,) for rowid in rowids])
+        self._conn.executemany(
+            "DELETE FROM search WHERE rowid = ?",
+            [(_search_rowid(rowid, is_story),) for rowid in rowids]
+        )
+    
+    def _insert_idea(self, key: str, position: int, idea: Idea) -> None:
+        superseded = is_superseded(idea.status)
+        rowid = self._conn.execute(
+            """INSERT INTO ideas (hash, position, id, number, title, context, problem, value,
+                                  date_created, status, priority, superseded, full_text, text_hash)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (key, position, idea.id, _number(idea.id), idea.title, idea.context, idea.problem, idea.value,
+             idea.date_created, idea.status, idea.priority, superseded, idea.full_text, content_hash(idea.full_text))
+        ).lastrowid
+        # Converted and repeated ideas are not compared against, so not indexed
+        if not superseded:
+            self._conn.execute(
+                "INSERT INTO search (rowid, title, body) VALUES (?, ?, ?)",
+                (_search_rowid(rowid, False), idea.title, f"{idea.context} {idea.problem} {idea.value}")
+            )
+    
+    def _insert_user_story(self, key: str, position: int, user_story: UserStory) -> None:
+        rowid = self._conn.execute(
+            """INSERT INTO user_stories (hash, position, id, number, title, as_a, i_want, so_that,
+                                         estimation, epic, priority, status, full_text, text_hash)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (key, position, user_story.id, _number(user_story.id), user_story.title, user_story.as_a,
+             user_story.i_want, user_story.so_that, user_story.estimation, user_story.epic,
+             user_story.priority, user_story.status, user_story.full_text, content_hash(user_story.full_text))
+        ).lastrowid
+        self._conn.executemany(
+            "INSERT INTO acceptance_criteria (story, position, text, completed) VALUES (?, ?, ?, ?)",
+            [(rowid, i, ac.text, ac.completed) for i, ac in enumerate(user_story.acceptance_criteria)]
+        )
+        for table, column, values in (
+            ("story_dependencies", "dependency", user_story.dependencies),
+            ("story_services", "service", user_story.affected_services),
+            ("story_notes", "note", user_story.technical_notes),
+        ):
+            self._conn.executemany(
+                f"INSERT INTO {table} (story, position, {column}) VALUES (?, ?, ?)",
+                [(rowid, i, value) for i, value in enumerate(values)]
+            )
+        body = " ".join(
+            [user_story.as_a, user_story.i_want, user_story.so_that]
+            + [ac.text for ac in user_story.acceptance_criteria]
+            + user_story.technical_notes
+        )
+        self._conn.execute(
+            "INSERT INTO search (rowid, title, body) VALUES (?, ?, ?)",
+            (_search_rowid(rowid, True), user_story.title, body)
+        )
+    
+    def _materialize(self, rows: List[Tuple[int, float]]) -> List[Tuple[Idea | UserStory, float]]:
+        """Build the items of (FTS rowid, score) rows, keeping their order."""
+        results = []
+        for search_rowid, score in rows:
+            rowid, is_story = divmod(search_rowid, 2)
+            if is_story:
+                row = self._conn.execute(
+                    f"SELECT {self._STORY_COLUMNS} FROM user_stories WHERE rowid = ?", (rowid,)
+                ).fetchone()
+                results.append((self._story_from_row(row), score))
+            else:
+                row = self._conn.execute(
+                    f"SELECT {self._IDEA_COLUMNS} FROM ideas WHERE rowid = ?", (rowid,)
+                ).fetchone()
+                results.append((self._idea_from_row(row), score))
+        return results
+    
+    @staticmethod
+    def _idea_from_row(row: tuple) -> Idea:
+        idea_id, title, context, problem, value, date_created, status, priority, full_text = row
+        return Idea(
+            id=idea_id,
+            title=title,
+            context=context,
+            problem=problem,
+            value=value,
+            date_created=date_created,
+            status=status,
+            priority=priority,
+            full_text=full_text
+        )
+    
+    def _story_from_row(self, row: tuple) -> UserStory:
+        rowid, us_id, title, as_a, i_want, so_that, estimation, epic, priority, status, full_text = row
+        
+        def children(table: str, column: str) -> List:
+            return [
+                value for (value,) in self._conn.execute(
+                    f"SELECT {column} FROM {table} WHERE story = ? ORDER BY position", (rowid,)
+                )
+            ]
+        
+        return UserStory(
+            id=us_id,
+            title=title,
+            as_a=as_a,
+            i_want=i_want,
+            so_that=so_that,
+            acceptance_criteria=[
+                AcceptanceCriteria(text=text, completed=bool(completed))
+                for text, completed in self._conn.execute(
+                    "SELECT text, completed FROM acceptance_criteria WHERE story = ? ORDER BY position",
+                    (rowid,)
+                )
+            ],
+            estimation=estimation,
+            epic=epic,
+            priority=priority,
+            affected_services=children("story_services", "service"),
+            dependencies=children("story_dependencies", "dependency"),
+            status=status,
+            technical_notes=children("story_notes", "note"),
+            full_text=full_text
+        )
+    
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+    
+    def _set_meta(self, key: str, value) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+    
+    @staticmethod
+    def _encode(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+    
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
@@ -0,0 +1,98 @@
+"""
+Spanish-aware text normalization for lexical similarity.
+
+Ideas and user stories are written in Spanish with a sprinkling of English
+product terms, so normalization folds accents, drops stopwords in both
+languages and applies a light suffix-stripping stemmer.
+"""
+
+import re
+import unicodedata
+from typing import List
+
+
+SPANISH_STOPWORDS = frozenset("""
+a al algo algunas algunos ante antes como con contra cual cuales cuando de del
+desde donde durante e el ella ellas ellos en entre era eran es esa esas ese eso
+esos esta estan estar estas este esto estos fue fueron ha han hasta hay la las
+le les lo los mas me mi mis muy nada ni no nos o otra otras otro otros para pero
+poco por porque que quien quienes se sea ser si sin sobre son su sus tambien
+tan tanto te tiene tienen todo todos tu tus un una unas uno unos y ya yo
+cada cual puede pueden debe deben hacer hace sea sean asi segun mientras
+""".split())
+
+ENGLISH_STOPWORDS = frozenset("""
+a an and are as at be by for from in is it of on or that the this to with
+""".split())
+
+STOPWORDS = SPANISH_STOPWORDS | ENGLISH_STOPWORDS
+
+# Longest suffixes first; only stripped when a stem of 4+ letters remains
+_SUFFIXES = (
+    "amientos", "imientos", "amiento", "imiento", "aciones", "uciones", "ciones",
+    "idades", "mente", "acion", "ucion", "cion", "idad", "ables", "ibles",
+    "able", "ible", "istas", "ista", "ando", "iendo", "ados", "idos",
+    "adas", "idas", "ado", "ido", "ada", "ida", "ar", "er", "ir",
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def fold_accents(text: str) -> str:
+    """
+    Lowercase text and strip diacritics (á -> a, ñ -> n, ü -> u).
+    
+    Args:
+        text: Text to fold
+        
+    Returns:
+        Folded text
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(token: str) -> str:
+    """
+    Apply light Spanish stemming to a folded token.
+    
+    Strips one derivational suffix, then plural and gender endings, so
+    "reproducción", "reproducir" and "reproducciones" share a stem.
+    
+    Args:
+        token: Lowercase, accent-folded token
+        
+    Returns:
+        Stemmed token
+    """
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            token = token[:-len(suffix)]
+            break
+    
+    if token.endswith("es") and len(token) > 5:
+        token = token[:-2]
+    elif token.endswith("s") and len(token) > 4:
+        token = token[:-1]
+    
+    if token[-1:] in ("a", "o", "e") and len(token) > 4:
+        token = token[:-1]
+    
+    return token
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """
+    Turn text into normalized tokens for lexical comparison.
+    
+    Args:
+        text: Raw idea or user story text
+        
+    Returns:
+        Stemmed tokens with stopwords and single characters removed
+    """
+    return [
+        stem(token)
+        for token in _TOKEN_PATTERN.findall(fold_accents(text))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
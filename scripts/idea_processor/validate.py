@@ -4,13 +4,53 @@ Validation script to test the idea processor without requiring OpenAI API key.
 Tests basic functionality like parsing, data models, etc.
 """
 
+import shutil
 import sys
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 
+@contextmanager
+def isolated_config(**overrides):
+    """
+    Run a check against copies of IDEAS.md and BACKLOG.md in a temporary directory.
+    
+    The state directory (caches, journals, metrics) moves there too, the
+    processor's console is silenced and ``overrides`` are applied to the
+    config; everything is restored afterwards.
+    
+    Yields:
+        The temporary directory
+    """
+    from scripts.idea_processor.config import config
+    from scripts.idea_processor import processor
+    
+    saved = config.model_dump()
+    quiet = processor.console.quiet
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        state_dir = directory / ".idea_processor"
+        try:
+            for name, value in saved.items():
+                if isinstance(value, Path) and value.is_relative_to(saved["state_dir"]):
+                    setattr(config, name, state_dir / value.relative_to(saved["state_dir"]))
+            for name in ("ideas_file", "backlog_file"):
+                shutil.copy(getattr(config, name), directory / getattr(config, name).name)
+                setattr(config, name, directory / getattr(config, name).name)
+            for name, value in overrides.items():
+                setattr(config, name, value)
+            processor.console.quiet = True
+            yield directory
+        finally:
+            for name, value in saved.items():
+                setattr(config, name, value)
+            processor.console.quiet = quiet
+
+
 def test_imports():
     """Test that all modules can be imported."""
     print("Testing imports...")
@@ -47,6 +87,25 @@ def test_parser():
         assert len(ideas) == 1, "Should parse 1 idea"
         assert ideas[0].id == "ID-001", "ID should be ID-001"
         
+        # A bold word inside a value is not a field
+        inline_ideas = sample_ideas.replace(
+            "Test context", "El **Estado** de la cola no se ve en la cabina"
+        ).replace("Test value", "algo con **Valor** agregado")
+        entries = MarkdownParser.index_ideas(inline_ideas)
+        ideas = MarkdownParser.parse_ideas(inline_ideas, entries)
+        status_start = inline_ideas.index("**Estado**: ")
+        assert entries[0].status == "💭 Por refinar", "Inline **Estado** should not be the status"
+        assert entries[0].status_span[0] == status_start, "Status span should be the Estado field"
+        assert ideas[0].status == "💭 Por refinar", "Inline **Estado** should not be the status"
+        assert ideas[0].value == "algo con **Valor** agregado", "Inline **Valor** should stay in the value"
+        
+        # The lazy index and the full parser agree on a status on the next line
+        next_line_ideas = sample_ideas.replace("**Estado**: 💭", "**Estado**:\n  💭")
+        entries = MarkdownParser.index_ideas(next_line_ideas)
+        ideas = MarkdownParser.parse_ideas(next_line_ideas)
+        assert entries[0].status == ideas[0].status == "💭 Por refinar", "Index and parser should agree on the status"
+        assert entries[0].status_span == ideas[0].status_span, "Index and parser should agree on the status span"
+        
         # Test user story parsing
         sample_us = """
 #### US-001: Test Story
@@ -123,6 +182,687 @@ def test_models():
         return False
 
 
+def sample_idea(idea_id: str, text: str):
+    """Build a pending Idea whose title and full text are ``text``."""
+    from scripts.idea_processor.models import Idea
+    return Idea(
+        id=idea_id,
+        title=text,
+        context="",
+        problem="",
+        value="",
+        date_created="2025-11-14",
+        status="💭 Por refinar",
+        priority="Media 🟡",
+        full_text=text
+    )
+
+
+def test_clustering():
+    """Test union-find grouping of batch ideas that duplicate each other."""
+    print("\nTesting duplicate clustering...")
+    try:
+        from scripts.idea_processor.models import SimilarityResult
+        from scripts.idea_processor.clustering import cluster_duplicates, dedupe_pair_candidates
+        
+        def duplicate(idea_id: str, item_id: str, score: float = 0.9):
+            return SimilarityResult(
+                idea_id=idea_id,
+                similar_item_id=item_id,
+                similarity_score=score,
+                is_duplicate=True,
+                reason="Misma funcionalidad"
+            )
+        
+        ideas = [sample_idea(f"ID-{number:03d}", f"Idea {number}") for number in range(1, 8)]
+        results = [
+            [duplicate("ID-001", "ID-002")],                 # Chain 1 -> 2 -> 3
+            [duplicate("ID-002", "ID-003")],
+            [],
+            [duplicate("ID-004", "US-001", 0.95)],           # Existing user story
+            [duplicate("ID-005", "ID-004")],
+            [duplicate("ID-006", "ID-900", 0.85)],           # Idea outside the batch
+            [duplicate("ID-007", "ID-006")],
+        ]
+        decisions, clusters = cluster_duplicates(ideas, results)
+        targets = [decision.similar_item_id if decision else None for decision in decisions]
+        
+        assert clusters == [[0, 1, 2], [3, 4], [5, 6]], f"Unexpected clusters: {clusters}"
+        assert targets[:3] == [None, "ID-001", "ID-001"], "A transitive chain should keep its first idea"
+        assert "vía ID-002" in decisions[2].reason, "An indirect link should say which idea it goes through"
+        assert targets[3:5] == ["US-001", "ID-004"], "A cluster covered by a user story should keep no idea"
+        assert targets[5:] == ["ID-900", "ID-006"], "A cluster covered by an older idea should keep no idea"
+        
+        # Each unordered pair of batch ideas is adjudicated once
+        candidates = {
+            "ID-001": [(ideas[1], 0.9)],
+            "ID-002": [(ideas[0], 0.9), (ideas[2], 0.8)],
+            "ID-003": [],
+        }
+        deduped = dedupe_pair_candidates(ideas[:3], candidates)
+        assert [item.id for item, _ in deduped["ID-002"]] == ["ID-003"], "The reversed pair should be dropped"
+        
+        print("✅ Clustering tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Clustering test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_near_duplicates():
+    """Test that MinHash/LSH finds near-verbatim copies and nothing else."""
+    print("\nTesting near-duplicate detection...")
+    try:
+        from scripts.idea_processor.config import config
+        from scripts.idea_processor.models import UserStory
+        from scripts.idea_processor.near_duplicates import NearDuplicateDetector
+        
+        story_text = (
+            "Como administrador quiero exportar el historial de pedidos de cada cliente "
+            "a un archivo CSV filtrado por rango de fechas para poder revisar las ventas "
+            "del trimestre en una hoja de cálculo sin pedir ayuda al equipo de soporte, "
+            "incluyendo impuestos, descuentos aplicados, método de pago, dirección de envío "
+            "y estado actual de cada pedido exportado"
+        )
+        idea_text = (
+            "Enviar una notificación por correo electrónico al cliente cuando su pedido "
+            "cambie de estado en el almacén para que sepa en todo momento si ya fue "
+            "preparado enviado o entregado sin tener que consultar la aplicación, "
+            "incluyendo número de seguimiento, transportista asignado, fecha estimada "
+            "de llegada y enlace directo al detalle del pedido"
+        )
+        story = UserStory(id="US-001", title="Exportar pedidos", as_a="administrador",
+                          i_want="exportar pedidos", so_that="revisar ventas", full_text=story_text)
+        older_idea = sample_idea("ID-001", idea_text)
+        
+        batch = [
+            # One word changed and different casing/punctuation
+            sample_idea("ID-010", story_text.upper().replace("TRIMESTRE", "MES") + "."),
+            sample_idea("ID-011", idea_text.replace("electrónico", "electronico") + "!"),
+            sample_idea("ID-012", "Añadir modo oscuro a la aplicación móvil para reducir el cansancio visual de noche"),
+            sample_idea("ID-013", "Permitir iniciar sesión con una cuenta de Google o Microsoft desde la web"),
+        ]
+        detector = NearDuplicateDetector()
+        assert detector.threshold == config.near_duplicate_threshold == 0.80, "Default threshold should be 0.80"
+        results = detector.find_near_duplicates(batch, [story], [older_idea] + batch)
+        
+        assert [r.similar_item_id for r in results[0]] == ["US-001"], "Copy of a user story should be found"
+        assert [r.similar_item_id for r in results[1]] == ["ID-001"], "Copy of an older idea should be found"
+        assert all(r.similarity_score >= 0.80 and r.is_duplicate for r in results[0] + results[1])
+        assert results[2] == [] and results[3] == [], "Unrelated ideas should not be marked"
+        
+        # Between copies in the same batch only the later one is reported
+        twins = [sample_idea("ID-020", idea_text), sample_idea("ID-021", idea_text + ".")]
+        results = detector.find_near_duplicates(twins, [], twins)
+        assert results[0] == [], "The earlier copy should stay unmarked"
+        assert [r.similar_item_id for r in results[1]] == ["ID-020"], "The later copy should point to the earlier one"
+        
+        print("✅ Near-duplicate tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Near-duplicate test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_manifest():
+    """Test which ideas and candidates the manifest sends back to adjudication."""
+    print("\nTesting processing manifest...")
+    try:
+        from scripts.idea_processor.config import config
+        from scripts.idea_processor.models import UserStory, SimilarityResult
+        from scripts.idea_processor.manifest import ProcessingManifest
+        
+        def story(story_id: str, text: str):
+            return UserStory(id=story_id, title=text, as_a="usuario", i_want=text,
+                             so_that="trabajar mejor", full_text=text)
+        
+        ideas = [sample_idea("ID-001", "Exportar pedidos a CSV"), sample_idea("ID-002", "Modo oscuro")]
+        stories = [story("US-001", "Exportar pedidos"), story("US-002", "Notificar envíos")]
+        candidates = [(item, 0.7) for item in stories]
+        
+        def run(user_stories):
+            manifest = ProcessingManifest(config.manifest_file)
+            manifest.sync(ideas, user_stories)
+            return manifest
+        
+        with isolated_config():
+            manifest = run(stories)
+            assert all(manifest.needs_check(idea) for idea in ideas), "New ideas should be checked"
+            manifest.resolve(ideas[0], [SimilarityResult(
+                idea_id="ID-001",
+                similar_item_id="US-001",
+                similarity_score=0.9,
+                is_duplicate=True,
+                reason="Misma funcionalidad"
+            )])
+            manifest.resolve(ideas[1], [])
+            manifest.save()
+            
+            # Unchanged corpus: nothing is pending and the old verdict is reused
+            manifest = run(stories)
+            assert not any(manifest.needs_check(idea) for idea in ideas), "Unchanged ideas should be skipped"
+            assert manifest.pending_candidates(ideas[0], candidates) == [], "No candidate should be pending"
+            reused = manifest.resolve(ideas[0], [])
+            assert [r.similar_item_id for r in reused] == ["US-001"], "The stored verdict should be reused"
+            manifest.save()
+            
+            # One edited story: only that candidate is pending
+            edited = [stories[0], story("US-002", "Notificar envíos por correo")]
+            manifest = run(edited)
+            assert all(manifest.needs_check(idea) for idea in ideas), "A corpus change should recheck ideas"
+            pending = manifest.pending_candidates(ideas[0], [(item, 0.7) for item in edited])
+            assert [item.id for item, _ in pending] == ["US-002"], f"Only US-002 should be pending: {pending}"
+            assert [r.similar_item_id for r in manifest.resolve(ideas[0], [])] == ["US-001"]
+            manifest.resolve(ideas[1], [])
+            manifest.save()
+            
+            # Changed threshold: every stored verdict is discarded
+            config.similarity_threshold += 0.05
+            manifest = run(edited)
+            assert all(manifest.needs_check(idea) for idea in ideas), "New settings should recheck every idea"
+            assert len(manifest.pending_candidates(ideas[0], candidates)) == 2, "Every candidate should be pending"
+        
+        print("✅ Manifest tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Manifest test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_providers():
+    """Test retries, failures and rate limits of ProviderClient against the fake provider."""
+    print("\nTesting provider client...")
+    try:
+        import json
+        import urllib.request
+        from scripts.idea_processor import providers
+        from scripts.idea_processor.providers import ProviderClient, ProviderError, RateLimiter, retry_delay
+        from scripts.idea_processor.benchmarks.fake_provider import FakeProvider, FakeProviderServer
+        
+        class HTTPProvider(ProviderClient):
+            """Embeddings over plain HTTP, so no SDK is needed."""
+            
+            name = "Fake"
+            
+            def __init__(self, url: str, path: str = "/v1/embeddings"):
+                super().__init__("validate-chat", f"validate-embed{path}")
+                self.url = url + path
+                self.attempts = 0
+            
+            def _embed(self, texts):
+                self.attempts += 1
+                request = urllib.request.Request(
+                    self.url,
+                    data=json.dumps({"input": texts}).encode("utf-8"),
+                    headers={"Content-Type": "application/json"}
+                )
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    body = json.loads(response.read())
+                return [item["embedding"] for item in body["data"]], None
+        
+        delays = []
+        
+        def recording_delay(error, attempt):
+            delay = retry_delay(error, attempt)
+            delays.append((attempt, delay))
+            return delay
+        
+        providers.retry_delay = recording_delay
+        try:
+            with isolated_config(provider_max_retries=8, retry_base_delay=0.01, retry_max_delay=0.02):
+                # Injected 429s and 500s are retried until the request succeeds
+                fake = FakeProvider(dims=8, rate_limit_rate=0.4, error_rate=0.2, seed=3)
+                with FakeProviderServer(fake) as server:
+                    client = HTTPProvider(server.url)
+                    vectors = [client.embed([f"idea {n}"])[0] for n in range(5)]
+                assert all(len(vector) == 8 for vector in vectors), "Every request should eventually succeed"
+                assert fake.stats["openai.embeddings:429"] and fake.stats["openai.embeddings:500"], \
+                    f"Expected injected failures: {dict(fake.stats)}"
+                assert client.attempts == fake.stats["openai.embeddings"] == 5 + len(delays), \
+                    "Each failure should cost exactly one retry"
+                assert all(0 <= delay <= 0.02 for _, delay in delays), "Retry delays should stay within the cap"
+                
+                # Out of retries, the last transient failure becomes a ProviderError
+                fake = FakeProvider(dims=8, rate_limit_rate=1.0)
+                with FakeProviderServer(fake) as server:
+                    client = HTTPProvider(server.url)
+                    try:
+                        client.embed(["idea"])
+                        assert False, "A request that never succeeds should raise ProviderError"
+                    except ProviderError:
+                        pass
+                assert client.attempts == 9, f"Expected 1 attempt and 8 retries, got {client.attempts}"
+                
+                # Non-retryable errors (404 here) fail at once
+                delays.clear()
+                with FakeProviderServer(FakeProvider(dims=8)) as server:
+                    client = HTTPProvider(server.url, "/v1/unknown")
+                    try:
+                        client.embed(["idea"])
+                        assert False, "A 404 should raise ProviderError"
+                    except ProviderError:
+                        pass
+                assert client.attempts == 1 and not delays, "A 404 should not be retried"
+                
+                # Full jitter: random delays within the exponential bound
+                error = ConnectionError("reset")
+                samples = [retry_delay(error, 3) for _ in range(50)]
+                assert all(0 <= delay <= 0.02 for delay in samples), "Jittered delay exceeded the cap"
+                assert len(set(samples)) > 1, "Retry delays should be jittered"
+        finally:
+            providers.retry_delay = retry_delay
+        
+        # Requests and tokens per minute are throttled separately
+        limiter = RateLimiter(rpm=60, tpm=1000)
+        assert all(limiter.reserve(10) == 0 for _ in range(60)), "Requests within the RPM limit should not wait"
+        assert 0.9 < limiter.reserve(10) <= 1.0, "The 61st request of the minute should wait about a second"
+        limiter = RateLimiter(rpm=0, tpm=1000)
+        assert limiter.reserve(1000) == 0, "A full token bucket should not wait"
+        assert 29 < limiter.reserve(500) <= 30, "500 tokens over a 1000 TPM limit should wait about 30s"
+        
+        print("✅ Provider tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Provider test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def vector_fixture(n_queries: int = 40, n_corpus: int = 300, dims: int = 16, seed: int = 7):
+    """Random L2-normalized queries and corpus, plus brute-force cosine rankings."""
+    import numpy as np
+    from scripts.idea_processor.similarity_join import normalize_matrix
+    
+    rng = np.random.default_rng(seed)
+    queries = normalize_matrix(rng.standard_normal((n_queries, dims)))
+    corpus = normalize_matrix(rng.standard_normal((n_corpus, dims)))
+    exclude = [row * 7 if row % 2 == 0 else -1 for row in range(n_queries)]
+    
+    scores = queries @ corpus.T
+    for row, excluded in enumerate(exclude):
+        if excluded >= 0:
+            scores[row, excluded] = -np.inf
+    rankings = [list(np.argsort(-row, kind="stable")) for row in scores]
+    return queries, corpus, exclude, scores, rankings
+
+
+def test_similarity_join():
+    """Test the blocked top-k join against brute-force cosine similarity."""
+    print("\nTesting similarity join...")
+    try:
+        import numpy as np
+        from scripts.idea_processor.similarity_join import top_k_join
+        
+        queries, corpus, exclude, scores, rankings = vector_fixture()
+        
+        # Blocks smaller than both matrices, so partial top-k lists get merged
+        results = top_k_join(queries, corpus, k=5, block_size=64, exclude=exclude)
+        for row, neighbours in enumerate(results):
+            assert [index for index, _ in neighbours] == rankings[row][:5], f"Wrong neighbours for query {row}"
+            assert np.allclose([score for _, score in neighbours], scores[row, rankings[row][:5]], atol=1e-5)
+        
+        # k=0 keeps every row above min_score
+        results = top_k_join(queries, corpus, k=0, min_score=0.5, block_size=64, exclude=exclude)
+        for row, neighbours in enumerate(results):
+            expected = [index for index in rankings[row] if scores[row, index] >= 0.5]
+            assert [index for index, _ in neighbours] == expected, f"Wrong rows above min_score for query {row}"
+        
+        print("✅ Similarity join tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Similarity join test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_ann_index():
+    """Test the ANN indexes against brute-force cosine similarity."""
+    print("\nTesting ANN indexes...")
+    try:
+        from scripts.idea_processor.ann_index import create_index
+        
+        queries, corpus, exclude, _, rankings = vector_fixture(n_corpus=1000)
+        ids = [f"US-{row:04d}" for row in range(corpus.shape[0])]
+        k = 10
+        
+        def recall(index):
+            index.build(ids, ids, corpus)
+            results = index.search(queries, k, exclude=exclude)
+            found = sum(
+                len({row for row, _ in neighbours} & set(rankings[query][:k]))
+                for query, neighbours in enumerate(results)
+            )
+            return found / (k * len(results))
+        
+        assert recall(create_index("exact", block_size=64)) == 1.0, "The exact index should match brute force"
+        assert recall(create_index("ivf", nlist=16, nprobe=16)) == 1.0, "IVF probing every list should be exact"
+        ivf_recall = recall(create_index("ivf", nlist=16, nprobe=8))
+        assert ivf_recall >= 0.9, f"IVF recall@{k} too low: {ivf_recall:.2f}"
+        
+        try:
+            hnsw = create_index("hnsw")
+        except ImportError:
+            print("   hnswlib not installed, skipping HNSW")
+        else:
+            hnsw_recall = recall(hnsw)
+            assert hnsw_recall >= 0.95, f"HNSW recall@{k} too low: {hnsw_recall:.2f}"
+        
+        print("✅ ANN index tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ ANN index test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_cache_eviction():
+    """Test that the SQLite caches evict the least recently used entries."""
+    print("\nTesting cache eviction...")
+    try:
+        import sqlite3
+        import time
+        from scripts.idea_processor.cache import VerdictCache
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "verdicts.sqlite"
+            
+            def open_cache():
+                return VerdictCache(path, model="validate", prompt_version="v1", max_entries=3)
+            
+            def stored(cache):
+                """Items left in the database, read without touching their recency."""
+                with sqlite3.connect(str(path)) as conn:
+                    keys = {row[0] for row in conn.execute("SELECT key FROM verdicts")}
+                conn.close()
+                return {item for item in "abcde" if cache.key("idea", item) in keys}
+            
+            cache = open_cache()
+            for item in "abc":
+                cache.put("idea", item, 0.5, "Sin relación")
+                time.sleep(0.02)
+            assert cache.get("idea", "a") == (0.5, "Sin relación"), "Cached verdict should be returned"
+            time.sleep(0.02)
+            cache.put("idea", "d", 0.5, "Sin relación")
+            cache.close()
+            assert stored(cache) == {"a", "c", "d"}, f"Overflow should drop b, the least recently used: {stored(cache)}"
+            
+            # Reads from a run that writes nothing are persisted on close
+            time.sleep(0.02)
+            cache = open_cache()
+            assert cache.get("idea", "c") is not None
+            cache.close()
+            time.sleep(0.02)
+            cache = open_cache()
+            cache.put("idea", "e", 0.5, "Sin relación")
+            assert len(cache) == 3, "The cache should stay at max_entries"
+            cache.close()
+            assert stored(cache) == {"c", "d", "e"}, f"Overflow should drop a, read before d and c: {stored(cache)}"
+        
+        print("✅ Cache eviction tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Cache eviction test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+STORE_IDEAS = """# Ideas
+
+## 🔴 Ideas - Alta Prioridad
+
+### [ID-001] Crossfade automático entre pistas
+- **Contexto**: Los DJs necesitan transiciones suaves entre pistas
+- **Problema**: No hay crossfade configurable
+- **Valor**: Mezclas sin cortes
+- **Fecha**: 2025-11-14
+- **Estado**: 💭 Por refinar
+
+### [ID-002] Grabación de sesiones
+- **Contexto**: Los DJs quieren guardar sus sesiones
+- **Problema**: No se puede exportar una sesión grabada
+- **Valor**: Compartir sesiones
+- **Fecha**: 2025-11-14
+- **Estado**: ✅ Convertida a US-002
+
+### [ID-003] Ecualizador por banda
+- **Contexto**: Ajustar graves y agudos durante la mezcla
+- **Problema**: No hay ecualizador
+- **Valor**: Mezclas más limpias
+- **Fecha**: 2025-11-14
+- **Estado**: 💭 Por refinar
+"""
+
+STORE_BACKLOG = """# Backlog
+
+#### US-001: Transiciones con crossfade
+**Como** DJ  
+**Quiero** aplicar crossfade entre pistas  
+**Para** lograr transiciones suaves
+
+**Estado**: To Do
+
+---
+
+#### US-002: Grabación de sesiones
+**Como** DJ  
+**Quiero** grabar y exportar mis sesiones  
+**Para** compartirlas
+
+**Estado**: To Do
+"""
+
+
+def test_store():
+    """Test the SQLite store's incremental sync and FTS5 candidate query."""
+    print("\nTesting backlog store...")
+    try:
+        from scripts.idea_processor.store import BacklogStore
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BacklogStore(Path(tmp) / "backlog.sqlite3")
+            try:
+                changes = store.sync(STORE_IDEAS, STORE_BACKLOG)
+                assert changes == {"ideas_added": 3, "ideas_removed": 0,
+                                   "user_stories_added": 2, "user_stories_removed": 0}, f"First sync: {changes}"
+                assert not any(store.sync(STORE_IDEAS, STORE_BACKLOG).values()), "Unchanged files should not be rewritten"
+                
+                def candidates(title: str):
+                    return [item.id for item, _ in store.lexical_candidates(sample_idea("ID-010", title), 5)]
+                
+                assert sorted(candidates("Crossfade suave entre pistas")) == ["ID-001", "US-001"], \
+                    f"Crossfade candidates: {candidates('Crossfade suave entre pistas')}"
+                assert store.lexical_candidates(store.get_ideas("ID-001")[0], 5)[0][0].id == "US-001", \
+                    "An idea should not be its own candidate"
+                # Converted ideas are not part of the comparison corpus
+                assert candidates("Exportar sesiones grabadas") == ["US-002"], \
+                    f"Session candidates: {candidates('Exportar sesiones grabadas')}"
+                assert candidates("Modo oscuro") == [], "Unrelated words should match nothing"
+                
+                # An edited story is replaced in the index
+                edited = STORE_BACKLOG.replace("grabar y exportar mis sesiones", "grabar mis sesiones en vídeo")
+                changes = store.sync(STORE_IDEAS, edited)
+                assert (changes["user_stories_added"], changes["user_stories_removed"]) == (1, 1), f"Edit sync: {changes}"
+                assert candidates("Exportar sesiones") == ["US-002"], "The edited story should still match"
+                assert candidates("Exportar") == [], "Words removed from a story should no longer match"
+                assert candidates("vídeo") == ["US-002"], "Words added to a story should match"
+                assert store.next_us_number() == 3, "Next US number should follow the stored stories"
+            finally:
+                store.close()
+        
+        print("✅ Store tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Store test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_checkpoint():
+    """Test that --resume reuses the verdicts and stories of an interrupted run."""
+    print("\nTesting checkpoint journal...")
+    try:
+        from scripts.idea_processor.config import config
+        from scripts.idea_processor.checkpoint import CheckpointJournal
+        from scripts.idea_processor.processor import IdeaProcessor
+        from scripts.idea_processor.instrumentation import metrics
+        
+        # Every pending idea is unique and adjudicated (no near-duplicate shortcut)
+        with isolated_config(ai_provider="local", local_similarity_threshold=1.01,
+                             near_duplicate_detection=False, max_concurrency=1):
+            calls = {"adjudicate": 0, "generate": 0}
+            
+            def run(resume: bool, fail_at: int = 0):
+                processor = IdeaProcessor()
+                # The local engine is not journaled; open the journal as
+                # _open_checkpoint does for the AI providers
+                processor.checkpoint = CheckpointJournal(config.checkpoint_file, resume=resume)
+                adjudicate = processor.similarity_checker.adjudicate
+                generate = processor.generator.generate_user_story
+                
+                def counted_adjudicate(idea, candidates):
+                    calls["adjudicate"] += 1
+                    return adjudicate(idea, candidates)
+                
+                def failing_generate(idea, us_number):
+                    calls["generate"] += 1
+                    if calls["generate"] == fail_at:
+                        raise RuntimeError("quota exceeded")
+                    return generate(idea, us_number)
+                
+                processor.similarity_checker.adjudicate = counted_adjudicate
+                processor.generator.generate_user_story = failing_generate
+                return processor.process_ideas()
+            
+            try:
+                run(resume=False, fail_at=4)
+                raise AssertionError("The first run should be interrupted")
+            except RuntimeError:
+                pass
+            pending = calls["adjudicate"]
+            assert pending > 3, "The sample should have several pending ideas"
+            assert config.checkpoint_file.exists(), "The interrupted run should leave its journal"
+            
+            calls.update(adjudicate=0, generate=0)
+            _, stories = run(resume=True)
+            assert calls["adjudicate"] == 0, "Resumed verdicts should not be adjudicated again"
+            assert calls["generate"] == pending - 3, "Only the missing stories should be generated"
+            assert metrics.counters.get("resumed_verdicts") == pending, "All verdicts should be resumed"
+            assert metrics.counters.get("resumed_stories") == 3, "The 3 finished stories should be resumed"
+            assert len({story.id for story in stories}) == pending, "Every idea should get its own US number"
+            assert not config.checkpoint_file.exists(), "The journal should be cleared after the update"
+        
+        # An edited idea misses its entry; other settings discard the whole journal
+        with isolated_config(ai_provider="local"):
+            from scripts.idea_processor.parser import MarkdownParser
+            idea = MarkdownParser.parse_ideas(config.ideas_file.read_text(encoding="utf-8"))[0]
+            journal = CheckpointJournal(config.checkpoint_file)
+            journal.record_verdict(idea, [])
+            
+            journal = CheckpointJournal(config.checkpoint_file, resume=True)
+            edited = idea.model_copy(update={"full_text": idea.full_text + " editada"})
+            assert journal.verdict(idea) == [], "An unchanged idea should hit its entry"
+            assert journal.verdict(edited) is None, "An edited idea should miss its entry"
+            
+            config.similarity_threshold += 0.05
+            journal = CheckpointJournal(config.checkpoint_file, resume=True)
+            assert journal.resumed == 0, "Changed settings should discard the journal"
+            assert journal.verdict(idea) is None, "Changed settings should discard the journal"
+        
+        print("✅ Checkpoint tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ Checkpoint test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_file_transaction():
+    """Test that IDEAS.md and BACKLOG.md are replaced together, even across a crash."""
+    print("\nTesting file transaction...")
+    try:
+        from unittest import mock
+        from scripts.idea_processor import writer
+        from scripts.idea_processor.writer import FileTransaction, recover_files
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            journal = directory / "state" / "commit-journal.json"
+            targets = [directory / "BACKLOG.md", directory / "IDEAS.md"]
+            
+            def reset():
+                for target in targets:
+                    target.write_text(f"old {target.name}", encoding="utf-8")
+            
+            def contents():
+                return [target.read_text(encoding="utf-8") for target in targets]
+            
+            def leftovers():
+                return sorted(path.name for path in directory.rglob("*") if path.is_file() and path not in targets)
+            
+            new = [f"new {target.name}" for target in targets]
+            
+            # Clean commit: both files replaced, nothing left behind
+            reset()
+            with FileTransaction(journal) as transaction:
+                for target, content in zip(targets, new):
+                    transaction.stage(target, content)
+            assert contents() == new, "A clean commit should replace both files"
+            assert leftovers() == [], "A clean commit should remove its journal and staged files"
+            assert recover_files(journal, targets) is None, "Nothing should be left to recover"
+            
+            # Crash after the journal is written, with only the first file renamed
+            reset()
+            roll_forward = writer._roll_forward
+            
+            def crash_after_first(files):
+                roll_forward(list(files)[:1])
+                raise KeyboardInterrupt("crash")
+            
+            try:
+                with mock.patch.object(writer, "_roll_forward", crash_after_first):
+                    with FileTransaction(journal) as transaction:
+                        for target, content in zip(targets, new):
+                            transaction.stage(target, content)
+                raise AssertionError("The commit should have crashed")
+            except KeyboardInterrupt:
+                pass
+            assert contents() == [new[0], f"old {targets[1].name}"], "The crash should leave a half-updated pair"
+            assert journal.exists(), "The journal should survive the crash"
+            assert recover_files(journal, targets) == "rolled_forward", "Recovery should roll the commit forward"
+            assert contents() == new, "Recovery should finish replacing both files"
+            assert leftovers() == [], "Recovery should remove the journal and staged files"
+            
+            # Crash before the journal is written: staged files and a torn journal
+            reset()
+            transaction = FileTransaction(journal)
+            for target, content in zip(targets, new):
+                transaction.stage(target, content)
+            journal.with_suffix(".tmp").write_text('{"files": [', encoding="utf-8")
+            assert recover_files(journal, targets) == "rolled_back", "Recovery should roll the commit back"
+            assert contents() == [f"old {target.name}" for target in targets], "The originals should be untouched"
+            assert leftovers() == [], "Recovery should remove the staged files"
+        
+        print("✅ File transaction tests passed")
+        return True
+    except Exception as e:
+        print(f"❌ File transaction test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def test_file_structure():
     """Test that expected files exist."""
     print("\nTesting file structure...")
@@ -172,6 +912,16 @@ def main():
         # Only run these if imports worked
         results.append(("Models", test_models()))
         results.append(("Parser", test_parser()))
+        results.append(("Clustering", test_clustering()))
+        results.append(("Near Duplicates", test_near_duplicates()))
+        results.append(("Manifest", test_manifest()))
+        results.append(("Providers", test_providers()))
+        results.append(("Similarity Join", test_similarity_join()))
+        results.append(("ANN Index", test_ann_index()))
+        results.append(("Cache Eviction", test_cache_eviction()))
+        results.append(("Store", test_store()))
+        results.append(("Checkpoint", test_checkpoint()))
+        results.append(("File Transaction", test_file_transaction()))
     else:
         print("\nSkipping remaining tests due to missing dependencies.")
     
@@ -0,0 +1,309 @@
+"""
+Writers for the updates the processor makes to IDEAS.md and BACKLOG.md.
+
+Status updates are applied as patches on the spans the parser recorded for
+each idea's ``**Estado**`` line: all of them in one pass over the content,
+instead of one regex search over the whole file per idea. New user stories
+are inserted the same way, with each priority section of BACKLOG.md looked
+up once.
+
+Both files are replaced in one transaction: the new contents are staged
+as temporary files next to their targets, synced to disk, and renamed over
+the targets once a journal records that all of them are complete. A run
+interrupted in between is rolled forward (journal present) or back (no
+journal) by ``recover_files`` on the next start, so BACKLOG.md never keeps
+new stories whose ideas are still pending. Staged content can be streamed
+piece by piece, without building the full updated text in memory.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .models import Idea, UserStory
+
+
+# (start, end, replacement) of one span of the original content
+Patch = Tuple[int, int, str]
+
+# BACKLOG.md section headers new user stories are inserted under, by priority marker
+SECTION_MARKERS = {
+    "🔴": "### 🔴 Prioridad Alta - Crítico",
+    "🟡": "### 🟡 Prioridad Media - Importante",
+    "🟢": "### 🟢 Prioridad Baja - Mejoras",
+}
+
+
+def _checked(content: str, patches: List[Patch]) -> List[Patch]:
+    """Sort patches by span, raising ValueError on overlapping or out-of-range ones."""
+    ordered = sorted(patches, key=lambda patch: patch[:2])
+    position = 0
+    for start, end, _ in ordered:
+        if start < position or end < start or end > len(content):
+            raise ValueError(f"Invalid or overlapping patch span ({start}, {end})")
+        position = end
+    return ordered
+
+
+def iter_patched(content: str, patches: List[Patch]) -> Iterator[str]:
+    """
+    Yield the pieces of a text with some of its spans replaced.
+    
+    Args:
+        content: Original text (the one the spans were recorded on)
+        patches: (start, end, replacement) tuples, in any order; empty spans insert
+        
+    Returns:
+        Iterator over unchanged slices of ``content`` and replacements, in order
+        
+    Raises:
+        ValueError: If two patches overlap or a span is outside the text
+    """
+    return _pieces(content, _checked(content, patches))
+
+
+def _pieces(content: str, ordered: List[Patch]) -> Iterator[str]:
+    position = 0
+    for start, end, replacement in ordered:
+        yield content[position:start]
+        yield replacement
+        position = end
+    yield content[position:]
+
+
+def apply_patches(content: str, patches: List[Patch]) -> str:
+    """
+    Replace spans of a text in a single pass.
+    
+    Args:
+        content: Original text (the one the spans were recorded on)
+        patches: (start, end, replacement) tuples, in any order
+        
+    Returns:
+        The patched text
+        
+    Raises:
+        ValueError: If two patches overlap or a span is outside the text
+    """
+    return "".join(iter_patched(content, patches))
+
+
+def status_patches(
+    duplicate_ideas: List[Idea],
+    converted_ideas: List[Idea],
+    user_stories: List[UserStory]
+) -> List[Patch]:
+    """
+    Build the ``**Estado**`` rewrites of duplicate and converted ideas.
+    
+    Ideas without a recorded status line (none of the ideas the processor
+    picks up) are left unchanged.
+    
+    Args:
+        duplicate_ideas: Ideas marked as duplicates (``similar_to`` and ``similarity_score`` set)
+        converted_ideas: Ideas turned into user stories
+        user_stories: The story generated for each converted idea, in the same order
+        
+    Returns:
+        Patches for ``apply_patches``
+    """
+    patches = []
+    for idea in duplicate_ideas:
+        if idea.status_span is not None:
+            patches.append((
+                *idea.status_span,
+                f"**Estado**: ⚠️ Repetida - Similar a {idea.similar_to} (similitud: {idea.similarity_score:.0%})"
+            ))
+    for idea, user_story in zip(converted_ideas, user_stories):
+        if idea.status_span is not None:
+            patches.append((*idea.status_span, f"**Estado**: ✅ Convertida a {user_story.id}"))
+    return patches
+
+
+def section_marker(priority: str) -> str:
+    """
+    BACKLOG.md section header for a user story priority.
+    
+    Args:
+        priority: Priority as written in the story (e.g. "Alta 🔴")
+        
+    Returns:
+        Header of the matching section; low priority when no marker matches
+    """
+    for marker, header in SECTION_MARKERS.items():
+        if marker in priority:
+            return header
+    return SECTION_MARKERS["🟢"]
+
+
+def backlog_patches(content: str, user_stories: List[UserStory]) -> List[Patch]:
+    """
+    Build the insertions of new user stories under their priority sections.
+    
+    Stories are grouped by section and each section header is looked up
+    once. Every story goes right below its section header, so within a
+    section the last story ends up first. Stories whose section is missing
+    from the backlog are not inserted.
+    
+    Args:
+        content: BACKLOG.md content
+        user_stories: Stories to insert, in generation order
+        
+    Returns:
+        One insertion per section, for ``apply_patches`` or ``iter_patched``
+    """
+    sections: Dict[str, List[UserStory]] = {}
+    for user_story in user_stories:
+        sections.setdefault(section_marker(user_story.priority), []).append(user_story)
+    
+    patches = []
+    for header, stories in sections.items():
+        header_pos = content.find(header)
+        if header_pos == -1:
+            continue
+        line_end = content.find('\n', header_pos)
+        if line_end == -1:
+            position, prefix = len(content), '\n'
+        else:
+            position, prefix = line_end + 1, ''
+        text = "".join(f"\n{story.to_markdown()}\n" for story in reversed(stories))
+        patches.append((position, position, prefix + text))
+    return patches
+
+
+def _staged_path(target: Path) -> Path:
+    """Temporary file a new version of ``target`` is written to before the rename."""
+    return target.with_name(f".{target.name}.tmp")
+
+
+def _sync_directory(directory: Path) -> None:
+    """Persist renames and deletions in a directory (not supported on Windows)."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_synced(path: Path, content: Union[str, Iterable[str]]) -> None:
+    """Write a file and flush it to disk."""
+    with open(path, 'w', encoding='utf-8') as f:
+        if isinstance(content, str):
+            f.write(content)
+        else:
+            f.writelines(content)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class FileTransaction:
+    """
+    Replace several files atomically as a group.
+    
+    Use as a context manager: ``stage`` every new file content inside the
+    block; the files are replaced when the block exits normally, and the
+    staged files are discarded if it raises.
+    """
+    
+    def __init__(self, journal_path: Path):
+        self.journal_path = Path(journal_path)
+        self.staged: Dict[Path, Path] = {}
+    
+    def __enter__(self) -> "FileTransaction":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+    
+    def stage(self, target: Path, content: Union[str, Iterable[str]]) -> None:
+        """
+        Write the new content of a file next to it, without replacing it yet.
+        
+        Args:
+            target: File to replace on commit
+            content: New content, as a string or as pieces written in order
+        """
+        target = Path(target)
+        staged = _staged_path(target)
+        self.staged[target] = staged
+        _write_synced(staged, content)
+    
+    def commit(self) -> None:
+        """Replace the targets with their staged files."""
+        if not self.staged:
+            return
+        # The journal is the commit point: once it is on disk, every staged
+        # file is complete and recovery rolls the renames forward
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        journal_tmp = self.journal_path.with_suffix(".tmp")
+        _write_synced(journal_tmp, json.dumps({
+            "files": [
+                {"target": str(target), "staged": str(staged)}
+                for target, staged in self.staged.items()
+            ]
+        }, ensure_ascii=False))
+        journal_tmp.replace(self.journal_path)
+        _sync_directory(self.journal_path.parent)
+        
+        _roll_forward(self.staged.items())
+        self.journal_path.unlink()
+        _sync_directory(self.journal_path.parent)
+        self.staged = {}
+    
+    def abort(self) -> None:
+        """Discard the staged files, leaving the targets untouched."""
+        for staged in self.staged.values():
+            staged.unlink(missing_ok=True)
+        self.staged = {}
+
+
+def _roll_forward(files: Iterable[Tuple[Path, Path]]) -> None:
+    """Rename staged files over their targets (skipping those already renamed)."""
+    directories = set()
+    for target, staged in files:
+        if staged.exists():
+            os.replace(staged, target)
+            directories.add(target.parent)
+    for directory in directories:
+        _sync_directory(directory)
+
+
+def recover_files(journal_path: Path, targets: Sequence[Path]) -> Optional[str]:
+    """
+    Finish or undo a file transaction interrupted by a crash.
+    
+    Args:
+        journal_path: Journal of the transaction
+        targets: Files the transaction may have been replacing
+        
+    Returns:
+        "rolled_forward" if a committed transaction was completed,
+        "rolled_back" if leftover staged files were discarded, None otherwise
+    """
+    journal_path = Path(journal_path)
+    try:
+        journal = json.loads(journal_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        journal = None
+    
+    if journal is not None:
+        _roll_forward(
+            (Path(entry["target"]), Path(entry["staged"]))
+            for entry in journal["files"]
+        )
+        journal_path.unlink()
+        _sync_directory(journal_path.parent)
+        return "rolled_forward"
+    
+    # Without a journal the targets were never touched: drop what was staged
+    leftovers = [_staged_path(Path(target)) for target in targets] + [journal_path.with_suffix(".tmp")]
+    leftovers = [staged for staged in leftovers if staged.exists()]
+    for staged in leftovers:
+        staged.unlink()
+    return "rolled_back" if leftovers else None